@@ -0,0 +1,106 @@
+"""
+In-memory storage. Tables are column arrays with spare capacity kept by the process, nothing is persisted,
+so it is meant for tests, benchmarks and short-lived processes
+"""
+import threading
+import numpy as np
+from app_lib.DDBB.storage import ColumnStorage, COLUMNS, COLUMN_DTYPES, merge_columns
+
+
+MEMORY_LOCATION = ':memory:'
+MEMORY_MIN_CAPACITY = 64  # rows allocated when a table is created
+__memory_tables__ = {}
+__memory_tables_lock__ = threading.Lock()
+
+
+class MemoryDataBase(ColumnStorage):
+    """
+    Table kept in memory as column arrays sorted by date ascending. Tables are shared by every instance
+    with the same location and table name. Reads are read-only views of the arrays
+    """
+
+    def __init__(self, db_location: str = MEMORY_LOCATION):
+        super().__init__(db_location)
+
+    @property
+    def table(self) -> dict:
+        return __memory_tables__[(self.db_location, self.table_name)]
+
+    def close(self) -> None:
+        pass
+
+    def check_if_table_exists(self) -> bool:
+        return (self.db_location, self.table_name) in __memory_tables__
+
+    def create_table(self) -> None:
+        """
+        Creates the empty table
+        :return:
+        """
+        with __memory_tables_lock__:
+            __memory_tables__.setdefault((self.db_location, self.table_name), {
+                'size': 0,
+                'columns': {column: np.empty(MEMORY_MIN_CAPACITY, dtype=COLUMN_DTYPES[column]) for column in COLUMNS}
+            })
+
+    def drop_table(self) -> None:
+        """
+        Removes the table and frees its memory
+        :return:
+        """
+        with __memory_tables_lock__:
+            __memory_tables__.pop((self.db_location, self.table_name), None)
+
+    def get_columns(self) -> dict:
+        table = self.table
+        size = table['size']
+        columns = {}
+        for column, array in table['columns'].items():
+            columns[column] = array[:size]
+            columns[column].flags.writeable = False
+        return columns
+
+    def update_rows(self, positions: np.array, columns: dict) -> None:
+        for column in COLUMNS[1:]:
+            self.table['columns'][column][positions] = columns[column]
+
+    def append_rows(self, columns: dict) -> None:
+        table = self.table
+        size = table['size']
+        rows = columns['DATE'].shape[0]
+        capacity = table['columns']['DATE'].shape[0]
+        if size + rows > capacity:
+            capacity = max(2 * capacity, size + rows)
+            for column, array in table['columns'].items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:size] = array[:size]
+                table['columns'][column] = grown
+        for column in COLUMNS:
+            table['columns'][column][size:size + rows] = columns[column]
+        table['size'] = size + rows
+
+    def merge_rows(self, current: dict, columns: dict) -> None:
+        merged = merge_columns(current, columns)
+        size = merged['DATE'].shape[0]
+        table = self.table
+        for column, array in merged.items():
+            grown = np.empty(max(2 * size, MEMORY_MIN_CAPACITY), dtype=array.dtype)
+            grown[:size] = array
+            table['columns'][column] = grown
+        table['size'] = size
+
+
+class MemoryCoinModel(MemoryDataBase):
+    """
+    Class to manage the in-memory table of a coin, it is created the first time
+    """
+
+    def __init__(self, logo: str, db_location: str = MEMORY_LOCATION):
+        """
+        Constructor of MemoryCoinModel
+        :param logo: coin logo, it is the table name
+        :param db_location:
+        """
+        super().__init__(db_location)
+        self.table_name = logo
+        self.prepare_table()
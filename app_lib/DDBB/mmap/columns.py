@@ -0,0 +1,204 @@
+"""
+Memory-mapped column storage. Every coin has a directory with a binary file per column (DATE as int64,
+CLOSE, MAXIMUM and MINIMUM as float64) sorted by date. New dates are appended to the files and reads are
+zero-copy NumPy views of the memory-mapped files, so every process reading them shares the OS page cache.
+A single process is expected to write a coin. Rows of an append interrupted by a crash are truncated before
+the next write, so the columns never get shifted. Rewritten columns are written in a new generation
+directory that is published by replacing the CURRENT file, so every column changes at once
+"""
+import os
+import time
+import shutil
+import numpy as np
+from app_lib.DDBB.storage import ColumnStorage, COLUMNS, COLUMN_DTYPES, merge_columns
+from app_lib.utils.files_utils import transform_path
+
+
+MMAP_LOCATION = str(os.getcwd()).split('app_lib')[0] + transform_path('/app_lib/DDBB/mmap/columns')
+CURRENT_FILE = 'CURRENT'  # file with the name of the generation directory of a table
+GENERATION_PREFIX = 'generation-'
+
+
+class MmapDataBase(ColumnStorage):
+    """
+    Column files of a table. Updates of existing dates are written in place, dates before the last one
+    rewrite the files in a new generation directory and publish it replacing the CURRENT file, so readers
+    keep a consistent mapping of the previous generation until they map the new one. The previous
+    generation is kept until the next rewrite for the readers that are mapping it. Tables without CURRENT
+    file have the column files in the table directory
+    """
+
+    def __init__(self, db_location: str = MMAP_LOCATION):
+        super().__init__(db_location)
+        self.__maps = None
+        self.__maps_key = None
+
+    @property
+    def table_path(self) -> str:
+        return os.path.join(self.db_location, self.table_name)
+
+    def get_generation(self) -> str:
+        """
+        Returns the name of the current generation directory, empty if the files are in the table directory
+        :return:
+        """
+        try:
+            with open(os.path.join(self.table_path, CURRENT_FILE)) as file:
+                return file.read().strip()
+        except FileNotFoundError:
+            return ''
+
+    def get_column_path(self, column: str, generation: str = None) -> str:
+        """
+        Returns the path of a column file
+        :param column:
+        :param generation: by default the current one
+        :return:
+        """
+        generation = self.get_generation() if generation is None else generation
+        return os.path.join(self.table_path, generation, f'{column}.bin')
+
+    def get_column_paths(self) -> dict:
+        """
+        Returns the paths of every column file of the current generation, it is resolved once
+        :return: dictionary {column: path}
+        """
+        generation = self.get_generation()
+        return {column: self.get_column_path(column, generation) for column in COLUMNS}
+
+    def close(self) -> None:
+        """
+        Drops the memory maps, they are mapped again on the next read
+        :return:
+        """
+        with self.lock:
+            self.__maps = None
+            self.__maps_key = None
+
+    def check_if_table_exists(self) -> bool:
+        """
+        Checks if every column file exists
+        :return:
+        """
+        return all(os.path.isfile(path) for path in self.get_column_paths().values())
+
+    def create_table(self) -> None:
+        """
+        Creates the empty column files
+        :return:
+        """
+        os.makedirs(self.table_path, exist_ok=True)
+        for path in self.get_column_paths().values():
+            if not os.path.isfile(path):
+                open(path, 'ab').close()
+
+    def prepare_table(self) -> None:
+        """
+        Creates the column files if they do not exist and truncates the rows that are not in every column
+        :return:
+        """
+        super().prepare_table()
+        self.truncate_columns()
+
+    def truncate_columns(self) -> None:
+        """
+        Truncates every column file to the rows of the shortest one. DATE is appended last, so an append
+        interrupted by a crash leaves price values without date that would be shifted by the next append
+        :return:
+        """
+        with self.lock:
+            sizes = {path: os.path.getsize(path) for path in self.get_column_paths().values()}
+            size = min(sizes.values()) // 8 * 8
+            truncated = [path for path, path_size in sizes.items() if path_size != size]
+            for path in truncated:
+                os.truncate(path, size)
+            if truncated:
+                self.close()
+
+    def get_columns(self) -> dict:
+        """
+        Returns read-only memory-mapped views of every column sorted by date ascending. The generation is
+        resolved once, so every column is of the same one. Files are mapped again when they grow or a new
+        generation is published, a column being appended is not counted until every column has it
+        :return: dictionary {column: array}
+        """
+        with self.lock:
+            paths = self.get_column_paths()
+            stats = [os.stat(paths[column]) for column in COLUMNS]
+            size = min(stat.st_size for stat in stats) // 8
+            maps_key = tuple((stat.st_ino, stat.st_size) for stat in stats)
+            if self.__maps_key != maps_key:
+                self.__maps = {
+                    column: np.memmap(paths[column], dtype=COLUMN_DTYPES[column], mode='r', shape=(size,))
+                    if size > 0 else np.empty(0, dtype=COLUMN_DTYPES[column])
+                    for column in COLUMNS
+                }
+                self.__maps_key = maps_key
+            return self.__maps
+
+    def update_rows(self, positions: np.array, columns: dict) -> None:
+        paths = self.get_column_paths()
+        for column in COLUMNS[1:]:
+            array = np.memmap(paths[column], dtype=COLUMN_DTYPES[column], mode='r+')
+            array[positions] = columns[column]
+            array.flush()
+            del array
+
+    def append_rows(self, columns: dict) -> None:
+        # DATE is appended last, so a reader never counts a row without its prices
+        paths = self.get_column_paths()
+        for column in COLUMNS[1:] + COLUMNS[:1]:
+            with open(paths[column], 'ab') as file:
+                file.write(columns[column].tobytes())
+
+    def merge_rows(self, current: dict, columns: dict) -> None:
+        previous = self.get_generation()
+        generation = f'{GENERATION_PREFIX}{time.time_ns()}'
+        os.makedirs(os.path.join(self.table_path, generation))
+        for column, array in merge_columns(current, columns).items():
+            with open(self.get_column_path(column, generation), 'wb') as file:
+                file.write(array.tobytes())
+        self.publish_generation(generation)
+        self.remove_generations((previous, generation))
+        self.close()
+
+    def publish_generation(self, generation: str) -> None:
+        """
+        Makes a generation the current one replacing the CURRENT file, it is a single atomic rename
+        :param generation: name of the generation directory
+        :return:
+        """
+        temporary_path = os.path.join(self.table_path, CURRENT_FILE + '.tmp')
+        with open(temporary_path, 'w') as file:
+            file.write(generation)
+        os.replace(temporary_path, os.path.join(self.table_path, CURRENT_FILE))
+
+    def remove_generations(self, kept: tuple) -> None:
+        """
+        Removes the column files of the generations that are not kept
+        :param kept: names of the kept generations
+        :return:
+        """
+        for entry in os.scandir(self.table_path):
+            if entry.is_dir() and entry.name.startswith(GENERATION_PREFIX) and entry.name not in kept:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        if '' not in kept:
+            for column in COLUMNS:
+                if os.path.isfile(self.get_column_path(column, '')):
+                    os.remove(self.get_column_path(column, ''))
+
+
+class MmapCoinModel(MmapDataBase):
+    """
+    Class to manage the column files of a coin, they are created the first time
+    """
+
+    def __init__(self, logo: str, db_location: str = MMAP_LOCATION):
+        """
+        Constructor of MmapCoinModel
+        :param logo: coin logo, it is the directory name
+        :param db_location:
+        """
+        super().__init__(db_location)
+        self.table_name = logo
+        self.prepare_table()
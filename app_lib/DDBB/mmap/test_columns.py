@@ -0,0 +1,47 @@
+"""
+Tests of the memory-mapped column files: interrupted appends and generations of the merges
+"""
+import os
+import numpy as np
+from app_lib.DDBB.mmap.columns import MmapCoinModel, GENERATION_PREFIX
+
+
+ROWS = [(20200101, 1., 2., .5), (20200102, 2., 3., 1.), (20200104, 4., 5., 3.)]
+
+
+def get_generations(db_model: MmapCoinModel) -> list:
+    return sorted(name for name in os.listdir(db_model.table_path) if name.startswith(GENERATION_PREFIX))
+
+
+def test_mmap_truncates_interrupted_appends(tmp_path):
+    db_model = MmapCoinModel('BTC', str(tmp_path))
+    db_model.set_array_data(ROWS[:2])
+    for column in ('CLOSE', 'MAXIMUM', 'MINIMUM'):
+        with open(db_model.get_column_path(column), 'ab') as file:
+            file.write(np.array([99.]).tobytes())
+    db_model.set_array_data(ROWS[2:])
+    assert db_model.get_data(order='ASC') == ROWS
+    assert len({os.path.getsize(db_model.get_column_path(column)) for column in ('DATE', 'CLOSE')}) == 1
+
+
+def test_merge_publishes_a_new_generation(tmp_path):
+    db_model = MmapCoinModel('BTC', str(tmp_path))
+    db_model.set_array_data(ROWS)
+    assert db_model.get_generation() == ''
+    columns = db_model.get_columns()
+    db_model.set_array_data([(20200103, 3., 4., 2.)])
+    generation = db_model.get_generation()
+    assert generation.startswith(GENERATION_PREFIX)
+    # the views of the previous generation are unchanged
+    assert columns['DATE'].tolist() == [20200101, 20200102, 20200104]
+    assert columns['CLOSE'].tolist() == [1., 2., 4.]
+    assert db_model.get_columns()['DATE'].tolist() == [20200101, 20200102, 20200103, 20200104]
+    assert MmapCoinModel('BTC', str(tmp_path)).get_data(order='ASC')[2] == (20200103, 3., 4., 2.)
+    db_model.set_array_data([(20200105, 5., 6., 4.)])
+    assert db_model.get_generation() == generation
+    db_model.set_array_data([(20191231, 0., 1., 0.)])
+    assert get_generations(db_model) == [generation, db_model.get_generation()]
+    assert not os.path.isfile(db_model.get_column_path('DATE', ''))
+    assert db_model.get_columns()['DATE'].tolist() == [20191231, 20200101, 20200102, 20200103, 20200104, 20200105]
+    db_model.set_array_data([(20191230, 0., 1., 0.)])
+    assert len(get_generations(db_model)) == 2 and generation not in get_generations(db_model)
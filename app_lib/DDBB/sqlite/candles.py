@@ -0,0 +1,215 @@
+"""
+Intraday OHLC candles built from the extracted price ticks
+"""
+import time
+import threading
+from app_lib.DDBB.sqlite.connection import SqliteTable, DB_LOCATION, add_write_listener
+from app_lib.DDBB.sqlite.models import get_model
+from app_lib.DDBB.sqlite.write_queue import get_write_queue
+
+
+INTERVALS = {'1m': 60, '5m': 5 * 60, '1h': 60 * 60, '1d': 24 * 60 * 60}  # candle seconds by name
+CANDLE_FLUSH_SIZE = 200  # completed candles buffered before they are queued in a batch
+DAILY_INTERVAL = '1d'
+__candle_builder__ = []
+__candle_builder_lock__ = threading.Lock()
+
+
+class CandleStore(SqliteTable):
+    """
+    Stored candles clustered by coin, interval and time (WITHOUT ROWID table with primary key
+    (LOGO, INTERVAL, TIME)). Writing a candle that exists merges both, so a candle split by a restart
+    is stored whole
+    """
+
+    table_name = 'CANDLES'
+    insert_query = "INSERT INTO {table_name} VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(LOGO, INTERVAL, TIME) " \
+                   "DO UPDATE SET HIGH = max(HIGH, excluded.HIGH), LOW = min(LOW, excluded.LOW), " \
+                   "CLOSE = excluded.CLOSE, TICKS = TICKS + excluded.TICKS"
+
+    def __init__(self, db_location: str = DB_LOCATION):
+        super().__init__(db_location)
+        if not self.check_if_table_exists():
+            self.create_table()
+
+    def create_table(self) -> None:
+        """
+        Create table if it does not exist
+        :return:
+        """
+        self.cursor.execute(
+            f"CREATE TABLE {self.table_name} (LOGO TEXT NOT NULL, INTERVAL TEXT NOT NULL, TIME INTEGER NOT NULL, "
+            f"OPEN REAL, HIGH REAL, LOW REAL, CLOSE REAL, TICKS INTEGER, PRIMARY KEY (LOGO, INTERVAL, TIME)) "
+            f"WITHOUT ROWID"
+        )
+
+    def get_candles(self, logo: str, interval: str, time_init: int = None, time_end: int = None) -> list:
+        """
+        Returns the candles (TIME, OPEN, HIGH, LOW, CLOSE) of a coin starting between the given unix times
+        sorted by time
+        :param logo:
+        :param interval: name in INTERVALS
+        :param time_init: unix time in seconds
+        :param time_end: unix time in seconds
+        :return:
+        """
+        self.cursor.execute(
+            f"SELECT TIME, OPEN, HIGH, LOW, CLOSE FROM {self.table_name} WHERE LOGO = ? AND INTERVAL = ? "
+            f"AND TIME >= ? AND TIME <= ? ORDER BY TIME",
+            (logo, interval, time_init if time_init is not None else 0, time_end if time_end is not None else 2 ** 62)
+        )
+        return self.cursor.fetchall()
+
+
+class CandleBuilder:
+    """
+    Builds the candles of every interval from the ticks of extractor.run(). Only the open candle of
+    every coin and interval is kept in memory, completed ones are buffered and written in batches. Reads
+    merge the stored candles with the open, buffered and queued ones, so they never wait for the write queue.
+    Completed daily candles that were seen from the start of the day are also saved as the daily row
+    (DATE, CLOSE, MAXIMUM, MINIMUM) of the coin, so the historical scrape is not needed to get them
+    """
+
+    def __init__(self, store: CandleStore = None, intervals: dict = None, flush_size: int = CANDLE_FLUSH_SIZE,
+                 save_daily: bool = True):
+        """
+        Constructor of CandleBuilder
+        :param store: by default a new CandleStore
+        :param intervals: candle seconds by name, by default INTERVALS. Intervals are aligned to UTC
+        :param flush_size: completed candles buffered before they are queued
+        :param save_daily: save completed daily candles in the coin tables
+        """
+        self.store = store if store is not None else CandleStore()
+        self.intervals = intervals if intervals is not None else INTERVALS
+        self.flush_size = flush_size
+        self.save_daily = save_daily
+        # {(logo, interval): [time, open, high, low, close, ticks, seen from start]}
+        self.__open_candles = {}
+        self.__completed = []
+        self.__pending = {}  # {(logo, interval, time): candle row} queued and not committed yet
+        self.__daily_rows = {}
+        self.__lock = threading.Lock()
+
+    def add_tick(self, data: list, tick_time: float = None) -> None:
+        """
+        Adds the prices of a tick to the open candles
+        :param data: list of prepare_row dictionaries
+        :param tick_time: unix time in seconds, by default now
+        :return:
+        """
+        tick_time = int(time.time()) if tick_time is None else int(tick_time)
+        with self.__lock:
+            for item in data:
+                if item['logo'] and item['amount']:
+                    for interval, seconds in self.intervals.items():
+                        self.__add_price(item['logo'], interval, tick_time - tick_time % seconds, item['amount'])
+            flush = len(self.__completed) >= self.flush_size
+        if flush:
+            self.flush()
+
+    def __add_price(self, logo: str, interval: str, candle_time: int, price: float) -> None:
+        key = (logo, interval)
+        candle = self.__open_candles.get(key)
+        if candle is not None and candle[0] == candle_time:
+            candle[2] = max(candle[2], price)
+            candle[3] = min(candle[3], price)
+            candle[4] = price
+            candle[5] += 1
+            return
+        if candle is not None and candle[0] < candle_time:
+            self.__complete(logo, interval, candle)
+        # the first candle of a coin after start might have missed ticks
+        self.__open_candles[key] = [candle_time, price, price, price, price, 1, candle is not None]
+
+    def __complete(self, logo: str, interval: str, candle: list) -> None:
+        self.__completed.append((logo, interval) + tuple(candle[:6]))
+        if self.save_daily and interval == DAILY_INTERVAL and candle[6]:
+            date = int(time.strftime('%Y%m%d', time.gmtime(candle[0])))
+            self.__daily_rows.setdefault(logo, []).append((date, candle[4], candle[2], candle[3]))
+
+    def flush(self, open_candles: bool = False) -> None:
+        """
+        Queues the completed candles to be written
+        :param open_candles: also writes the open candles, they are started again, used before stopping
+        :return:
+        """
+        with self.__lock:
+            if open_candles:
+                for (logo, interval), candle in self.__open_candles.items():
+                    self.__completed.append((logo, interval) + tuple(candle[:6]))
+                self.__open_candles = {}
+            completed, self.__completed = self.__completed, []
+            daily_rows, self.__daily_rows = self.__daily_rows, {}
+            for row in completed:
+                key = row[:3]
+                self.__pending[key] = merge_candles(self.__pending[key], row) if key in self.__pending else row
+        write_queue = get_write_queue(self.store.db_location)
+        write_queue.put(self.store, completed)
+        for logo, rows in daily_rows.items():
+            db_object = get_model(logo)
+            if db_object is not None:
+                write_queue.put(db_object, rows)
+
+    def on_write(self, db_location: str, table_name: str, tuples_array: list) -> None:
+        """
+        Write listener, committed candles are no longer pending
+        :param db_location:
+        :param table_name:
+        :param tuples_array:
+        :return:
+        """
+        if db_location == self.store.db_location and table_name == self.store.table_name:
+            with self.__lock:
+                for row in tuples_array:
+                    self.__pending.pop(tuple(row[:3]), None)
+
+    def get_candles(self, logo: str, interval: str, time_init: int = None, time_end: int = None) -> list:
+        """
+        Returns the candles (TIME, OPEN, HIGH, LOW, CLOSE) of a coin starting between the given unix times
+        sorted by time: the stored ones merged with the ones not written yet and the open one
+        :param logo:
+        :param interval: name in intervals
+        :param time_init: unix time in seconds
+        :param time_end: unix time in seconds
+        :return:
+        """
+        time_init = time_init if time_init is not None else 0
+        time_end = time_end if time_end is not None else 2 ** 62
+        candles = {
+            row[0]: (logo, interval) + tuple(row) for row in self.store.get_candles(logo, interval, time_init, time_end)
+        }
+        with self.__lock:
+            unwritten = [row for key, row in self.__pending.items() if key[:2] == (logo, interval)]
+            unwritten += [row for row in self.__completed if row[:2] == (logo, interval)]
+            candle = self.__open_candles.get((logo, interval))
+            if candle is not None:
+                unwritten.append((logo, interval) + tuple(candle[:5]))
+        for row in unwritten:
+            if time_init <= row[2] <= time_end:
+                candles[row[2]] = merge_candles(candles[row[2]], row) if row[2] in candles else row
+        return [tuple(candles[candle_time][2:7]) for candle_time in sorted(candles)]
+
+
+def merge_candles(candle: tuple, following: tuple) -> tuple:
+    """
+    Returns the candle of both parts of a candle, as the insert query of CandleStore
+    :param candle: row (LOGO, INTERVAL, TIME, OPEN, HIGH, LOW, CLOSE, ...) of the first part
+    :param following: row of the following part
+    :return: row with the TICKS of both parts, if they have them
+    """
+    return candle[:4] + (max(candle[4], following[4]), min(candle[5], following[5]), following[6]) + \
+        tuple(ticks + following_ticks for ticks, following_ticks in zip(candle[7:], following[7:]))
+
+
+def get_candle_builder() -> CandleBuilder:
+    """
+    Returns the candle builder of the app, shared by the extractor and the readers, it is created the first time
+    :return:
+    """
+    if not __candle_builder__:
+        with __candle_builder_lock__:
+            if not __candle_builder__:
+                candle_builder = CandleBuilder()
+                add_write_listener(candle_builder.on_write)
+                __candle_builder__.append(candle_builder)
+    return __candle_builder__[0]
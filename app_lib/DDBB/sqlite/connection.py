@@ -3,39 +3,159 @@ SQLite managing class definition
 """
 import sqlite3
 import os
+import threading
 import traceback
+from functools import lru_cache
+import numpy as np
 from sqlite3 import Error, DatabaseError
+from app_lib.DDBB.storage import Storage, COLUMNS, COLUMN_DTYPES, AGGREGATES, ORDERS, DATE_MIN, DATE_MAX, \
+    add_write_listener, notify_write
 from app_lib.utils.files_utils import transform_path
 
 
-class DataBase:
+DB_LOCATION = str(os.getcwd()).split('app_lib')[0] + transform_path('/app_lib/DDBB/sqlite/crypto_database')
+BUSY_TIMEOUT = 10.  # seconds a write waits for the database lock
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept by every connection, reused when the query text repeats
+# WAL journal: readers do not block the writer and the writer does not block readers
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # with WAL it only syncs at checkpoints, a crash can not corrupt the database
+    'cache_size': -16000,  # negative values are KiB, 16 MB of page cache per connection
+    'mmap_size': 256 * 1024 * 1024,  # reads are served from the memory mapped file
+    'temp_store': 'MEMORY'
+}
+__thread_data__ = threading.local()
+__pragmas__ = {}
+
+
+def set_pragmas(db_location: str = DB_LOCATION, **pragmas) -> None:
+    """
+    Sets the pragmas of the connections opened from now on to the database, the others keep the PRAGMAS ones
+    :param db_location:
+    :param pragmas: pragma name and value, None removes the pragma. Ex: journal_mode='DELETE'
+    :return:
+    """
+    db_pragmas = dict(__pragmas__.get(db_location, PRAGMAS))
+    db_pragmas.update(pragmas)
+    __pragmas__[db_location] = {name: value for name, value in db_pragmas.items() if value is not None}
+
+
+def configure_connection(connection: sqlite3.Connection, pragmas: dict = None) -> None:
+    """
+    Applies the pragmas to a new connection
+    :param connection:
+    :param pragmas: by default PRAGMAS
+    :return:
+    """
+    cursor = connection.cursor()
+    for name, value in (PRAGMAS if pragmas is None else pragmas).items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+def get_connection(db_location: str = DB_LOCATION) -> tuple:
+    """
+    Returns the connection and cursor of the current thread to the database, they are opened the
+    first time the thread asks for them. SQLite connections can not be shared between threads
+    :param db_location:
+    :return: tuple (connection, cursor)
+    """
+    connections = getattr(__thread_data__, 'connections', None)
+    if connections is None:
+        connections = __thread_data__.connections = {}
+    if db_location not in connections:
+        connection = sqlite3.connect(db_location, timeout=BUSY_TIMEOUT, cached_statements=STATEMENT_CACHE_SIZE)
+        configure_connection(connection, __pragmas__.get(db_location))
+        connections[db_location] = (connection, connection.cursor())
+    return connections[db_location]
+
+
+def close_connection(db_location: str = DB_LOCATION) -> None:
+    """
+    Closes the connection of the current thread to the database
+    :param db_location:
+    :return:
+    """
+    connections = getattr(__thread_data__, 'connections', {})
+    if db_location in connections:
+        connections.pop(db_location)[0].close()
+
+
+def get_select_expression(columns: tuple = None, aggregates: tuple = None, valid_columns: tuple = COLUMNS) -> str:
+    """
+    Returns the checked expression of the selected columns
+    :param columns: column names, by default every column
+    :param aggregates: tuple of (function, column) pairs, they are selected instead of columns.
+    Ex: (('max', 'MAXIMUM'), ('min', 'MINIMUM'))
+    :param valid_columns:
+    :return:
     """
-    Main class to manage SQLite database
+    if aggregates:
+        for function, column in aggregates:
+            if function.lower() not in AGGREGATES or column.upper() not in valid_columns:
+                raise ValueError(f'Invalid aggregate {function}({column})')
+        return ', '.join(f'{function.lower()}({column.upper()})' for function, column in aggregates)
+    columns = columns or valid_columns
+    for column in columns:
+        if column.upper() not in valid_columns:
+            raise ValueError(f'Invalid column {column}')
+    return ', '.join(column.upper() for column in columns)
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def get_select_query(table_name: str, columns: tuple = None, aggregates: tuple = None, order: str = 'DESC') -> str:
+    """
+    Returns the parameterized query of the DataBase.get_data arguments. The text only depends on them, so
+    the connections reuse its prepared statement. Parameters: date_init, date_end, limit
+    :param table_name:
+    :param columns:
+    :param aggregates:
+    :param order: 'ASC' or 'DESC' by DATE, it is ignored with aggregates
+    :return:
+    """
+    order = order.upper()
+    if order not in ORDERS:
+        raise ValueError(f'Invalid order {order}')
+    get_query = f"SELECT {get_select_expression(columns, aggregates)} FROM {table_name} WHERE DATE >= ? AND DATE <= ?"
+    if not aggregates:
+        get_query += f" ORDER BY DATE {order}"
+    return get_query + " LIMIT ?"
+
+
+class SqliteTable:
+    """
+    Table of the SQLite database with its insert query. Instances can be shared between threads, every
+    thread uses its own connection
     """
 
-    insert_query = "INSERT INTO {table_name} VALUES (?, ? ,? ,?)"
+    insert_query = ''
     table_name = ''
 
-    def __init__(self):
-        db_location = str(os.getcwd()).split('app_lib')[0] + transform_path('/app_lib/DDBB/sqlite/crypto_database')
-        self.connection = sqlite3.connect(db_location)
-        self.cursor = self.connection.cursor()
+    def __init__(self, db_location: str = DB_LOCATION):
+        self.db_location = db_location
 
-    def close(self) -> None:
+    @property
+    def connection(self) -> sqlite3.Connection:
         """
-        Close the current open connection
+        Connection of the current thread
         :return:
         """
-        self.connection.close()
+        return get_connection(self.db_location)[0]
 
-    def create_table(self) -> None:
+    @property
+    def cursor(self) -> sqlite3.Cursor:
         """
-        Create table if it does not exist
+        Cursor of the current thread
         :return:
         """
-        self.cursor.execute(
-            f"CREATE TABLE {self.table_name} (DATE INTEGER, CLOSE REAL, MAXIMUM REAL, MINIMUM REAL)"
-        )
+        return get_connection(self.db_location)[1]
+
+    def close(self) -> None:
+        """
+        Close the current thread open connection
+        :return:
+        """
+        close_connection(self.db_location)
 
     def check_if_table_exists(self) -> bool:
         """
@@ -52,7 +172,7 @@ class DataBase:
 
     def set_array_data(self, tuples_array: list) -> None:
         """
-        Insert many rows into the database
+        Insert many rows into the database with the insert query
         :param tuples_array:
         :return:
         """
@@ -61,10 +181,11 @@ class DataBase:
             tuples_array
         )
         self.connection.commit()
+        notify_write(self.db_location, self.table_name, tuples_array)
 
     def set_data(self, tuple_data: tuple) -> None:
         """
-        Insert a row into the database
+        Insert a row into the database with the insert query
         :param tuple_data:
         :return:
         """
@@ -73,37 +194,160 @@ class DataBase:
             tuple_data
         )
         self.connection.commit()
+        notify_write(self.db_location, self.table_name, [tuple_data])
+
+
+class DataBase(SqliteTable, Storage):
+    """
+    Table of a coin in the SQLite database, the SQLite storage backend. Rows with an existing date are updated
+    """
 
-    def get_data(self, date_init: int = None, date_end: int = None, select_columns: str = '*'):
+    insert_query = "INSERT INTO {table_name} VALUES (?, ?, ?, ?) ON CONFLICT(DATE) DO UPDATE SET " \
+                   "CLOSE = excluded.CLOSE, MAXIMUM = excluded.MAXIMUM, MINIMUM = excluded.MINIMUM"
+
+    def __init__(self, db_location: str = DB_LOCATION):
+        super().__init__(db_location)
+
+    def create_table(self, table_name: str = None) -> None:
+        """
+        Create table if it does not exist. Rows are clustered by their DATE primary key
+        :param table_name: by default the model table
+        :return:
+        """
+        self.cursor.execute(
+            f"CREATE TABLE {table_name or self.table_name} (DATE INTEGER PRIMARY KEY NOT NULL, CLOSE REAL, "
+            f"MAXIMUM REAL, MINIMUM REAL) WITHOUT ROWID"
+        )
+
+    def prepare_table(self) -> None:
+        """
+        Creates the table if it does not exist and migrates it if it has the old schema
+        :return:
+        """
+        if not self.check_if_table_exists():
+            self.create_table()
+        elif not self.check_if_table_migrated():
+            self.migrate_table()
+
+    def check_if_table_migrated(self) -> bool:
+        """
+        Checks if the table has DATE as primary key
+        :return:
+        """
+        self.cursor.execute(f"PRAGMA table_info({self.table_name})")
+        # rows: (cid, name, type, notnull, dflt_value, pk)
+        return any(column[1].upper() == 'DATE' and column[5] > 0 for column in self.cursor.fetchall())
+
+    def migrate_table(self) -> tuple:
+        """
+        Migrates the table from the old heap schema to the DATE primary key one. Repeated dates are
+        removed keeping the last inserted row
+        :return: tuple (rows before, rows after) migration
+        """
+        old_table = f"{self.table_name}_OLD"
+        connection = self.connection
+        connection.commit()
+        try:
+            self.cursor.execute("BEGIN IMMEDIATE")
+            if self.check_if_table_migrated():
+                self.cursor.execute(f"SELECT count(*) FROM {self.table_name}")
+                rows = self.cursor.fetchone()[0]
+                connection.rollback()
+                return rows, rows
+            self.cursor.execute(f"SELECT count(*) FROM {self.table_name}")
+            rows_before = self.cursor.fetchone()[0]
+            self.cursor.execute(f"ALTER TABLE {self.table_name} RENAME TO {old_table}")
+            self.create_table()
+            self.cursor.execute(
+                f"INSERT INTO {self.table_name} SELECT DATE, CLOSE, MAXIMUM, MINIMUM FROM {old_table} "
+                f"WHERE rowid IN (SELECT max(rowid) FROM {old_table} WHERE DATE IS NOT NULL GROUP BY DATE)"
+            )
+            self.cursor.execute(f"DROP TABLE {old_table}")
+            self.cursor.execute(f"SELECT count(*) FROM {self.table_name}")
+            rows_after = self.cursor.fetchone()[0]
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        return rows_before, rows_after
+
+    def get_data(self, date_init: int = None, date_end: int = None, columns: tuple = None, order: str = 'DESC',
+                 limit: int = None, aggregates: tuple = None) -> list:
         """
         Search and return data between given dates
         :param date_init: integer with YYYYMMDD form
         :param date_end: integer with YYYYMMDD form
-        :param select_columns: columns to select from database
+        :param columns: column names to select, by default every column. Ex: ('DATE', 'CLOSE')
+        :param order: 'ASC' or 'DESC' by DATE
+        :param limit: maximum number of rows
+        :param aggregates: tuple of (function, column) pairs selected instead of columns, a single row is
+        returned. Ex: (('max', 'MAXIMUM'), ('min', 'MINIMUM'))
         :return:
         """
-        get_query = f"SELECT {select_columns} FROM {self.table_name}"
-        if date_init or date_end:
-            get_query = get_query + " WHERE "
-            if date_init:
-                get_query = get_query + f"date >= {date_init}"
-            if date_end:
-                if date_init:
-                    get_query = get_query + " AND "
-                get_query = get_query + f"date <= {date_end}"
-        get_query += " ORDER BY DATE DESC"
-        self.cursor.execute(get_query)
+        self.cursor.execute(
+            get_select_query(
+                self.table_name, columns and tuple(columns), aggregates and tuple(map(tuple, aggregates)), order
+            ),
+            (date_init or DATE_MIN, date_end or DATE_MAX, -1 if limit is None else limit)
+        )
         return self.cursor.fetchall()
 
+    def get_arrays(self, date_init: int = None, date_end: int = None, columns: tuple = COLUMNS, order: str = 'DESC',
+                   limit: int = None) -> dict:
+        """
+        Search and return data between given dates as contiguous column arrays, DATE as int64 and prices
+        as float64. Rows are read from the cursor straight into the arrays without building a list of them
+        :param date_init: integer with YYYYMMDD form
+        :param date_end: integer with YYYYMMDD form
+        :param columns: column names to select
+        :param order: 'ASC' or 'DESC' by DATE
+        :param limit: maximum number of rows
+        :return: dictionary {column: array}
+        """
+        columns = tuple(column.upper() for column in columns)
+        get_query = get_select_query(self.table_name, columns, None, order)
+        parameters = (date_init or DATE_MIN, date_end or DATE_MAX, -1 if limit is None else limit)
+        dtype = np.dtype([(column, COLUMN_DTYPES[column]) for column in columns])
+        try:
+            rows = np.fromiter(self.cursor.execute(get_query, parameters), dtype=dtype)
+        except TypeError:
+            # NULL prices can not be read as float64 by fromiter, they are converted to NaN
+            rows = self.cursor.execute(get_query, parameters).fetchall()
+            return {
+                column: np.array([row[index] for row in rows], dtype=np.float64).astype(COLUMN_DTYPES[column])
+                for index, column in enumerate(columns)
+            }
+        return {column: np.ascontiguousarray(rows[column]) for column in columns}
+
     def get_close_prices(self, date_init: int = None, date_end: int = None):
         return_data = []
         try:
-            return_data = self.get_data(
-                date_init=date_init, date_end=date_end, select_columns='DATE, CLOSE'
-            )
+            return_data = self.get_data(date_init=date_init, date_end=date_end, columns=('DATE', 'CLOSE'))
         except Error as ex:
             print('%s\n%s', ex, traceback.format_exc())
         except Exception as ex:
             print('%s\n%s', ex, traceback.format_exc())
         finally:
             return return_data
+
+    def iter_rows(self, date_init: int = None, date_end: int = None, chunk_size: int = 50000):
+        """
+        Yields the rows (DATE, CLOSE, MAXIMUM, MINIMUM) between given dates in chunks sorted by date, they are
+        fetched from a cursor of their own chunk by chunk
+        :param date_init: integer with YYYYMMDD form
+        :param date_end: integer with YYYYMMDD form
+        :param chunk_size:
+        :return: generator of lists of rows
+        """
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                get_select_query(self.table_name, COLUMNS, None, 'ASC'),
+                (date_init or DATE_MIN, date_end or DATE_MAX, -1)
+            )
+            rows = cursor.fetchmany(chunk_size)
+            while rows:
+                yield rows
+                rows = cursor.fetchmany(chunk_size)
+        finally:
+            cursor.close()
@@ -0,0 +1,135 @@
+"""
+Indicators of every coin computed by the nightly refresh and by the streaming indicators, so readers do not
+compute them
+"""
+import json
+from app_lib.DDBB.sqlite.connection import SqliteTable, DB_LOCATION
+
+
+INDICATOR_COLUMNS = ('CLOSE', 'EMA', 'SMA', 'MACD', 'SIGNAL', 'RSI')
+STREAMING_COLUMNS = INDICATOR_COLUMNS + ('RSI_WILDER',)  # streaming indicators also have the Wilder RSI
+
+
+class IndicatorStore(SqliteTable):
+    """
+    Indicators by coin and date (WITHOUT ROWID table with primary key (LOGO, DATE)), the last date of a coin
+    is a single index seek
+    """
+
+    table_name = 'INDICATORS'
+    insert_query = "INSERT OR REPLACE INTO {table_name} VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+    def __init__(self, db_location: str = DB_LOCATION):
+        super().__init__(db_location)
+        if not self.check_if_table_exists():
+            self.create_table()
+
+    def create_table(self) -> None:
+        """
+        Create table if it does not exist
+        :return:
+        """
+        self.cursor.execute(
+            f"CREATE TABLE {self.table_name} (LOGO TEXT NOT NULL, DATE INTEGER NOT NULL, "
+            f"{', '.join(f'{column} REAL' for column in INDICATOR_COLUMNS)}, PRIMARY KEY (LOGO, DATE)) WITHOUT ROWID"
+        )
+
+    def set_indicators(self, indicators: dict) -> None:
+        """
+        Saves the indicators of the coins
+        :param indicators: dictionary {logo: {'date': date, indicator: value}} with lower case column names
+        :return:
+        """
+        self.set_array_data([
+            (logo, values['date']) + tuple(values.get(column.lower()) for column in INDICATOR_COLUMNS)
+            for logo, values in indicators.items()
+        ])
+
+    def get_latest(self, logos: list = None, date: int = None) -> dict:
+        """
+        Returns the indicators of the coins at their last date up to the given one
+        :param logos: by default every coin with indicators
+        :param date: integer with YYYYMMDD form, by default the last one
+        :return: dictionary {logo: {'date': date, indicator: value}} with lower case column names
+        """
+        if logos is None:
+            self.cursor.execute(f"SELECT DISTINCT LOGO FROM {self.table_name}")
+            logos = [row[0] for row in self.cursor.fetchall()]
+        logos = list(dict.fromkeys(logos))
+        if not logos:
+            return {}
+        self.cursor.execute(
+            " UNION ALL ".join(
+                f"SELECT * FROM (SELECT * FROM {self.table_name} WHERE LOGO = ? AND DATE <= ? "
+                f"ORDER BY DATE DESC LIMIT 1)" for _ in logos
+            ),
+            [parameter for logo in logos for parameter in (logo, date or 2 ** 62)]
+        )
+        return {
+            row[0]: dict(zip(('date',) + tuple(column.lower() for column in INDICATOR_COLUMNS), row[1:]))
+            for row in self.cursor.fetchall()
+        }
+
+
+class IndicatorStateStore(SqliteTable):
+    """
+    Last indicators of every coin updated by the streaming indicators, with the JSON state of the stream
+    so it continues after a restart
+    """
+
+    table_name = 'INDICATOR_STATES'
+    insert_query = "INSERT OR REPLACE INTO {table_name} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+    def __init__(self, db_location: str = DB_LOCATION):
+        super().__init__(db_location)
+        if not self.check_if_table_exists():
+            self.create_table()
+
+    def create_table(self) -> None:
+        """
+        Create table if it does not exist
+        :return:
+        """
+        self.cursor.execute(
+            f"CREATE TABLE {self.table_name} (LOGO TEXT PRIMARY KEY NOT NULL, DATE INTEGER, "
+            f"{', '.join(f'{column} REAL' for column in STREAMING_COLUMNS)}, STATE TEXT) WITHOUT ROWID"
+        )
+
+    @staticmethod
+    def get_row(logo: str, values: dict, state: dict) -> tuple:
+        """
+        Returns the row of a coin to be inserted
+        :param logo:
+        :param values: dictionary {'date': date, indicator: value} with lower case column names
+        :param state: stream state saved as JSON
+        :return:
+        """
+        return (logo, values['date']) + tuple(values.get(column.lower()) for column in STREAMING_COLUMNS) + \
+            (json.dumps(state),)
+
+    def get_state(self, logo: str):
+        """
+        Returns the saved state of the stream of a coin
+        :param logo:
+        :return: dictionary or None if it is not saved
+        """
+        self.cursor.execute(f"SELECT STATE FROM {self.table_name} WHERE LOGO = ?", (logo,))
+        row = self.cursor.fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def get_values(self, logos: list = None) -> dict:
+        """
+        Returns the last indicators of the coins
+        :param logos: by default every coin with state
+        :return: dictionary {logo: {'date': date, indicator: value}} with lower case column names
+        """
+        query = f"SELECT LOGO, DATE, {', '.join(STREAMING_COLUMNS)} FROM {self.table_name}"
+        if logos is None:
+            self.cursor.execute(query)
+        else:
+            logos = list(dict.fromkeys(logos))
+            self.cursor.execute(f"{query} WHERE LOGO IN ({', '.join('?' for _ in logos)})", logos)
+        return {
+            row[0]: dict(zip(('date',) + tuple(column.lower() for column in STREAMING_COLUMNS), row[1:]))
+            for row in self.cursor.fetchall()
+        }
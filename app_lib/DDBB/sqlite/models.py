@@ -1,84 +1,180 @@
 """
-Different models to use, each model has its own table in database
+Coin models, each coin in logos.json has its own table in database named as its logo. Tables are stored in
+the backend set in storage.json: the SQLite database, memory-mapped column files ('mmap') or memory
 """
-from app_lib.DDBB.sqlite.connection import DataBase
+import threading
+from functools import lru_cache
+from app_lib.configuration.tools.logos import get_logos
+from app_lib.configuration.tools.storage import get_storage_backend
+from app_lib.DDBB.sqlite.connection import DataBase, get_select_expression, STATEMENT_CACHE_SIZE, ORDERS, \
+    DATE_MIN, DATE_MAX
+from app_lib.DDBB.sqlite.rollups import get_rollup_store
+from app_lib.DDBB.mmap.columns import MmapCoinModel
+from app_lib.DDBB.memory.tables import MemoryCoinModel
+
+
+SQLITE_BACKEND = 'sqlite'
+MMAP_BACKEND = 'mmap'
+MEMORY_BACKEND = 'memory'
+BACKENDS = (SQLITE_BACKEND, MMAP_BACKEND, MEMORY_BACKEND)
+__models__ = {}
+__models_lock__ = threading.Lock()
+__model_names__ = []
+__model_backend__ = []
+
+
+def set_model_backend(backend: str) -> None:
+    """
+    Selects the storage of the coin tables instead of the one in storage.json, models created before
+    are discarded
+    :param backend: 'sqlite', 'mmap' or 'memory'
+    :return:
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'Invalid backend {backend}')
+    with __models_lock__:
+        __model_backend__[:] = [backend]
+        __models__.clear()
 
 
-def get_model(model_name: str):
+def get_model_backend() -> str:
     """
-    Given a model name this function returns the selected model
-    :param model_name:
+    Returns the storage of the coin tables, the one in storage.json unless another one is set
     :return:
     """
-    model = None
-    if model_name == 'BTC':
-        model = BTC()
-    elif model_name == 'ETH':
-        model = ETH()
-    elif model_name == 'ADA':
-        model = ADA()
-    elif model_name == 'TRX':
-        model = TRX()
-    elif model_name == 'XLM':
-        model = XLM()
-    return model
+    if not __model_backend__:
+        backend = get_storage_backend()
+        set_model_backend(backend if backend in BACKENDS else SQLITE_BACKEND)
+    return __model_backend__[0]
 
 
-class BTC(DataBase):
+def get_model_class(backend: str):
     """
-    Class to manage BTC table
+    Returns the coin model class of the backend
+    :param backend:
+    :return:
     """
-
-    def __init__(self):
-        super().__init__()
-        self.table_name = "BTC"
-        if not self.check_if_table_exists():
-            self.create_table()
+    if backend == MMAP_BACKEND:
+        return MmapCoinModel
+    if backend == MEMORY_BACKEND:
+        return MemoryCoinModel
+    return CoinModel
 
 
-class ETH(DataBase):
+def get_model(model_name: str):
     """
-    Class to manage ETH table
+    Given a model name (coin logo) this function returns the selected model. Models are created once
+    and shared by every thread, so the table check is only done the first time
+    :param model_name:
+    :return: model of the backend, CoinModel with 'sqlite', or None if the logo is not in logos.json
     """
-
-    def __init__(self):
-        super().__init__()
-        self.table_name = "ETH"
-        if not self.check_if_table_exists():
-            self.create_table()
+    model = __models__.get(model_name)
+    if model is None and model_name in get_model_names():
+        backend = get_model_backend()
+        with __models_lock__:
+            model = __models__.get(model_name)
+            if model is None:
+                model = get_model_class(backend)(model_name)
+                get_rollup_store().add_table(model)
+                __models__[model_name] = model
+    return model
 
 
-class TRX(DataBase):
+def get_model_names() -> list:
     """
-    Class to manage TRX table
+    Returns the logo of every coin in logos.json, the file is read only the first time
+    :return:
     """
-
-    def __init__(self):
-        super().__init__()
-        self.table_name = "TRX"
-        if not self.check_if_table_exists():
-            self.create_table()
+    if not __model_names__:
+        with __models_lock__:
+            if not __model_names__:
+                # logos are used as table names, so only alphanumeric ones are valid
+                __model_names__.extend(
+                    logo for logo in dict.fromkeys(get_logos().values()) if logo and logo.isalnum()
+                )
+    return __model_names__
 
 
-class ADA(DataBase):
+def init_models() -> None:
     """
-    Class to manage ADA table
+    Creates every model at startup, checking and creating their tables
+    :return:
     """
-
-    def __init__(self):
-        super().__init__()
-        self.table_name = "ADA"
-        if not self.check_if_table_exists():
-            self.create_table()
+    for model_name in get_model_names():
+        get_model(model_name)
 
 
-class XLM(DataBase):
+def get_models_data(model_names: list, date_init: int = None, date_end: int = None, columns: tuple = None,
+                    order: str = 'DESC', aggregates: tuple = None) -> dict:
+    """
+    Returns the data of several coins between given dates with a single query (UNION ALL of the
+    coin tables) instead of a query per coin. Models out of the SQLite database are read one by one
+    :param model_names: coin logos, the ones without model are ignored
+    :param date_init: integer with YYYYMMDD form
+    :param date_end: integer with YYYYMMDD form
+    :param columns: column names to select, by default every column
+    :param order: 'ASC' or 'DESC' by DATE of the rows of each coin, it is ignored with aggregates or when
+    DATE is not selected
+    :param aggregates: tuple of (function, column) pairs selected instead of columns, a row per coin
+    :return: dictionary {logo: rows}
+    """
+    models = [model for model in map(get_model, dict.fromkeys(model_names)) if model is not None]
+    if not models:
+        return {}
+    if not isinstance(models[0], DataBase):
+        return {
+            model.table_name: model.get_data(date_init, date_end, columns, order, aggregates=aggregates)
+            for model in models
+        }
+    get_query = get_models_query(
+        tuple(model.table_name for model in models), columns and tuple(columns),
+        aggregates and tuple(map(tuple, aggregates)), order
+    )
+    parameters = []
+    for model in models:
+        parameters.extend((model.table_name, date_init or DATE_MIN, date_end or DATE_MAX))
+    cursor = models[0].cursor
+    cursor.execute(get_query, parameters)
+    models_data = {model.table_name: [] for model in models}
+    for row in cursor.fetchall():
+        models_data[row[0]].append(row[1:])
+    return models_data
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def get_models_query(table_names: tuple, columns: tuple = None, aggregates: tuple = None, order: str = 'DESC') -> str:
+    """
+    Returns the parameterized query of get_models_data. Parameters: logo, date_init and date_end of every table
+    :param table_names:
+    :param columns:
+    :param aggregates:
+    :param order:
+    :return:
+    """
+    order = order.upper()
+    if order not in ORDERS:
+        raise ValueError(f'Invalid order {order}')
+    select_expression = get_select_expression(columns, aggregates)
+    get_query = " UNION ALL ".join(
+        f"SELECT ? AS LOGO, {select_expression} FROM {table_name} WHERE DATE >= ? AND DATE <= ?"
+        for table_name in table_names
+    )
+    # a compound select can only be sorted by selected columns
+    if aggregates or (columns and 'DATE' not in map(str.upper, columns)):
+        return get_query + " ORDER BY LOGO"
+    return get_query + f" ORDER BY LOGO, DATE {order}"
+
+
+class CoinModel(DataBase):
     """
-    Class to manage XLM table
+    Class to manage the table of a coin, the table is created or migrated the first time
     """
 
-    def __init__(self):
+    def __init__(self, logo: str):
+        """
+        Constructor of CoinModel
+        :param logo: coin logo, it is the table name
+        """
         super().__init__()
-        self.table_name = "XLM"
-        if not self.check_if_table_exists():
-            self.create_table()
+        self.table_name = logo
+        self.prepare_table()
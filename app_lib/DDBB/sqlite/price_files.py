@@ -0,0 +1,193 @@
+"""
+Bulk import and export of the coin tables as CSV, Parquet or Arrow files. Files are read and written in
+chunks of rows, so they are never loaded whole in memory, and every imported chunk is a transaction.
+Files have a row per coin and date with columns LOGO, DATE, CLOSE, MAXIMUM, MINIMUM.
+Parquet and Arrow need pyarrow
+"""
+import csv
+import os
+from collections import defaultdict
+from app_lib.DDBB.sqlite.connection import DataBase, COLUMNS, notify_write
+from app_lib.DDBB.sqlite.models import get_model, get_model_names
+from app_lib.log.log import get_log
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+__logger__ = get_log('price_files')
+CHUNK_SIZE = 50000  # rows read, written and committed together
+CSV = 'csv'
+PARQUET = 'parquet'
+ARROW = 'arrow'
+FORMATS = {'.csv': CSV, '.parquet': PARQUET, '.pq': PARQUET, '.arrow': ARROW, '.feather': ARROW}
+FILE_COLUMNS = ('LOGO',) + COLUMNS
+
+
+def get_file_format(file_path: str, file_format: str = None) -> str:
+    """
+    Returns the file format, by default from the file extension
+    :param file_path:
+    :param file_format: 'csv', 'parquet' or 'arrow'
+    :return:
+    """
+    file_format = file_format or FORMATS.get(os.path.splitext(file_path)[1].lower())
+    if file_format not in (CSV, PARQUET, ARROW):
+        raise ValueError(f'Unknown format of {file_path}, use one of {", ".join(sorted(FORMATS))}')
+    if file_format != CSV and pa is None:
+        raise ImportError(f'pyarrow is needed to use {file_format} files')
+    return file_format
+
+
+def get_arrow_schema():
+    return pa.schema([
+        ('LOGO', pa.string()), ('DATE', pa.int64()), ('CLOSE', pa.float64()),
+        ('MAXIMUM', pa.float64()), ('MINIMUM', pa.float64())
+    ])
+
+
+def iter_table_chunks(logos: list = None, date_init: int = None, date_end: int = None,
+                      chunk_size: int = CHUNK_SIZE):
+    """
+    Yields the rows (LOGO, DATE, CLOSE, MAXIMUM, MINIMUM) of the coin tables in chunks, sorted by coin and date
+    :param logos: by default every coin
+    :param date_init: integer with YYYYMMDD form
+    :param date_end: integer with YYYYMMDD form
+    :param chunk_size:
+    :return: generator of lists of rows
+    """
+    for logo in (logos or get_model_names()):
+        db_object = get_model(logo)
+        if db_object is None:
+            __logger__.error('Coin %s does not have a database entry', logo)
+            continue
+        for rows in db_object.iter_rows(date_init, date_end, chunk_size):
+            yield [(logo,) + tuple(row) for row in rows]
+
+
+def export_prices(file_path: str, file_format: str = None, logos: list = None, date_init: int = None,
+                  date_end: int = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Writes the coin tables in a file
+    :param file_path:
+    :param file_format: 'csv', 'parquet' or 'arrow', by default from the file extension
+    :param logos: by default every coin
+    :param date_init: integer with YYYYMMDD form
+    :param date_end: integer with YYYYMMDD form
+    :param chunk_size: rows written together
+    :return: number of rows
+    """
+    file_format = get_file_format(file_path, file_format)
+    chunks = iter_table_chunks(logos, date_init, date_end, chunk_size)
+    rows = 0
+    if file_format == CSV:
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(FILE_COLUMNS)
+            for chunk in chunks:
+                writer.writerows(chunk)
+                rows += len(chunk)
+        return rows
+    schema = get_arrow_schema()
+    writer = pq.ParquetWriter(file_path, schema) if file_format == PARQUET else pa.ipc.new_file(file_path, schema)
+    try:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*chunk), schema)], schema=schema
+            ))
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return rows
+
+
+def iter_file_chunks(file_path: str, file_format: str = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Yields the rows (LOGO, DATE, CLOSE, MAXIMUM, MINIMUM) of a file in chunks
+    :param file_path:
+    :param file_format: 'csv', 'parquet' or 'arrow', by default from the file extension
+    :param chunk_size:
+    :return: generator of lists of rows
+    """
+    file_format = get_file_format(file_path, file_format)
+    if file_format == CSV:
+        with open(file_path, 'r', newline='') as file:
+            reader = csv.reader(file)
+            header = [column.strip().upper() for column in next(reader)]
+            indexes = [header.index(column) for column in FILE_COLUMNS]
+            chunk = []
+            for row in reader:
+                if row:
+                    chunk.append(tuple(row[index] for index in indexes))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        return
+    if file_format == PARQUET:
+        batches = pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size, columns=list(FILE_COLUMNS))
+    else:
+        reader = pa.ipc.open_file(file_path)
+        batches = (
+            batch.slice(offset, chunk_size) for batch in map(reader.get_batch, range(reader.num_record_batches))
+            for offset in range(0, batch.num_rows, chunk_size)
+        )
+    for batch in batches:
+        yield list(zip(*(batch.column(column).to_pylist() for column in FILE_COLUMNS)))
+
+
+def import_prices(file_path: str, file_format: str = None, chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    Upserts the rows of a file in the coin tables, every chunk in a transaction. Memory-mapped coin tables
+    are written with set_array_data
+    :param file_path:
+    :param file_format: 'csv', 'parquet' or 'arrow', by default from the file extension
+    :param chunk_size: rows read and committed together
+    :return: dictionary with imported rows by coin and skipped rows
+    """
+    imported = defaultdict(int)
+    skipped = 0
+    for chunk in iter_file_chunks(file_path, file_format, chunk_size):
+        coin_rows = defaultdict(list)
+        for logo, date, close, maximum, minimum in chunk:
+            coin_rows[logo].append((int(date), to_float(close), to_float(maximum), to_float(minimum)))
+        models = {}
+        for logo in list(coin_rows):
+            models[logo] = get_model(logo)
+            if models[logo] is None:
+                skipped += len(coin_rows.pop(logo))
+        for logo in [logo for logo in coin_rows if not isinstance(models[logo], DataBase)]:
+            rows = coin_rows.pop(logo)
+            models[logo].set_array_data(rows)
+            imported[logo] += len(rows)
+        if not coin_rows:
+            continue
+        # every coin table is in the same database
+        connection = models[next(iter(coin_rows))].connection
+        cursor = connection.cursor()
+        try:
+            for logo, rows in coin_rows.items():
+                cursor.executemany(models[logo].insert_query.format(table_name=models[logo].table_name), rows)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        for logo, rows in coin_rows.items():
+            imported[logo] += len(rows)
+            notify_write(models[logo].db_location, models[logo].table_name, rows)
+    return {'imported': dict(imported), 'skipped': skipped}
+
+
+def to_float(value) -> float:
+    """
+    Returns the value as float, empty values are None
+    :param value:
+    :return:
+    """
+    return None if value is None or value == '' else float(value)
@@ -0,0 +1,258 @@
+"""
+Materialized rollups of the coin tables: weekly and monthly OHLC bars and rolling 30 day min/max. They are
+maintained incrementally when daily rows are committed, so reading them is an index lookup
+"""
+import datetime as dt
+import threading
+import traceback
+from collections import defaultdict
+from app_lib.DDBB.sqlite.connection import SqliteTable, DB_LOCATION, COLUMNS, add_write_listener
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('rollups')
+WEEK = 'week'
+MONTH = 'month'
+ROLLING_DAYS = 30  # days of the rolling min/max window, ending at every daily date
+__rollup_stores__ = {}
+__rollup_stores_lock__ = threading.Lock()
+
+
+def int_to_date(int_date: int) -> dt.date:
+    """
+    Transform date like 20190102 in a date
+    :param int_date:
+    :return:
+    """
+    return dt.date(int_date // 10000, int_date // 100 % 100, int_date % 100)
+
+
+def date_to_int(date: dt.date) -> int:
+    """
+    Transform a date in an integer with YYYYMMDD form
+    :param date:
+    :return:
+    """
+    return date.year * 10000 + date.month * 100 + date.day
+
+
+def get_period_bounds(int_date: int, period: str) -> tuple:
+    """
+    Returns the first and last date of the week (from Monday) or month of the date
+    :param int_date: integer with YYYYMMDD form
+    :param period: 'week' or 'month'
+    :return: tuple (first, last) with YYYYMMDD form, the first one identifies the period
+    """
+    date = int_to_date(int_date)
+    if period == WEEK:
+        first = date - dt.timedelta(days=date.weekday())
+        return date_to_int(first), date_to_int(first + dt.timedelta(days=6))
+    if period == MONTH:
+        first = date.replace(day=1)
+        following = (first + dt.timedelta(days=32)).replace(day=1)
+        return date_to_int(first), date_to_int(following - dt.timedelta(days=1))
+    raise ValueError(f'Invalid period {period}')
+
+
+class RollupStore(SqliteTable):
+    """
+    Rollups of every coin table in a database, coin tables are read through their models so they can be in
+    any storage. Bars have the OPEN and CLOSE of the first and last daily close
+    of the period, the maximum of the daily maximums and the minimum of the daily minimums
+    """
+
+    table_names = {WEEK: 'ROLLUP_WEEK', MONTH: 'ROLLUP_MONTH'}
+    rolling_table_name = 'ROLLUP_ROLLING'
+
+    def __init__(self, db_location: str = DB_LOCATION):
+        """
+        Constructor of RollupStore
+        :param db_location:
+        """
+        super().__init__(db_location)
+        self.coin_models = {}
+        self.__lock = threading.Lock()
+        self.create_tables()
+
+    def create_tables(self) -> None:
+        """
+        Create tables if they do not exist
+        :return:
+        """
+        for table_name in self.table_names.values():
+            self.cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} (LOGO TEXT NOT NULL, PERIOD INTEGER NOT NULL, "
+                f"FIRST_DATE INTEGER, LAST_DATE INTEGER, OPEN REAL, CLOSE REAL, MAXIMUM REAL, MINIMUM REAL, "
+                f"PRIMARY KEY (LOGO, PERIOD)) WITHOUT ROWID"
+            )
+        self.cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.rolling_table_name} (LOGO TEXT NOT NULL, DATE INTEGER NOT NULL, "
+            f"MAXIMUM REAL, MINIMUM REAL, PRIMARY KEY (LOGO, DATE)) WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def add_table(self, db_model) -> None:
+        """
+        Maintains the rollups of a coin table, they are built if there are not rollups or the table had
+        another model (the storage backend changed)
+        :param db_model: model of the coin table
+        :return:
+        """
+        with self.__lock:
+            previous = self.coin_models.get(db_model.table_name)
+            if previous is db_model:
+                return
+            self.coin_models[db_model.table_name] = db_model
+        self.cursor.execute(f"SELECT 1 FROM {self.rolling_table_name} WHERE LOGO = ? LIMIT 1", (db_model.table_name,))
+        if previous is not None or self.cursor.fetchone() is None:
+            self.rebuild(db_model.table_name)
+
+    def rebuild(self, table_name: str) -> None:
+        """
+        Builds again every rollup of a coin table
+        :param table_name:
+        :return:
+        """
+        dates = self.coin_models[table_name].get_arrays(columns=('DATE',), order='ASC')['DATE'].tolist()
+        for rollup_table in list(self.table_names.values()) + [self.rolling_table_name]:
+            self.cursor.execute(f"DELETE FROM {rollup_table} WHERE LOGO = ?", (table_name,))
+        self.connection.commit()
+        self.update(table_name, dates)
+
+    def on_write(self, db_location: str, table_name: str, tuples_array: list) -> None:
+        """
+        Write listener, updates the rollups of the written dates
+        :param db_location:
+        :param table_name:
+        :param tuples_array:
+        :return:
+        """
+        db_model = self.coin_models.get(table_name)
+        if db_model is None or db_model.db_location != db_location:
+            return
+        try:
+            self.update(table_name, [row[0] for row in tuples_array])
+        except Exception as ex:
+            __logger__.error('Exception updating %s rollups: %s\n%s', table_name, ex, traceback.format_exc())
+
+    def update(self, table_name: str, dates: list) -> None:
+        """
+        Computes again the bars of the periods and the rolling windows containing the dates
+        :param table_name:
+        :param dates: integers with YYYYMMDD form
+        :return:
+        """
+        if not dates:
+            return
+        for period, rollup_table in self.table_names.items():
+            periods = {get_period_bounds(date, period) for date in dates}
+            first = min(bounds[0] for bounds in periods)
+            last = max(bounds[1] for bounds in periods)
+            period_rows = defaultdict(list)
+            for row in self.__get_rows(table_name, first, last):
+                period_rows[get_period_bounds(row[0], period)].append(row)
+            self.cursor.executemany(
+                f"INSERT OR REPLACE INTO {rollup_table} VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (table_name, bounds[0], rows[0][0], rows[-1][0], rows[0][1], rows[-1][1],
+                     max_value(row[2] for row in rows), min_value(row[3] for row in rows))
+                    for bounds, rows in period_rows.items() if bounds in periods
+                ]
+            )
+        # windows ending in a date from the first written date up to ROLLING_DAYS after the last one
+        first = int_to_date(min(dates))
+        last = int_to_date(max(dates)) + dt.timedelta(days=ROLLING_DAYS - 1)
+        rows = self.__get_rows(
+            table_name, date_to_int(first - dt.timedelta(days=ROLLING_DAYS - 1)), date_to_int(last)
+        )
+        rolling_rows = []
+        window_start = 0
+        for index, row in enumerate(rows):
+            if row[0] < date_to_int(first):
+                continue
+            window_first = date_to_int(int_to_date(row[0]) - dt.timedelta(days=ROLLING_DAYS - 1))
+            while rows[window_start][0] < window_first:
+                window_start += 1
+            window = rows[window_start:index + 1]
+            rolling_rows.append(
+                (table_name, row[0], max_value(item[2] for item in window), min_value(item[3] for item in window))
+            )
+        self.cursor.executemany(
+            f"INSERT OR REPLACE INTO {self.rolling_table_name} VALUES (?, ?, ?, ?)", rolling_rows
+        )
+        self.connection.commit()
+
+    def __get_rows(self, table_name: str, date_init: int, date_end: int) -> list:
+        return self.coin_models[table_name].get_data(date_init, date_end, columns=COLUMNS, order='ASC')
+
+    def get_bars(self, logo: str, period: str = WEEK, date_init: int = None, date_end: int = None,
+                 order: str = 'DESC') -> list:
+        """
+        Returns the bars (PERIOD, OPEN, CLOSE, MAXIMUM, MINIMUM) of the periods starting between given dates
+        :param logo:
+        :param period: 'week' or 'month'
+        :param date_init: integer with YYYYMMDD form
+        :param date_end: integer with YYYYMMDD form
+        :param order: 'ASC' or 'DESC' by PERIOD
+        :return:
+        """
+        if period not in self.table_names:
+            raise ValueError(f'Invalid period {period}')
+        if order.upper() not in ('ASC', 'DESC'):
+            raise ValueError(f'Invalid order {order}')
+        self.cursor.execute(
+            f"SELECT PERIOD, OPEN, CLOSE, MAXIMUM, MINIMUM FROM {self.table_names[period]} "
+            f"WHERE LOGO = ? AND PERIOD >= ? AND PERIOD <= ? ORDER BY PERIOD {order.upper()}",
+            (logo, date_init or 0, date_end or 2 ** 62)
+        )
+        return self.cursor.fetchall()
+
+    def get_rolling_min_max(self, logos: list, date: int = None) -> dict:
+        """
+        Returns the rolling maximum and minimum of the coins at the last daily date up to the given one.
+        Coins without a daily row in the last ROLLING_DAYS days are not returned
+        :param logos:
+        :param date: integer with YYYYMMDD form, by default today
+        :return: dictionary {logo: (maximum, minimum)}
+        """
+        logos = list(dict.fromkeys(logos))
+        if not logos:
+            return {}
+        date = date or date_to_int(dt.date.today())
+        oldest = date_to_int(int_to_date(date) - dt.timedelta(days=ROLLING_DAYS - 1))
+        # an index seek per coin in a single query
+        self.cursor.execute(
+            " UNION ALL ".join(
+                f"SELECT * FROM (SELECT LOGO, DATE, MAXIMUM, MINIMUM FROM {self.rolling_table_name} "
+                f"WHERE LOGO = ? AND DATE <= ? ORDER BY DATE DESC LIMIT 1)" for _ in logos
+            ),
+            [parameter for logo in logos for parameter in (logo, date)]
+        )
+        return {row[0]: row[2:] for row in self.cursor.fetchall() if row[1] >= oldest}
+
+
+def max_value(values) -> float:
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def min_value(values) -> float:
+    values = [value for value in values if value is not None]
+    return min(values) if values else None
+
+
+def get_rollup_store(db_location: str = DB_LOCATION) -> RollupStore:
+    """
+    Returns the rollup store of the database listening to its writes, it is created the first time
+    :param db_location:
+    :return:
+    """
+    rollup_store = __rollup_stores__.get(db_location)
+    if rollup_store is None:
+        with __rollup_stores_lock__:
+            rollup_store = __rollup_stores__.get(db_location)
+            if rollup_store is None:
+                rollup_store = RollupStore(db_location)
+                add_write_listener(rollup_store.on_write)
+                __rollup_stores__[db_location] = rollup_store
+    return rollup_store
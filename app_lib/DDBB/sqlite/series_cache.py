@@ -0,0 +1,211 @@
+"""
+Read-through in-memory cache of the price series. The whole history of a coin is loaded once as column
+arrays sorted by date and every date interval is served as a slice found by binary search
+"""
+import threading
+import traceback
+from collections import OrderedDict
+import numpy as np
+from app_lib.DDBB.storage import Storage
+from app_lib.DDBB.sqlite.connection import DB_LOCATION, COLUMNS, COLUMN_DTYPES, add_write_listener
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('series_cache')
+SERIES_CACHE_MAX_BYTES = 64 * 1024 * 1024  # memory of every cached series, least recently used ones are evicted
+SERIES_MIN_CAPACITY = 64  # rows allocated for appends when a series is loaded
+__series_cache__ = []
+__series_cache_lock__ = threading.Lock()
+
+
+class Series:
+    """
+    History of a coin as column arrays sorted by date ascending. Arrays have spare capacity so new
+    dates are appended in place, after the rows of any returned slice. Updates of existing dates copy
+    the arrays first, so a returned slice never changes
+    """
+
+    def __init__(self, columns: dict):
+        """
+        Constructor of Series
+        :param columns: dictionary {column: array} with every column in COLUMNS sorted by DATE ascending
+        """
+        self.size = columns['DATE'].shape[0]
+        capacity = max(2 * self.size, SERIES_MIN_CAPACITY)
+        self.columns = {}
+        for column in COLUMNS:
+            self.columns[column] = np.empty(capacity, dtype=COLUMN_DTYPES[column])
+            self.columns[column][:self.size] = columns[column]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.columns.values())
+
+    def get_slice(self, date_init: int = None, date_end: int = None, columns: tuple = COLUMNS) -> dict:
+        """
+        Returns the rows between given dates sorted by date descending, as the database reads. Arrays
+        are read-only views of the series and keep their values after later updates
+        :param date_init:
+        :param date_end:
+        :param columns:
+        :return: dictionary {column: array}
+        """
+        dates = self.columns['DATE'][:self.size]
+        first = np.searchsorted(dates, date_init, side='left') if date_init else 0
+        last = np.searchsorted(dates, date_end, side='right') if date_end else self.size
+        sliced = {}
+        for column in columns:
+            sliced[column] = self.columns[column][first:last][::-1]
+            sliced[column].flags.writeable = False
+        return sliced
+
+    def update(self, tuples_array: list) -> bool:
+        """
+        Applies inserted rows (DATE, CLOSE, MAXIMUM, MINIMUM). Dates after the last one are appended
+        in place and existing dates are updated in a copy of the arrays
+        :param tuples_array:
+        :return: False if a row is a new date before the last one, then the series must be reloaded
+        """
+        copied = False
+        for row in sorted(tuples_array, key=lambda item: item[0]):
+            dates = self.columns['DATE'][:self.size]
+            index = np.searchsorted(dates, row[0])
+            if index < self.size and dates[index] == row[0]:
+                if not copied:
+                    self.columns = {column: array.copy() for column, array in self.columns.items()}
+                    copied = True
+                self.__set_row(index, row)
+            elif index == self.size:
+                if self.size == self.columns['DATE'].shape[0]:
+                    self.__grow()
+                self.__set_row(index, row)
+                self.size += 1
+            else:
+                return False
+        return True
+
+    def __set_row(self, index: int, row: tuple) -> None:
+        for column, value in zip(COLUMNS, row):
+            self.columns[column][index] = np.nan if value is None else value
+
+    def __grow(self) -> None:
+        for column, array in self.columns.items():
+            grown = np.empty(2 * array.shape[0], dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self.columns[column] = grown
+
+
+class SeriesCache:
+    """
+    Cache of the series of every coin with a memory cap. Series are loaded on the first read and kept
+    up to date with the rows committed to the database
+    """
+
+    def __init__(self, max_bytes: int = SERIES_CACHE_MAX_BYTES):
+        """
+        Constructor of SeriesCache
+        :param max_bytes: memory of every cached series
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__series = OrderedDict()
+        self.__generations = {}
+        self.__lock = threading.Lock()
+
+    def get_arrays(self, db_model: Storage, date_init: int = None, date_end: int = None,
+                   columns: tuple = COLUMNS) -> dict:
+        """
+        Returns the model data between given dates as Storage.get_arrays, sorted by date descending
+        :param db_model:
+        :param date_init: integer with YYYYMMDD form
+        :param date_end: integer with YYYYMMDD form
+        :param columns: column names
+        :return: dictionary {column: array}
+        """
+        columns = tuple(column.upper() for column in columns)
+        key = (db_model.db_location, db_model.table_name)
+        with self.__lock:
+            series = self.__series.get(key)
+            if series is not None:
+                self.__series.move_to_end(key)
+                self.hits += 1
+                return series.get_slice(date_init, date_end, columns)
+            self.misses += 1
+            generation = self.__generations.get(key, 0)
+        # loaded out of the lock, so reads of other coins do not wait for it
+        series = Series(db_model.get_arrays(columns=COLUMNS, order='ASC'))
+        with self.__lock:
+            # rows committed while loading might be missing, then the series is not cached
+            if self.__generations.get(key, 0) == generation and key not in self.__series:
+                self.__series[key] = series
+                self.__evict()
+            return series.get_slice(date_init, date_end, columns)
+
+    def on_write(self, db_location: str, table_name: str, tuples_array: list) -> None:
+        """
+        Write listener, updates the series of the table if it is cached
+        :param db_location:
+        :param table_name:
+        :param tuples_array:
+        :return:
+        """
+        key = (db_location, table_name)
+        with self.__lock:
+            self.__generations[key] = self.__generations.get(key, 0) + 1
+            series = self.__series.get(key)
+            if series is None:
+                return
+            try:
+                if not series.update(tuples_array):
+                    self.__series.pop(key)
+            except Exception as ex:
+                self.__series.pop(key)
+                __logger__.error('Exception updating %s series: %s\n%s', table_name, ex, traceback.format_exc())
+            if key in self.__series:
+                self.__evict()
+
+    def invalidate(self, table_name: str = None, db_location: str = DB_LOCATION) -> None:
+        """
+        Removes the series of the table or every series
+        :param table_name: None to remove every series
+        :param db_location:
+        :return:
+        """
+        with self.__lock:
+            if table_name is None:
+                self.__series.clear()
+            else:
+                self.__series.pop((db_location, table_name), None)
+
+    def get_nbytes(self) -> int:
+        """
+        Returns the memory of every cached series
+        :return:
+        """
+        with self.__lock:
+            return sum(series.nbytes for series in self.__series.values())
+
+    def __evict(self) -> None:
+        """
+        Removes the least recently used series until the memory is under max_bytes
+        :return:
+        """
+        nbytes = sum(series.nbytes for series in self.__series.values())
+        while nbytes > self.max_bytes and self.__series:
+            _, series = self.__series.popitem(last=False)
+            nbytes -= series.nbytes
+
+
+def get_series_cache() -> SeriesCache:
+    """
+    Returns the series cache shared by the whole app, listening to the database writes
+    :return:
+    """
+    if not __series_cache__:
+        with __series_cache_lock__:
+            if not __series_cache__:
+                series_cache = SeriesCache()
+                add_write_listener(series_cache.on_write)
+                __series_cache__.append(series_cache)
+    return __series_cache__[0]
@@ -0,0 +1,50 @@
+"""
+Tests of the candle builder: aggregation of the ticks and reads of open, queued and stored candles
+"""
+import pytest
+from app_lib.DDBB.sqlite.candles import CandleBuilder, CandleStore
+from app_lib.DDBB.sqlite.connection import add_write_listener, close_connection
+from app_lib.DDBB.sqlite.write_queue import get_write_queue
+
+
+@pytest.fixture
+def candle_builder(tmp_path):
+    db_location = str(tmp_path / 'crypto_database')
+    builder = CandleBuilder(CandleStore(db_location), intervals={'1m': 60}, flush_size=2, save_daily=False)
+    add_write_listener(builder.on_write)
+    yield builder
+    get_write_queue(db_location).flush()
+    close_connection(db_location)
+
+
+def add_prices(candle_builder, prices: list) -> None:
+    for tick_time, price in prices:
+        candle_builder.add_tick([{'logo': 'BTC', 'amount': price}, {'logo': '', 'amount': 0}], tick_time)
+
+
+def test_candles_aggregate_the_ticks(candle_builder):
+    add_prices(candle_builder, [(0, 5.), (20, 7.), (40, 4.), (59, 6.), (60, 6.5), (130, 8.)])
+    assert candle_builder.get_candles('BTC', '1m') == [
+        (0, 5., 7., 4., 6.), (60, 6.5, 6.5, 6.5, 6.5), (120, 8., 8., 8., 8.)
+    ]
+    assert candle_builder.get_candles('BTC', '1m', 60, 60) == [(60, 6.5, 6.5, 6.5, 6.5)]
+
+
+def test_reads_are_the_same_before_and_after_writes(candle_builder):
+    add_prices(candle_builder, [(tick_time, float(tick_time % 7)) for tick_time in range(0, 600, 15)])
+    before = candle_builder.get_candles('BTC', '1m')
+    candle_builder.flush()
+    get_write_queue(candle_builder.store.db_location).flush()
+    assert candle_builder.get_candles('BTC', '1m') == before
+    assert len(candle_builder.store.get_candles('BTC', '1m')) == 9
+
+
+def test_candles_split_by_a_restart_are_merged(candle_builder):
+    add_prices(candle_builder, [(0, 5.), (20, 9.)])
+    candle_builder.flush(open_candles=True)
+    get_write_queue(candle_builder.store.db_location).flush()
+    add_prices(candle_builder, [(40, 3.), (50, 4.)])
+    candle_builder.flush(open_candles=True)
+    assert candle_builder.get_candles('BTC', '1m') == [(0, 5., 9., 3., 4.)]
+    get_write_queue(candle_builder.store.db_location).flush()
+    assert candle_builder.store.get_candles('BTC', '1m') == [(0, 5., 9., 3., 4.)]
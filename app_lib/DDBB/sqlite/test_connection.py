@@ -0,0 +1,45 @@
+"""
+Tests of the coin tables in the SQLite database: migration of the old schema and upserts
+"""
+import sqlite3
+import pytest
+from app_lib.DDBB.sqlite.connection import DataBase, close_connection
+
+
+class SqliteCoinModel(DataBase):
+
+    def __init__(self, logo: str, db_location: str):
+        super().__init__(db_location)
+        self.table_name = logo
+        self.prepare_table()
+
+
+@pytest.fixture
+def db_location(tmp_path):
+    db_location = str(tmp_path / 'crypto_database')
+    yield db_location
+    close_connection(db_location)
+
+
+def test_migration_removes_repeated_dates(db_location):
+    connection = sqlite3.connect(db_location)
+    connection.execute("CREATE TABLE BTC (DATE INTEGER, CLOSE REAL, MAXIMUM REAL, MINIMUM REAL)")
+    connection.executemany(
+        "INSERT INTO BTC VALUES (?, ?, ?, ?)",
+        [(20200101, 1., 1., 1.), (20200102, 2., 2., 2.), (20200101, 9., 9., 9.), (None, 5., 5., 5.)]
+    )
+    connection.commit()
+    connection.close()
+    db_model = SqliteCoinModel('BTC', db_location)
+    assert db_model.check_if_table_migrated()
+    assert db_model.get_data(order='ASC') == [(20200101, 9., 9., 9.), (20200102, 2., 2., 2.)]
+    assert db_model.migrate_table() == (2, 2)
+
+
+def test_upsert_keeps_a_row_per_date(db_location):
+    db_model = SqliteCoinModel('BTC', db_location)
+    db_model.set_array_data([(20200101, 1., 2., .5), (20200101, 3., 4., 2.)])
+    db_model.set_data((20200101, 5., 6., 4.))
+    assert db_model.get_data() == [(20200101, 5., 6., 4.)]
+    with pytest.raises(sqlite3.IntegrityError):
+        db_model.set_data((None, 1., 1., 1.))
@@ -0,0 +1,54 @@
+"""
+Tests of the bulk import and export of the coin tables
+"""
+import pytest
+from app_lib.DDBB.sqlite import models
+from app_lib.DDBB.sqlite.connection import close_connection
+from app_lib.DDBB.sqlite.rollups import get_rollup_store
+from app_lib.DDBB.sqlite.price_files import export_prices, import_prices, get_file_format
+
+
+ROWS = {
+    'BTC': [(20200101, 1., 2., .5), (20200102, 2., 3., 1.), (20200103, 3., None, 2.)],
+    'ETH': [(20200102, 10., 11., 9.)],
+}
+
+
+@pytest.fixture
+def memory_models(monkeypatch, tmp_path):
+    db_location = str(tmp_path / 'crypto_database')
+    monkeypatch.setattr(models, '__models__', {})
+    monkeypatch.setattr(models, '__model_backend__', [models.MEMORY_BACKEND])
+    monkeypatch.setattr(models, 'get_rollup_store', lambda: get_rollup_store(db_location))
+    yield
+    for db_model in models.__models__.values():
+        db_model.drop_table()
+    close_connection(db_location)
+
+
+def drop_tables() -> None:
+    for logo in ROWS:
+        models.get_model(logo).drop_table()
+        models.get_model(logo).create_table()
+
+
+@pytest.mark.parametrize('file_name', ['prices.csv', 'prices.parquet', 'prices.arrow'])
+def test_export_and_import_round_trip(memory_models, tmp_path, file_name):
+    if not file_name.endswith('.csv'):
+        pytest.importorskip('pyarrow')
+    for logo, rows in ROWS.items():
+        models.get_model(logo).set_array_data(rows)
+    file_path = str(tmp_path / file_name)
+    assert export_prices(file_path, logos=list(ROWS), chunk_size=2) == 4
+    drop_tables()
+    assert import_prices(file_path, chunk_size=2) == {'imported': {'BTC': 3, 'ETH': 1}, 'skipped': 0}
+    for logo, rows in ROWS.items():
+        assert models.get_model(logo).get_data(order='ASC') == rows
+
+
+def test_import_skips_unknown_coins(memory_models, tmp_path):
+    file_path = tmp_path / 'prices.csv'
+    file_path.write_text('logo,date,close,maximum,minimum\nBTC,20200101,1,2,0.5\nNOTACOIN,20200101,1,1,1\n')
+    assert import_prices(str(file_path)) == {'imported': {'BTC': 1}, 'skipped': 1}
+    with pytest.raises(ValueError):
+        get_file_format('prices.txt')
@@ -0,0 +1,70 @@
+"""
+Tests of the weekly, monthly and rolling rollups against their definition
+"""
+import datetime as dt
+import numpy as np
+import pytest
+from app_lib.DDBB.memory.tables import MemoryCoinModel
+from app_lib.DDBB.sqlite.connection import close_connection
+from app_lib.DDBB.sqlite.rollups import RollupStore, get_period_bounds, date_to_int, int_to_date, WEEK, MONTH, \
+    ROLLING_DAYS
+
+
+def get_rows(first: dt.date, days: int, seed: int = 0) -> list:
+    prices = np.cumsum(np.random.default_rng(seed).normal(0, 1, days)) + 100
+    return [
+        (date_to_int(first + dt.timedelta(days=day)), price, price + 1, price - 1)
+        for day, price in enumerate(prices.tolist())
+    ]
+
+
+def get_bars(rows: list, period: str) -> list:
+    periods = {}
+    for row in rows:
+        periods.setdefault(get_period_bounds(row[0], period)[0], []).append(row)
+    return [
+        (first, period_rows[0][1], period_rows[-1][1], max(row[2] for row in period_rows),
+         min(row[3] for row in period_rows))
+        for first, period_rows in sorted(periods.items())
+    ]
+
+
+def get_rolling(rows: list, date: int) -> tuple:
+    oldest = date_to_int(int_to_date(date) - dt.timedelta(days=ROLLING_DAYS - 1))
+    window = [row for row in rows if oldest <= row[0] <= date]
+    return max(row[2] for row in window), min(row[3] for row in window)
+
+
+@pytest.fixture
+def rollups(tmp_path):
+    db_location = str(tmp_path / 'crypto_database')
+    db_model = MemoryCoinModel('BTC', str(tmp_path))
+    rollup_store = RollupStore(db_location)
+    yield db_model, rollup_store
+    db_model.drop_table()
+    close_connection(db_location)
+
+
+def test_period_bounds():
+    assert get_period_bounds(20240103, WEEK) == (20240101, 20240107)
+    assert get_period_bounds(20240229, MONTH) == (20240201, 20240229)
+    with pytest.raises(ValueError):
+        get_period_bounds(20240103, 'year')
+
+
+def test_rollups_are_built_and_updated(rollups):
+    db_model, rollup_store = rollups
+    rows = get_rows(dt.date(2024, 1, 20), 70)
+    db_model.set_array_data(rows[:50])
+    rollup_store.add_table(db_model)
+    assert rollup_store.get_bars('BTC', MONTH, order='ASC') == get_bars(rows[:50], MONTH)
+    # appended rows and an update of a date of the previous month
+    written = rows[50:] + [(rows[5][0], 50., 200., 10.)]
+    rows[5] = written[-1]
+    db_model.set_array_data(written)
+    rollup_store.on_write(db_model.db_location, 'BTC', written)
+    for period in (WEEK, MONTH):
+        assert rollup_store.get_bars('BTC', period, order='ASC') == get_bars(rows, period)
+    for row in rows[::7]:
+        assert rollup_store.get_rolling_min_max(['BTC'], row[0])['BTC'] == get_rolling(rows, row[0])
+    assert rollup_store.get_rolling_min_max(['BTC', 'ETH'], 20240101) == {}
@@ -0,0 +1,68 @@
+"""
+Tests of the read-through series cache: slices, updates from the writes and eviction
+"""
+import pytest
+from app_lib.DDBB.memory.tables import MemoryCoinModel
+from app_lib.DDBB.sqlite.series_cache import SeriesCache
+
+
+ROWS = [(20200101, 1., 2., .5), (20200102, 2., 3., 1.), (20200104, 4., 5., 3.)]
+
+
+@pytest.fixture
+def coin_models(tmp_path):
+    db_models = [MemoryCoinModel(logo, str(tmp_path)) for logo in ('BTC', 'ETH')]
+    for db_model in db_models:
+        db_model.set_array_data(ROWS)
+    yield db_models
+    for db_model in db_models:
+        db_model.drop_table()
+
+
+def write(cache: SeriesCache, db_model: MemoryCoinModel, rows: list) -> None:
+    db_model.set_array_data(rows)
+    cache.on_write(db_model.db_location, db_model.table_name, rows)
+
+
+def test_slices_are_the_model_reads(coin_models):
+    cache = SeriesCache()
+    db_model = coin_models[0]
+    for date_init, date_end in [(None, None), (20200102, None), (None, 20200103), (20200103, 20200103)]:
+        arrays = cache.get_arrays(db_model, date_init, date_end, columns=('date', 'close'))
+        expected = db_model.get_arrays(date_init, date_end, columns=('DATE', 'CLOSE'))
+        assert {column: array.tolist() for column, array in arrays.items()} == \
+            {column: array.tolist() for column, array in expected.items()}
+    assert (cache.misses, cache.hits) == (1, 3)
+
+
+def test_slices_keep_their_values_after_writes(coin_models):
+    cache = SeriesCache()
+    db_model = coin_models[0]
+    arrays = cache.get_arrays(db_model)
+    write(cache, db_model, [(20200102, 9., 9., 9.)] + [(20200105 + day, 1., 1., 1.) for day in range(100)])
+    assert arrays['CLOSE'].tolist() == [4., 2., 1.]
+    assert cache.get_arrays(db_model, date_end=20200104)['CLOSE'].tolist() == [4., 9., 1.]
+    assert cache.get_arrays(db_model)['DATE'].shape[0] == 103
+    assert cache.misses == 1
+
+
+def test_rows_before_the_last_date_reload_the_series(coin_models):
+    cache = SeriesCache()
+    db_model = coin_models[0]
+    cache.get_arrays(db_model)
+    write(cache, db_model, [(20200103, 3., 4., 2.)])
+    assert cache.get_arrays(db_model)['DATE'].tolist() == [20200104, 20200103, 20200102, 20200101]
+    assert cache.misses == 2
+
+
+def test_least_recently_used_series_are_evicted(coin_models):
+    cache = SeriesCache()
+    cache.get_arrays(coin_models[0])
+    cache.max_bytes = cache.get_nbytes()
+    cache.get_arrays(coin_models[1])
+    cache.get_arrays(coin_models[1])
+    cache.get_arrays(coin_models[0])
+    assert (cache.misses, cache.hits) == (3, 1)
+    assert cache.get_nbytes() <= cache.max_bytes
+    cache.invalidate(coin_models[0].table_name, coin_models[0].db_location)
+    assert cache.get_nbytes() == 0
@@ -0,0 +1,46 @@
+"""
+Tests of the tick store reads while ticks are buffered, queued and committed
+"""
+import threading
+import pytest
+from app_lib.DDBB.sqlite.connection import add_write_listener, close_connection
+from app_lib.DDBB.sqlite.ticks import TickStore
+from app_lib.DDBB.sqlite.write_queue import get_write_queue
+
+
+@pytest.fixture
+def tick_store(tmp_path):
+    db_location = str(tmp_path / 'crypto_database')
+    store = TickStore(flush_size=3, db_location=db_location)
+    add_write_listener(store.on_write)
+    yield store
+    get_write_queue(db_location).flush()
+    close_connection(db_location)
+
+
+def test_reads_merge_buffered_and_stored_ticks(tick_store):
+    for tick_time in range(5):
+        tick_store.append_tick([{'logo': 'BTC', 'amount': float(tick_time)}, {'logo': 'ETH', 'amount': 1.}], tick_time)
+    assert tick_store.get_ticks('BTC') == [(tick_time, float(tick_time)) for tick_time in range(5)]
+    get_write_queue(tick_store.db_location).flush()
+    assert tick_store.get_ticks('BTC', 1, 3) == [(1, 1.), (2, 2.), (3, 3.)]
+    tick_store.flush()
+    get_write_queue(tick_store.db_location).flush()
+    assert tick_store.get_ticks('ETH') == [(tick_time, 1.) for tick_time in range(5)]
+
+
+def test_concurrent_reads_do_not_lose_ticks(tick_store):
+    def produce():
+        for tick_time in range(300):
+            tick_store.append_tick([{'logo': 'BTC', 'amount': float(tick_time)}], tick_time)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while producer.is_alive():
+        tick_store.get_ticks('BTC')
+    producer.join()
+    assert len(tick_store.get_ticks('BTC')) == 300
+    tick_store.flush()
+    get_write_queue(tick_store.db_location).flush()
+    tick_store.cursor.execute("SELECT count(*) FROM TICKS")
+    assert tick_store.cursor.fetchone()[0] == 300
@@ -0,0 +1,125 @@
+"""
+Intraday price ticks storage
+"""
+import time
+import threading
+from app_lib.DDBB.sqlite.connection import SqliteTable, DB_LOCATION, add_write_listener
+from app_lib.DDBB.sqlite.write_queue import get_write_queue
+
+
+TICK_FLUSH_SIZE = 10  # ticks buffered in memory before they are written in a single transaction
+__tick_store__ = []
+__tick_store_lock__ = threading.Lock()
+
+
+class TickStore(SqliteTable):
+    """
+    Append-only store of every extracted price. Rows are clustered by coin and time (WITHOUT ROWID table
+    with primary key (LOGO, TIME)), so the ticks of a coin within a time range are a single index range read.
+    Ticks are buffered and handed to the write queue in batches to avoid a transaction per tick. Reads merge
+    the stored ticks with the buffered ones and the queued ones that are not committed yet, so they never
+    wait for the write queue
+    """
+
+    table_name = 'TICKS'
+    insert_query = "INSERT OR REPLACE INTO {table_name} VALUES (?, ?, ?)"
+
+    def __init__(self, flush_size: int = TICK_FLUSH_SIZE, db_location: str = DB_LOCATION):
+        """
+        Constructor of TickStore
+        :param flush_size: number of buffered ticks written together
+        :param db_location:
+        """
+        super().__init__(db_location)
+        self.flush_size = flush_size
+        self.__buffer = []
+        self.__buffered_ticks = 0
+        self.__pending = {}  # {(logo, time): price} queued and not committed yet
+        self.__lock = threading.Lock()
+        if not self.check_if_table_exists():
+            self.create_table()
+
+    def create_table(self) -> None:
+        """
+        Create table if it does not exist
+        :return:
+        """
+        self.cursor.execute(
+            f"CREATE TABLE {self.table_name} (LOGO TEXT NOT NULL, TIME INTEGER NOT NULL, PRICE REAL, "
+            f"PRIMARY KEY (LOGO, TIME)) WITHOUT ROWID"
+        )
+
+    def append_tick(self, data: list, tick_time: int = None) -> None:
+        """
+        Buffers the prices of a tick, the buffer is written every flush_size ticks
+        :param data: list of prepare_row dictionaries
+        :param tick_time: unix time in seconds, by default now
+        :return:
+        """
+        tick_time = int(time.time()) if tick_time is None else int(tick_time)
+        with self.__lock:
+            self.__buffer.extend((item['logo'], tick_time, item['amount']) for item in data if item['logo'])
+            self.__buffered_ticks += 1
+            flush = self.__buffered_ticks >= self.flush_size
+        if flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Queues the buffered ticks to be written
+        :return:
+        """
+        with self.__lock:
+            buffer, self.__buffer = self.__buffer, []
+            self.__buffered_ticks = 0
+            self.__pending.update(((logo, tick_time), price) for logo, tick_time, price in buffer)
+        get_write_queue(self.db_location).put(self, buffer)
+
+    def on_write(self, db_location: str, table_name: str, tuples_array: list) -> None:
+        """
+        Write listener, committed ticks are no longer pending
+        :param db_location:
+        :param table_name:
+        :param tuples_array:
+        :return:
+        """
+        if db_location == self.db_location and table_name == self.table_name:
+            with self.__lock:
+                for logo, tick_time, _ in tuples_array:
+                    self.__pending.pop((logo, tick_time), None)
+
+    def get_ticks(self, logo: str, time_init: int = None, time_end: int = None) -> list:
+        """
+        Returns the ticks (TIME, PRICE) of a coin between the given unix times sorted by time, the stored
+        ones and the ones not written yet
+        :param logo:
+        :param time_init: unix time in seconds
+        :param time_end: unix time in seconds
+        :return:
+        """
+        time_init = time_init if time_init is not None else 0
+        time_end = time_end if time_end is not None else 2 ** 62
+        self.cursor.execute(
+            f"SELECT TIME, PRICE FROM {self.table_name} WHERE LOGO = ? AND TIME >= ? AND TIME <= ? ORDER BY TIME",
+            (logo, time_init, time_end)
+        )
+        ticks = dict(self.cursor.fetchall())
+        with self.__lock:
+            unwritten = [(key[1], price) for key, price in self.__pending.items() if key[0] == logo]
+            unwritten += [(tick_time, price) for item_logo, tick_time, price in self.__buffer if item_logo == logo]
+        ticks.update((tick_time, price) for tick_time, price in unwritten if time_init <= tick_time <= time_end)
+        return sorted(ticks.items())
+
+
+def get_tick_store() -> TickStore:
+    """
+    Returns the tick store of the app, shared by the extractor and the readers, it is created the first time
+    :return:
+    """
+    if not __tick_store__:
+        with __tick_store_lock__:
+            if not __tick_store__:
+                tick_store = TickStore()
+                add_write_listener(tick_store.on_write)
+                __tick_store__.append(tick_store)
+    return __tick_store__[0]
@@ -0,0 +1,127 @@
+"""
+Write queue of the SQLite database. Inserts from any thread are queued and a single writer thread
+commits them in batches, one transaction per batch instead of one per insert
+"""
+import atexit
+import queue
+import threading
+import time
+import traceback
+from app_lib.DDBB.sqlite.connection import SqliteTable, DB_LOCATION, get_connection, notify_write
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('write_queue')
+WRITE_BATCH_SIZE = 5000  # maximum rows committed in a transaction
+WRITE_DELAY = 0.05  # seconds waited for more inserts before committing a batch
+__write_queues__ = {}
+__write_queues_lock__ = threading.Lock()
+
+
+class WriteQueue:
+    """
+    Queue of inserts written by a daemon thread with its own connection. Readers never wait for the
+    inserts, use flush to wait until they are committed
+    """
+
+    def __init__(self, db_location: str = DB_LOCATION, batch_size: int = WRITE_BATCH_SIZE,
+                 delay: float = WRITE_DELAY):
+        """
+        Constructor of WriteQueue
+        :param db_location:
+        :param batch_size: maximum rows committed in a transaction
+        :param delay: seconds waited for more inserts before committing a batch
+        """
+        self.db_location = db_location
+        self.batch_size = batch_size
+        self.delay = delay
+        self.errors = 0
+        self.__queue = queue.Queue()
+        self.__thread = threading.Thread(target=self.__write_loop, name='sqlite_writer', daemon=True)
+        self.__thread.start()
+
+    def put(self, db_object: SqliteTable, tuples_array: list) -> None:
+        """
+        Queues rows to be inserted with the insert query of the model. Models out of the SQLite database
+        (memory-mapped columns) have their own writes, rows are written at once with set_array_data
+        :param db_object: model where rows are inserted
+        :param tuples_array:
+        :return:
+        """
+        if tuples_array and not isinstance(db_object, SqliteTable):
+            db_object.set_array_data(list(tuples_array))
+        elif tuples_array:
+            self.__queue.put((
+                db_object.table_name, db_object.insert_query.format(table_name=db_object.table_name), list(tuples_array)
+            ))
+
+    def flush(self) -> None:
+        """
+        Waits until every queued insert is committed
+        :return:
+        """
+        self.__queue.join()
+
+    def __write_loop(self) -> None:
+        while True:
+            batch = [self.__queue.get()]
+            rows = len(batch[0][2])
+            deadline = time.monotonic() + self.delay
+            while rows < self.batch_size:
+                try:
+                    batch.append(self.__queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+                rows += len(batch[-1][2])
+            self.__write_batch(batch)
+            for _ in batch:
+                self.__queue.task_done()
+
+    def __write_batch(self, batch: list) -> None:
+        """
+        Writes the batch in a transaction. If it fails every insert is retried in its own transaction,
+        so a wrong insert does not discard the others
+        :param batch: list of tuples (table name, query, rows)
+        :return:
+        """
+        connection, cursor = get_connection(self.db_location)
+        try:
+            for _, query, tuples_array in batch:
+                cursor.executemany(query, tuples_array)
+            connection.commit()
+        except Exception as ex:
+            connection.rollback()
+            if len(batch) == 1:
+                self.errors += 1
+                __logger__.error('Exception writing %s rows: %s\n%s', len(batch[0][2]), ex, traceback.format_exc())
+                return
+            for item in batch:
+                self.__write_batch([item])
+            return
+        for table_name, _, tuples_array in batch:
+            notify_write(self.db_location, table_name, tuples_array)
+
+
+def get_write_queue(db_location: str = DB_LOCATION) -> WriteQueue:
+    """
+    Returns the write queue of the database, it is created the first time
+    :param db_location:
+    :return:
+    """
+    write_queue = __write_queues__.get(db_location)
+    if write_queue is None:
+        with __write_queues_lock__:
+            write_queue = __write_queues__.get(db_location)
+            if write_queue is None:
+                write_queue = __write_queues__[db_location] = WriteQueue(db_location)
+    return write_queue
+
+
+@atexit.register
+def flush_write_queues() -> None:
+    """
+    Waits for every queued insert, the writer threads are daemons and would be stopped at exit
+    :return:
+    """
+    for write_queue in list(__write_queues__.values()):
+        write_queue.flush()
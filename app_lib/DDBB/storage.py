@@ -0,0 +1,306 @@
+"""
+Storage interface of the coin tables. Every backend (SQLite database, memory-mapped column files or memory)
+stores the rows (DATE, CLOSE, MAXIMUM, MINIMUM) of a table with the same API, so callers do not depend on
+how rows are stored
+"""
+import threading
+import numpy as np
+
+
+COLUMNS = ('DATE', 'CLOSE', 'MAXIMUM', 'MINIMUM')
+COLUMN_DTYPES = {'DATE': np.int64, 'CLOSE': np.float64, 'MAXIMUM': np.float64, 'MINIMUM': np.float64}
+AGGREGATES = ('min', 'max', 'avg', 'sum', 'count')
+AGGREGATE_FUNCTIONS = {'min': np.nanmin, 'max': np.nanmax, 'avg': np.nanmean, 'sum': np.nansum}
+ORDERS = ('ASC', 'DESC')
+DATE_MIN = 0
+DATE_MAX = 2 ** 62
+__write_listeners__ = []
+
+
+def add_write_listener(listener) -> None:
+    """
+    Adds a function called after rows are committed as listener(db_location, table_name, tuples_array)
+    :param listener:
+    :return:
+    """
+    if listener not in __write_listeners__:
+        __write_listeners__.append(listener)
+
+
+def notify_write(db_location: str, table_name: str, tuples_array: list) -> None:
+    """
+    Calls every write listener with the committed rows
+    :param db_location:
+    :param table_name:
+    :param tuples_array:
+    :return:
+    """
+    for listener in __write_listeners__:
+        listener(db_location, table_name, tuples_array)
+
+
+class Storage:
+    """
+    Table of a coin in a storage backend. Backends implement check_if_table_exists, create_table, close,
+    get_arrays and set_array_data, the other reads and writes are built on them
+    """
+
+    table_name = ''
+
+    def __init__(self, db_location: str):
+        self.db_location = db_location
+
+    def check_if_table_exists(self) -> bool:
+        raise NotImplementedError
+
+    def create_table(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def prepare_table(self) -> None:
+        """
+        Creates the table if it does not exist
+        :return:
+        """
+        if not self.check_if_table_exists():
+            self.create_table()
+
+    def get_arrays(self, date_init: int = None, date_end: int = None, columns: tuple = COLUMNS, order: str = 'DESC',
+                   limit: int = None) -> dict:
+        """
+        Search and return data between given dates as column arrays, DATE as int64 and prices as float64
+        with NaN for missing prices
+        :param date_init: integer with YYYYMMDD form
+        :param date_end: integer with YYYYMMDD form
+        :param columns: column names to select
+        :param order: 'ASC' or 'DESC' by DATE
+        :param limit: maximum number of rows
+        :return: dictionary {column: array}
+        """
+        raise NotImplementedError
+
+    def set_array_data(self, tuples_array: list) -> None:
+        """
+        Insert many rows, rows with an existing date are updated
+        :param tuples_array: rows (DATE, CLOSE, MAXIMUM, MINIMUM)
+        :return:
+        """
+        raise NotImplementedError
+
+    def set_data(self, tuple_data: tuple) -> None:
+        """
+        Insert a row, if its date exists the row is updated
+        :param tuple_data:
+        :return:
+        """
+        self.set_array_data([tuple_data])
+
+    def get_data(self, date_init: int = None, date_end: int = None, columns: tuple = None, order: str = 'DESC',
+                 limit: int = None, aggregates: tuple = None) -> list:
+        """
+        Search and return data between given dates as tuples, missing prices are None
+        :param date_init: integer with YYYYMMDD form
+        :param date_end: integer with YYYYMMDD form
+        :param columns: column names to select, by default every column. Ex: ('DATE', 'CLOSE')
+        :param order: 'ASC' or 'DESC' by DATE
+        :param limit: maximum number of rows
+        :param aggregates: tuple of (function, column) pairs selected instead of columns, a single row is
+        returned. Ex: (('max', 'MAXIMUM'), ('min', 'MINIMUM'))
+        :return:
+        """
+        if aggregates:
+            aggregates = check_aggregates(aggregates)
+            arrays = self.get_arrays(date_init, date_end, tuple({column for _, column in aggregates}), order, limit)
+            return [tuple(get_aggregate(function, arrays[column]) for function, column in aggregates)]
+        arrays = self.get_arrays(date_init, date_end, columns or COLUMNS, order, limit)
+        return list(zip(*map(to_list, arrays.values())))
+
+    def get_close_prices(self, date_init: int = None, date_end: int = None):
+        return self.get_data(date_init=date_init, date_end=date_end, columns=('DATE', 'CLOSE'))
+
+    def iter_rows(self, date_init: int = None, date_end: int = None, chunk_size: int = 50000):
+        """
+        Yields the rows (DATE, CLOSE, MAXIMUM, MINIMUM) between given dates in chunks sorted by date
+        :param date_init: integer with YYYYMMDD form
+        :param date_end: integer with YYYYMMDD form
+        :param chunk_size:
+        :return: generator of lists of rows
+        """
+        arrays = self.get_arrays(date_init, date_end, COLUMNS, 'ASC')
+        for first in range(0, arrays['DATE'].shape[0], chunk_size):
+            yield list(zip(*(to_list(arrays[column][first:first + chunk_size]) for column in COLUMNS)))
+
+
+class ColumnStorage(Storage):
+    """
+    Storage of a table as column arrays sorted by date ascending. Backends implement get_columns and the
+    writes update_rows, append_rows and merge_rows, rows are sorted and split among them by set_array_data.
+    A single process is expected to write a table
+    """
+
+    def __init__(self, db_location: str):
+        super().__init__(db_location)
+        self.lock = threading.RLock()
+
+    def get_columns(self) -> dict:
+        """
+        Returns every column sorted by date ascending
+        :return: dictionary {column: array}
+        """
+        raise NotImplementedError
+
+    def update_rows(self, positions: np.array, columns: dict) -> None:
+        """
+        Writes the prices of existing dates
+        :param positions: indexes of the dates
+        :param columns: dictionary {column: array} of the rows
+        :return:
+        """
+        raise NotImplementedError
+
+    def append_rows(self, columns: dict) -> None:
+        """
+        Writes rows with dates after the last one
+        :param columns: dictionary {column: array} of the rows sorted by date
+        :return:
+        """
+        raise NotImplementedError
+
+    def merge_rows(self, current: dict, columns: dict) -> None:
+        """
+        Writes new rows with dates before the last one
+        :param current: dictionary {column: array} of the table
+        :param columns: dictionary {column: array} of the rows sorted by date
+        :return:
+        """
+        raise NotImplementedError
+
+    def get_arrays(self, date_init: int = None, date_end: int = None, columns: tuple = COLUMNS, order: str = 'DESC',
+                   limit: int = None) -> dict:
+        """
+        Search and return data between given dates as views of the columns, found by binary search
+        :param date_init: integer with YYYYMMDD form
+        :param date_end: integer with YYYYMMDD form
+        :param columns: column names to select
+        :param order: 'ASC' or 'DESC' by DATE
+        :param limit: maximum number of rows
+        :return: dictionary {column: array}
+        """
+        columns = check_columns(columns)
+        order = check_order(order)
+        current = self.get_columns()
+        first = np.searchsorted(current['DATE'], date_init, side='left') if date_init else 0
+        last = np.searchsorted(current['DATE'], date_end, side='right') if date_end else current['DATE'].shape[0]
+        if limit is not None:
+            if order == 'ASC':
+                last = min(last, first + limit)
+            else:
+                first = max(first, last - limit)
+        step = 1 if order == 'ASC' else -1
+        return {column: current[column][first:last][::step] for column in columns}
+
+    def set_array_data(self, tuples_array: list) -> None:
+        """
+        Insert many rows, rows with an existing date are updated
+        :param tuples_array: rows (DATE, CLOSE, MAXIMUM, MINIMUM)
+        :return:
+        """
+        if not tuples_array:
+            return
+        new_columns = get_row_columns(tuples_array)
+        dates = new_columns['DATE']
+        with self.lock:
+            self.prepare_table()
+            current = self.get_columns()
+            size = current['DATE'].shape[0]
+            positions = np.searchsorted(current['DATE'], dates)
+            existing = positions < size
+            existing[existing] = current['DATE'][positions[existing]] == dates[existing]
+            if existing.any():
+                self.update_rows(positions[existing], {column: array[existing] for column, array in new_columns.items()})
+            appended = ~existing
+            if appended.any():
+                appended_columns = {column: array[appended] for column, array in new_columns.items()}
+                if size == 0 or appended_columns['DATE'][0] > current['DATE'][-1]:
+                    self.append_rows(appended_columns)
+                else:
+                    self.merge_rows(current, appended_columns)
+        notify_write(self.db_location, self.table_name, list(tuples_array))
+
+
+def get_row_columns(tuples_array: list) -> dict:
+    """
+    Returns rows (DATE, CLOSE, MAXIMUM, MINIMUM) as column arrays sorted by date, the last row of a
+    repeated date is kept and None prices are NaN
+    :param tuples_array:
+    :return: dictionary {column: array}
+    """
+    rows = {int(row[0]): row for row in tuples_array}
+    dates = sorted(rows)
+    columns = {'DATE': np.array(dates, dtype=COLUMN_DTYPES['DATE'])}
+    for index, column in enumerate(COLUMNS[1:], start=1):
+        columns[column] = np.array(
+            [np.nan if rows[date][index] is None else rows[date][index] for date in dates], dtype=COLUMN_DTYPES[column]
+        )
+    return columns
+
+
+def merge_columns(current: dict, columns: dict) -> dict:
+    """
+    Returns the columns of both tables sorted by date, they must not have common dates
+    :param current: dictionary {column: array}
+    :param columns: dictionary {column: array}
+    :return: dictionary {column: array}
+    """
+    order = np.argsort(np.concatenate([current['DATE'], columns['DATE']]), kind='stable')
+    return {column: np.concatenate([current[column], columns[column]])[order] for column in COLUMNS}
+
+
+def to_list(array: np.array) -> list:
+    """
+    Returns the array values as Python objects, NaN prices are None
+    :param array:
+    :return:
+    """
+    if array.dtype.kind == 'f':
+        return [None if value != value else value for value in array.tolist()]
+    return array.tolist()
+
+
+def check_columns(columns: tuple) -> tuple:
+    columns = tuple(column.upper() for column in columns)
+    for column in columns:
+        if column not in COLUMNS:
+            raise ValueError(f'Invalid column {column}')
+    return columns
+
+
+def check_order(order: str) -> str:
+    if order.upper() not in ORDERS:
+        raise ValueError(f'Invalid order {order}')
+    return order.upper()
+
+
+def check_aggregates(aggregates: tuple) -> tuple:
+    aggregates = tuple((function.lower(), column.upper()) for function, column in aggregates)
+    for function, column in aggregates:
+        if function not in AGGREGATES or column not in COLUMNS:
+            raise ValueError(f'Invalid aggregate {function}({column})')
+    return aggregates
+
+
+def get_aggregate(function: str, array: np.array):
+    """
+    Returns the aggregate ignoring missing values as SQL does, None if there is not any value
+    :param function: name in AGGREGATES
+    :param array:
+    :return:
+    """
+    values = array[~np.isnan(array)] if array.dtype.kind == 'f' else array
+    if function == 'count':
+        return int(values.shape[0])
+    if values.shape[0] == 0:
+        return None
+    return AGGREGATE_FUNCTIONS[function](values).item()
@@ -0,0 +1,69 @@
+"""
+Tests of the reads and upserts of every storage backend
+"""
+import pytest
+from app_lib.DDBB.storage import Storage
+from app_lib.DDBB.sqlite.connection import DataBase, close_connection
+from app_lib.DDBB.sqlite.ticks import TickStore
+from app_lib.DDBB.mmap.columns import MmapCoinModel
+from app_lib.DDBB.memory.tables import MemoryCoinModel
+
+
+ROWS = [(20200101, 1., 2., .5), (20200102, 2., 3., 1.), (20200104, 4., 5., 3.)]
+
+
+class SqliteCoinModel(DataBase):
+
+    def __init__(self, logo: str, db_location: str):
+        super().__init__(db_location)
+        self.table_name = logo
+        self.prepare_table()
+
+
+@pytest.fixture(params=['sqlite', 'mmap', 'memory'])
+def coin_model(request, tmp_path):
+    if request.param == 'sqlite':
+        db_location = str(tmp_path / 'crypto_database')
+        yield SqliteCoinModel('BTC', db_location)
+        close_connection(db_location)
+    elif request.param == 'mmap':
+        yield MmapCoinModel('BTC', str(tmp_path))
+    else:
+        db_model = MemoryCoinModel('BTC', str(tmp_path))
+        yield db_model
+        db_model.drop_table()
+
+
+def test_upsert_updates_existing_dates(coin_model):
+    coin_model.set_array_data(ROWS)
+    coin_model.set_array_data([(20200102, 7., 8., 6.), (20200105, 5., 6., 4.)])
+    coin_model.set_data((20200101, 0., 1., 0.))
+    assert coin_model.get_data(order='ASC') == [
+        (20200101, 0., 1., 0.), (20200102, 7., 8., 6.), (20200104, 4., 5., 3.), (20200105, 5., 6., 4.)
+    ]
+
+
+def test_upsert_merges_dates_before_the_last_one(coin_model):
+    coin_model.set_array_data(ROWS)
+    coin_model.set_array_data([(20200103, 3., 4., 2.)])
+    arrays = coin_model.get_arrays(order='ASC')
+    assert arrays['DATE'].tolist() == [20200101, 20200102, 20200103, 20200104]
+    assert arrays['CLOSE'].tolist() == [1., 2., 3., 4.]
+
+
+
+def test_reads_are_the_same_in_every_backend(coin_model):
+    coin_model.set_array_data(ROWS + [(20200105, None, 6., 4.)])
+    assert coin_model.get_data(20200102, 20200104, columns=('DATE', 'CLOSE')) == [(20200104, 4.), (20200102, 2.)]
+    assert coin_model.get_data(order='ASC', limit=2) == ROWS[:2]
+    assert coin_model.get_data(aggregates=(('max', 'MAXIMUM'), ('min', 'MINIMUM'))) == [(6., .5)]
+    assert coin_model.get_data(20200105)[0][1] is None
+    assert list(coin_model.iter_rows(date_end=20200104, chunk_size=2)) == [ROWS[:2], ROWS[2:]]
+    assert coin_model.get_arrays(date_init=20200104, columns=('DATE',))['DATE'].tolist() == [20200105, 20200104]
+
+
+def test_sqlite_tables_are_not_storage(tmp_path):
+    db_location = str(tmp_path / 'crypto_database')
+    assert isinstance(SqliteCoinModel('BTC', db_location), Storage)
+    assert not isinstance(TickStore(db_location=db_location), Storage)
+    close_connection(db_location)
@@ -4,7 +4,7 @@ App main module
 import time
 import datetime
 import traceback
-from app_lib.extract_lib.extractor import run, min_max_extractor
+from app_lib.extract_lib.extractor import run, min_max_extractor, get_changed_data
 from app_lib.log.log import get_log
 from app_lib.telegram.telegram_bot import TelegramBot
 from app_lib.configuration.tools.users import get_bot
@@ -13,9 +13,15 @@ from app_lib.gdrive.drive_update import update_drive_files, COIN_EXCEL_LIST_NAME
 from app_lib.gdrive.drive_api import AuthError
 from app_lib.utils.notification_utils import avoid_network_error
 from app_lib.extract_lib.historical_data_extractor import historical_data_extractor
+from app_lib.DDBB.sqlite.ticks import get_tick_store
+from app_lib.DDBB.sqlite.candles import get_candle_builder
+from app_lib.data_science.indicators.batch import refresh_indicators, refresh_missing_indicators
+from app_lib.data_science.indicators.streaming import get_indicator_streams
 
 
 __logger__ = get_log('app_main')
+# daily rows are also built from the tick candles, the scrape fills the days the app was not running
+HISTORICAL_SCRAPE = True
 
 
 @avoid_network_error
@@ -34,10 +40,12 @@ def launch_telegram_server():
     return telegram_bot
 
 
-def update_limits(last_updated_time: datetime.datetime = None) -> datetime.datetime:
+def update_limits(last_updated_time: datetime.datetime = None,
+                  scrape_history: bool = HISTORICAL_SCRAPE) -> datetime.datetime:
     """
-    Updates currencies limits min and max daily
+    Updates currencies limits min and max and the indicators of every coin daily
     :param last_updated_time:
+    :param scrape_history: also gets the last historical data
     :return:
     """
     if not last_updated_time:
@@ -46,35 +54,58 @@ def update_limits(last_updated_time: datetime.datetime = None) -> datetime.datet
     if (current_time - last_updated_time).days > 0:
         __logger__.info('Updating limits')
         # getting last historical data and updating coin limits
-        historical_data_extractor()
+        if scrape_history:
+            historical_data_extractor()
         min_max_data = min_max_extractor()
         update_month_limits(min_max_data, COIN_EXCEL_LIST_NAME)
+        refresh_indicators()
         last_updated_time = current_time
     return last_updated_time
 
 
-def run_extractor(must_notify_telegram=True, must_save_data=True) -> None:
+def run_extractor(must_notify_telegram=True, must_save_data=True, must_scrape_history=HISTORICAL_SCRAPE) -> None:
     """
     Main function in extractor app:
         - Extract data.
+        - Save extracted prices as intraday ticks and candles
+        - Update the streaming indicators with the prices
         - Notify users by telegram bot
         - Update Google drive excels with extracted data
+    Notifications and drive updates only use the coins whose price changed since it was last propagated
+    and they are skipped on flat ticks
     :param must_notify_telegram:
     :param must_save_data:
+    :param must_scrape_history: gets the daily historical data once a day
     :return:
     """
     __logger__.info('Running extractor')
     last_updated_time = None
+    propagated = {}  # {logo: prepare_row dictionary} last propagated of every coin
+    tick_store = get_tick_store()
+    candle_builder = get_candle_builder()
+    indicator_streams = get_indicator_streams()
+    try:
+        refresh_missing_indicators()
+    except Exception as ex:
+        __logger__.error('%s\n%s', ex, traceback.format_exc())
     while True:
         telegram_bot = launch_telegram_server()
         try:
             while True:
                 data = run()
-                if must_notify_telegram:
-                    notify_telegram(data)
+                tick_store.append_tick(data)
+                candle_builder.add_tick(data)
+                indicator_streams.add_tick(data)
+                changed_data = get_changed_data(propagated, data)
+                __logger__.debug('Changed coins: %s', [item['logo'] for item in changed_data])
+                if must_notify_telegram and changed_data:
+                    notify_telegram(changed_data)
                 if must_save_data:
-                    last_updated_time = update_limits(last_updated_time)
-                    update_drive_files(data, COIN_EXCEL_LIST_NAME)
+                    last_updated_time = update_limits(last_updated_time, must_scrape_history)
+                    if changed_data:
+                        update_drive_files(changed_data, COIN_EXCEL_LIST_NAME)
+                # only after every stage succeeded, otherwise changes are evaluated again next tick
+                propagated.update((item['logo'], item) for item in changed_data)
                 time.sleep(30)
         except AuthError as ex:
             __logger__.error('%s\n%s', ex, traceback.format_exc())
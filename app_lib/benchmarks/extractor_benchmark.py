@@ -0,0 +1,52 @@
+"""
+Benchmark of the tick wall-time of extractor.run against the number of extracted coins
+"""
+import time
+from app_lib.benchmarks.stand_in_server import StandInServer
+from app_lib.configuration.tools.logos import get_logos
+from app_lib.extract_lib.extractor import extract_currencies
+
+
+def benchmark_extraction(
+        coin_counts: list, workers_list: list, latency: float, repeat: int = 1, bulk_missing: int = None
+) -> str:
+    """
+    Measures the wall-time of extracting coin_counts coins with every number of workers against a local
+    stand-in server that answers with the given latency. When bulk_missing is given it also measures the
+    bulk quotes mode, where bulk_missing coins are not in the bulk response and they fall back to coin pages
+    :param coin_counts: list with the number of coins extracted per tick
+    :param workers_list: list with the number of workers, 1 means sequential extraction
+    :param latency: seconds added to every response
+    :param repeat: ticks measured per case, the best one is reported
+    :param bulk_missing: number of coins missing in the bulk response, None to skip the bulk mode
+    :return: report as table
+    """
+    logos = get_logos()
+    max_coins = max(coin_counts)
+    if len(logos) < max_coins:
+        logos.update({f'coin{item}': f'C{item}' for item in range(max_coins - len(logos))})
+    currencies = list(logos.keys())
+    cases = [(workers, False) for workers in workers_list]
+    if bulk_missing is not None:
+        cases += [(workers, True) for workers in workers_list]
+    lines = [f'Tick wall-time (s) with {latency * 1000:.0f} ms latency per request',
+             'coins\t' + '\t'.join(f'{"bulk " if bulk else ""}workers={workers}' for workers, bulk in cases)]
+    for coin_count in coin_counts:
+        served_logos = {curr: logos[curr] for curr in currencies[:coin_count]}
+        with StandInServer(served_logos, latency, bulk_missing or 0) as server:
+            times = []
+            for workers, bulk in cases:
+                best_time = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    data = extract_currencies(
+                        currencies[:coin_count], workers, url=server.coin_url,
+                        bulk_url=server.rates_url if bulk else None, logos=served_logos,
+                        bulk_symbols=None
+                    )
+                    elapsed = time.perf_counter() - start
+                    assert len(data) == coin_count and all(item['logo'] for item in data), 'Wrong extracted data'
+                    best_time = elapsed if best_time is None else min(best_time, elapsed)
+                times.append(best_time)
+            lines.append(f'{coin_count}\t' + '\t'.join(f'{elapsed:.3f}' for elapsed in times))
+    return '\n'.join(lines)
@@ -0,0 +1,73 @@
+"""
+Benchmark of HtmlReader full page parsing against the targeted table parsing
+"""
+import os
+import time
+from app_lib.benchmarks.sample_pages import exchange_page, historical_page
+from app_lib.extract_lib.html_reader import HtmlReader
+
+
+def get_sample_pages(pages_dir: str = None) -> list:
+    """
+    Returns the pages to parse as tuples (name, html). Saved pages are read from pages_dir, where
+    historical pages must contain 'historical' in the file name. Without pages_dir synthetic pages are built
+    :param pages_dir:
+    :return:
+    """
+    if pages_dir:
+        pages = []
+        for file_name in sorted(os.listdir(pages_dir)):
+            if file_name.endswith('.html'):
+                with open(os.path.join(pages_dir, file_name), 'rb') as file:
+                    pages.append((file_name, file.read()))
+        return pages
+    return [
+        ('bitcoin.html', exchange_page('bitcoin', 'BTC', 35000.)),
+        ('ethereum.html', exchange_page('ethereum', 'ETH', 2500.)),
+        ('bitcoin_historical.html', historical_page('bitcoin', 35000.)),
+        ('ethereum_historical.html', historical_page('ethereum', 2500., days=1500))
+    ]
+
+
+def measure(function, repeat: int) -> tuple:
+    """
+    Returns the best time of repeat calls and the function result
+    :param function:
+    :param repeat:
+    :return:
+    """
+    best_time, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return best_time, result
+
+
+def benchmark_html_parser(pages_dir: str = None, repeat: int = 5, limits: tuple = (None, 1)) -> str:
+    """
+    Parses every sample page with the full and the fast path comparing speed and output
+    :param pages_dir: directory with saved pages, synthetic pages by default
+    :param repeat: parses per case, the best time is reported
+    :param limits: row limits used with historical pages
+    :return: report as table
+    """
+    reader = HtmlReader()
+    lines = ['page\tlimit\tfull (ms)\tfast (ms)\tspeed-up\tequal']
+    for name, html in get_sample_pages(pages_dir):
+        if 'historical' in name:
+            cases = [
+                (limit, lambda fast, limit=limit: reader.get_historical_table(html, limit=limit, fast=fast))
+                for limit in limits
+            ]
+        else:
+            cases = [(None, lambda fast: reader.get_exchange_table(html, fast=fast))]
+        for limit, parse in cases:
+            full_time, full_data = measure(lambda: parse(False), repeat)
+            fast_time, fast_data = measure(lambda: parse(True), repeat)
+            lines.append(
+                f'{name}\t{limit}\t{full_time * 1000:.2f}\t{fast_time * 1000:.2f}\t'
+                f'{full_time / fast_time:.1f}x\t{full_data == fast_data and len(full_data) > 0}'
+            )
+    return '\n'.join(lines)
@@ -0,0 +1,81 @@
+"""
+Benchmark of the O(n) moving average kernels against the loop over windows they replace
+"""
+import numpy as np
+from app_lib.benchmarks.html_parser_benchmark import measure
+from app_lib.data_science.indicators.moving_averages import exponential_moving_average, simple_moving_average, \
+    weighted_average, get_exponential_scaling_factors
+
+
+def loop_exponential_moving_average(data: np.array, length: int) -> np.array:
+    """
+    Windowed exponential moving average with a weighted average per window, as computed before the kernels
+    :param data: 2D array with dates and data
+    :param length:
+    :return:
+    """
+    scaling_factors = get_exponential_scaling_factors(length)
+    exp_ma = np.array(
+        [weighted_average(data[elem:elem+length, 1], scaling_factors) for elem in range(data.shape[0]-length+1)]
+    )
+    return np.array([data[:exp_ma.shape[0], 0], exp_ma]).transpose()
+
+
+def loop_simple_moving_average(data: np.array, length: int) -> np.array:
+    """
+    Simple moving average with a mean per window, as computed before the kernels
+    :param data: 2D array with dates and data
+    :param length:
+    :return:
+    """
+    sim_ma = np.array(
+        [data[elem:elem+length, 1].mean() for elem in range(data.shape[0]-length+1)]
+    )
+    return np.array([data[:sim_ma.shape[0], 0], sim_ma]).transpose()
+
+
+def get_prices(size: int, seed: int = 0) -> np.array:
+    """
+    Returns a random walk of size close prices as a 2D array with dates, sorted by date descending
+    :param size:
+    :param seed:
+    :return:
+    """
+    rand = np.random.default_rng(seed)
+    prices = 30000. * np.exp(np.cumsum(rand.normal(0., .02, size)))
+    return np.column_stack((np.arange(size, dtype=np.float64)[::-1], prices[::-1]))
+
+
+def benchmark_moving_averages(sizes: tuple = (10000, 100000, 1000000), ema_length: int = 20, sma_length: int = 50,
+                              loop_max: int = 100000, repeat: int = 3) -> str:
+    """
+    Times the windowed and recursive EMA and the SMA kernels and the loops over windows, checking the
+    windowed kernels are equal to the loops
+    :param sizes: number of prices of every case
+    :param ema_length:
+    :param sma_length:
+    :param loop_max: larger sizes are not timed with the loops, they take seconds
+    :param repeat: runs per case, the best time is reported
+    :return: report as table
+    """
+    lines = ['prices\tEMA loop (ms)\tEMA windowed (ms)\tEMA recursive (ms)\tSMA loop (ms)\tSMA (ms)\tmax difference']
+    for size in sizes:
+        data = get_prices(size)
+        windowed_time, windowed = measure(lambda: exponential_moving_average(data, ema_length, windowed=True), repeat)
+        recursive_time, _ = measure(lambda: exponential_moving_average(data, ema_length), repeat)
+        sma_time, sma = measure(lambda: simple_moving_average(data, sma_length), repeat)
+        loop_ema = loop_sma = '-'
+        difference = '-'
+        if size <= loop_max:
+            loop_ema_time, expected_ema = measure(lambda: loop_exponential_moving_average(data, ema_length), 1)
+            loop_sma_time, expected_sma = measure(lambda: loop_simple_moving_average(data, sma_length), 1)
+            loop_ema, loop_sma = f'{loop_ema_time * 1000:.2f}', f'{loop_sma_time * 1000:.2f}'
+            difference = '{:.2e}'.format(max(
+                np.abs(windowed[:, 1] - expected_ema[:, 1]).max() / np.abs(expected_ema[:, 1]).max(),
+                np.abs(sma[:, 1] - expected_sma[:, 1]).max() / np.abs(expected_sma[:, 1]).max()
+            ))
+        lines.append(
+            f'{size}\t{loop_ema}\t{windowed_time * 1000:.2f}\t{recursive_time * 1000:.2f}\t{loop_sma}\t'
+            f'{sma_time * 1000:.2f}\t{difference}'
+        )
+    return '\n'.join(lines)
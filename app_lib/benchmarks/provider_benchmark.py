@@ -0,0 +1,94 @@
+"""
+Benchmark of hedged price requests using local stand-in providers
+"""
+import random
+import threading
+import time
+import numpy as np
+from app_lib.extract_lib.price_providers import PriceProvider, HedgedPriceFetcher
+
+
+class StandInPriceProvider(PriceProvider):
+    """
+    Provider answering after a latency, which is slow_latency with probability slow_rate, and failing
+    with probability error_rate
+    """
+
+    def __init__(self, name: str, latency: float, slow_latency: float = 0., slow_rate: float = 0.,
+                 error_rate: float = 0., seed: int = 0):
+        """
+        Constructor of StandInPriceProvider
+        :param name:
+        :param latency: seconds of a normal answer
+        :param slow_latency: seconds of a slow answer
+        :param slow_rate: probability [0, 1] of a slow answer
+        :param error_rate: probability [0, 1] of a failed answer
+        :param seed: random seed
+        """
+        super().__init__()
+        self.name = name
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.slow_rate = slow_rate
+        self.error_rate = error_rate
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+
+    def get_row(self, currency: str, logo: str) -> list:
+        with self.__lock:
+            slow = self.__random.random() < self.slow_rate
+            failed = self.__random.random() < self.error_rate
+        time.sleep(self.slow_latency if slow else self.latency)
+        if failed:
+            raise ConnectionError(f'Injected error in {self.name}')
+        return [currency, logo, 100. + len(currency)]
+
+
+def measure_quotes(fetcher: HedgedPriceFetcher, quotes: int) -> tuple:
+    """
+    Gets quotes one by one returning their latencies and the number of failed quotes
+    :param fetcher:
+    :param quotes:
+    :return:
+    """
+    latencies, failed = [], 0
+    for quote in range(quotes):
+        start = time.perf_counter()
+        row = fetcher.get_quote(f'coin{quote}', f'C{quote}')
+        latencies.append(time.perf_counter() - start)
+        failed += 0 if row else 1
+    return np.array(latencies), failed
+
+
+def benchmark_providers(quotes: int = 100, hedge_delay: float = 0.3, latency: float = 0.05,
+                        slow_latency: float = 2., slow_rate: float = 0.1, error_rate: float = 0.05) -> str:
+    """
+    Compares a single unreliable provider against hedged requests to that provider and a steady backup
+    :param quotes: number of quotes per case
+    :param hedge_delay: seconds before requesting the backup
+    :param latency: seconds of a normal answer of the primary provider
+    :param slow_latency: seconds of a slow answer of the primary provider
+    :param slow_rate: probability of a slow answer of the primary provider
+    :param error_rate: probability of a failed answer of the primary provider
+    :return: report
+    """
+    def primary():
+        return StandInPriceProvider('primary', latency, slow_latency, slow_rate, error_rate, seed=1)
+
+    backup = StandInPriceProvider('backup', latency * 2, seed=2)
+    cases = [
+        ('single source', HedgedPriceFetcher([primary()], hedge_delay)),
+        ('hedged', HedgedPriceFetcher([primary(), backup], hedge_delay))
+    ]
+    lines = [f'{quotes} quotes, primary {latency * 1000:.0f} ms ({slow_rate * 100:.0f}% at {slow_latency * 1000:.0f} ms, '
+             f'{error_rate * 100:.0f}% errors), backup {latency * 2000:.0f} ms, hedge after {hedge_delay * 1000:.0f} ms',
+             'case\tp50 (ms)\tp95 (ms)\tmax (ms)\tfailed']
+    for name, fetcher in cases:
+        latencies, failed = measure_quotes(fetcher, quotes)
+        lines.append(f'{name}\t{np.percentile(latencies, 50) * 1000:.1f}\t{np.percentile(latencies, 95) * 1000:.1f}\t'
+                     f'{latencies.max() * 1000:.1f}\t{failed}')
+    time.sleep(slow_latency)  # lets losing requests finish before reporting stats
+    for provider_name, stats in cases[-1][1].get_stats().items():
+        lines.append(f'{provider_name} stats: ' + ', '.join(f'{key} {value:.3f}' if isinstance(value, float)
+                                                           else f'{key} {value}' for key, value in stats.items()))
+    return '\n'.join(lines)
@@ -0,0 +1,97 @@
+"""
+Synthetic WorldCoinIndex and Coinbase responses used by benchmarks when there is no network
+"""
+import datetime
+import random
+from json import dumps
+
+
+def exchange_page(currency: str, logo: str, price: float, rows: int = 20) -> str:
+    """
+    Builds a coin page with the same 'market-table' layout read by HtmlReader.get_exchange_table
+    :param currency:
+    :param logo:
+    :param price: price of the first market row
+    :param rows: number of market rows
+    :return:
+    """
+    market_rows = []
+    for row in range(rows):
+        row_price = price * (1 + row / 1000)
+        market_rows.append(
+            f'<tr data-symbol="{logo}BTC">'
+            f'<td>{row + 1}</td>'
+            f'<td>\n{currency.capitalize()}\n</td>'
+            f'<td>\n<span>\n{logo}/BTC market</span>\n</td>'
+            f'<td>\n<span>$</span>\n{row_price:,.4f}\n</td>'
+            f'<td>\n{row_price * 1e6:,.0f}\n</td>'
+            '</tr>'
+        )
+    return page_layout(
+        f'<h1>{currency}</h1>'
+        '<table id="market-table"><thead><tr><th>#</th><th>Name</th><th>Market</th><th>Price</th>'
+        '<th>Volume</th></tr></thead><tbody>' + ''.join(market_rows) + '</tbody></table>'
+    )
+
+
+def historical_page(currency: str, price: float, days: int = 365) -> str:
+    """
+    Builds a historical coin page with the same 'myTable' layout read by HtmlReader.get_historical_table
+    :param currency:
+    :param price: last close price
+    :param days: number of daily rows, the newest first
+    :return:
+    """
+    rand = random.Random(currency)
+    today = datetime.date.today()
+    history_rows = []
+    for day in range(days):
+        close = price * (1 + rand.uniform(-0.05, 0.05))
+        history_rows.append(
+            '<tr>'
+            f'<td>{(today - datetime.timedelta(days=day)).strftime("%b %d, %Y").replace(" 0", " ")}</td>'
+            f'<td><span>$</span><span>{close:,.4f}</span></td>'
+            f'<td><span>$</span><span>{close * 1.03:,.4f}</span></td>'
+            f'<td><span>$</span><span>{close * 0.97:,.4f}</span></td>'
+            f'<td><span>$</span><span>{close * 1e6:,.0f}</span></td>'
+            '</tr>'
+        )
+    return page_layout(
+        f'<h1>{currency} historical</h1>'
+        '<table id="myTable"><thead><tr><th>Date</th><th>Close</th><th>High</th><th>Low</th>'
+        '<th>Volume</th></tr></thead><tbody>' + ''.join(history_rows) + '</tbody></table>'
+    )
+
+
+def spot_json(pair: str, amount: float) -> str:
+    """
+    Builds a Coinbase spot price response
+    :param pair: pair as 'EUR-USD'
+    :param amount:
+    :return:
+    """
+    base, currency = pair.split('-')
+    return dumps({'data': {'base': base, 'currency': currency, 'amount': str(amount)}})
+
+
+def rates_json(currency: str, prices: dict) -> str:
+    """
+    Builds a Coinbase exchange rates response
+    :param currency: base currency
+    :param prices: dictionary {symbol: price in base currency}
+    :return:
+    """
+    rates = {symbol: str(1 / price) for symbol, price in prices.items() if price > 0}
+    return dumps({'data': {'currency': currency, 'rates': rates}})
+
+
+def page_layout(body: str) -> str:
+    """
+    Surrounds the body with a page weight similar to the real one (menus, scripts and footers)
+    :param body:
+    :return:
+    """
+    menu = ''.join(f'<li><a href="/coin/item{item}">Item {item}</a></li>' for item in range(300))
+    scripts = ''.join(f'<script>var item{item} = {{"value": {item}}};</script>' for item in range(100))
+    return f'<!DOCTYPE html><html><head><title>Stand-in</title>{scripts}</head>' \
+           f'<body><nav><ul>{menu}</ul></nav><main>{body}</main><footer><ul>{menu}</ul></footer></body></html>'
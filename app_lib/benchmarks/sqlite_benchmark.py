@@ -0,0 +1,123 @@
+"""
+Benchmark of web reads latency while the database is written by a historical backfill
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+import numpy as np
+from app_lib.DDBB.sqlite.connection import DataBase, set_pragmas, PRAGMAS
+from app_lib.DDBB.sqlite.write_queue import WriteQueue
+
+
+ROLLBACK_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'cache_size': -2000, 'mmap_size': 0}
+
+
+def get_rows(first_date: int, rows: int, seed: int = 0) -> list:
+    """
+    Returns rows (DATE, CLOSE, MAXIMUM, MINIMUM) with consecutive integer dates
+    :param first_date:
+    :param rows:
+    :param seed:
+    :return:
+    """
+    rand = random.Random(seed)
+    data = []
+    for date in range(first_date, first_date + rows):
+        close = rand.uniform(100, 200)
+        data.append((date, close, close * 1.05, close * 0.95))
+    return data
+
+
+def run_case(pragmas: dict, queued: bool, preload: int, rows: int, batch: int, readers: int,
+             read_days: int, seed: int) -> dict:
+    """
+    Backfills rows in batches of batch rows while readers read random ranges of read_days rows
+    :param pragmas: connection pragmas
+    :param queued: write through a WriteQueue instead of a commit per batch
+    :param preload: rows in the table before the backfill
+    :param rows: backfilled rows
+    :param batch: rows per insert
+    :param readers: reader threads
+    :param read_days: rows of every read
+    :param seed:
+    :return: dictionary with read latencies in seconds, reads and backfill seconds
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db_location = os.path.join(directory, 'benchmark_database')
+        set_pragmas(db_location, **pragmas)
+        db_object = DataBase(db_location)
+        db_object.table_name = 'BTC'
+        db_object.create_table()
+        db_object.set_array_data(get_rows(0, preload, seed))
+        backfill = get_rows(preload, rows, seed + 1)
+        write_queue = WriteQueue(db_location) if queued else None
+        writing = threading.Event()
+        writing.set()
+        latencies = [[] for _ in range(readers)]
+
+        def read(reader: int) -> None:
+            rand = random.Random(seed + reader)
+            try:
+                while writing.is_set():
+                    date_init = rand.randrange(0, max(preload - read_days, 1))
+                    start = time.perf_counter()
+                    db_object.get_data(date_init=date_init, date_end=date_init + read_days - 1)
+                    latencies[reader].append(time.perf_counter() - start)
+            finally:
+                db_object.close()
+
+        reader_threads = [threading.Thread(target=read, args=(reader,)) for reader in range(readers)]
+        for thread in reader_threads:
+            thread.start()
+        start = time.perf_counter()
+        for index in range(0, rows, batch):
+            if queued:
+                write_queue.put(db_object, backfill[index:index + batch])
+            else:
+                db_object.set_array_data(backfill[index:index + batch])
+        if queued:
+            write_queue.flush()
+        elapsed = time.perf_counter() - start
+        writing.clear()
+        for thread in reader_threads:
+            thread.join()
+        db_object.close()
+    return {'latencies': np.concatenate([np.array(item) for item in latencies]), 'backfill': elapsed}
+
+
+def benchmark_concurrent_reads(preload: int = 20000, rows: int = 100000, batch: int = 100, readers: int = 4,
+                               read_days: int = 180, seed: int = 0) -> str:
+    """
+    Compares read latency during a backfill with the rollback journal and a commit per insert against
+    the WAL journal with tuned pragmas and the write queue
+    :param preload: rows in the table before the backfill
+    :param rows: backfilled rows
+    :param batch: rows per insert, as the rows of a coin in a historical backfill
+    :param readers: reader threads, as Flask request threads
+    :param read_days: rows of every read
+    :param seed:
+    :return: report
+    """
+    report = [
+        f'Backfill of {rows} rows in inserts of {batch} rows over {preload} rows, '
+        f'{readers} readers of {read_days} rows'
+    ]
+    cases = (
+        ('rollback journal, commit per insert', ROLLBACK_PRAGMAS, False),
+        ('WAL journal, commit per insert', PRAGMAS, False),
+        ('WAL journal, write queue', PRAGMAS, True)
+    )
+    for name, pragmas, queued in cases:
+        result = run_case(pragmas, queued, preload, rows, batch, readers, read_days, seed)
+        latencies = result['latencies'] * 1000
+        if latencies.size == 0:
+            latencies = np.array([np.nan])
+        report.append(
+            f'{name}: backfill {result["backfill"]:.2f} s ({rows / result["backfill"]:.0f} rows/s), '
+            f'{latencies.size} reads, read latency (ms) p50 {np.percentile(latencies, 50):.2f}, '
+            f'p95 {np.percentile(latencies, 95):.2f}, p99 {np.percentile(latencies, 99):.2f}, '
+            f'max {latencies.max():.2f}'
+        )
+    return '\n'.join(report)
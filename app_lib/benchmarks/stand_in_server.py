@@ -0,0 +1,145 @@
+"""
+Local HTTP server that stands in for WorldCoinIndex and Coinbase while benchmarking
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from app_lib.benchmarks.sample_pages import exchange_page, historical_page, spot_json, rates_json
+
+
+class StandInServer:
+    """
+    Serves synthetic coin pages in a background thread adding a fixed latency to every response:
+        - /coin/{currency}
+        - /coin/{currency}/historical
+        - /v2/prices/{pair}/spot
+        - /v2/exchange-rates?currency={currency}
+    """
+
+    def __init__(self, logos: dict, latency: float = 0., bulk_missing: int = 0):
+        """
+        Constructor of StandInServer
+        :param logos: dictionary {currency: logo} of served coins
+        :param latency: seconds waited before answering every request
+        :param bulk_missing: number of coins, the last ones in logos, left out of the exchange rates
+        """
+        self.logos = logos
+        self.latency = latency
+        self.bulk_missing = bulk_missing
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), self.__handler())
+        self.__server.daemon_threads = True
+        self.__thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        Returns the base url of the server
+        :return:
+        """
+        return 'http://127.0.0.1:{port}'.format(port=self.__server.server_address[1])
+
+    def coin_url(self, currency: str) -> str:
+        """
+        Returns the stand-in coin page url of the currency, as urls[1] in extractor.py
+        :param currency:
+        :return:
+        """
+        return f'{self.url}/coin/{currency}'
+
+    def historical_url(self, currency: str) -> str:
+        """
+        Returns the stand-in historical page url of the currency, as urls[2] in extractor.py
+        :param currency:
+        :return:
+        """
+        return f'{self.url}/coin/{currency}/historical'
+
+    def spot_url(self, pair: str) -> str:
+        """
+        Returns the stand-in spot price url of the pair, as urls[0] in extractor.py
+        :param pair:
+        :return:
+        """
+        return f'{self.url}/v2/prices/{pair}/spot'
+
+    def rates_url(self, currency: str) -> str:
+        """
+        Returns the stand-in exchange rates url of the base currency, as urls[3] in extractor.py
+        :param currency:
+        :return:
+        """
+        return f'{self.url}/v2/exchange-rates?currency={currency}'
+
+    @staticmethod
+    def price(currency: str) -> float:
+        """
+        Returns the USD price served for the currency
+        :param currency:
+        :return:
+        """
+        return 1. + len(currency) * 100
+
+    def start(self) -> 'StandInServer':
+        """
+        Starts serving in a daemon thread
+        :return:
+        """
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the server and releases the port
+        :return:
+        """
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Request handler building every page on the fly
+            """
+
+            def do_GET(self):
+                time.sleep(stand_in.latency)
+                path = urlparse(self.path)
+                parts = path.path.strip('/').split('/')
+                body, content_type = None, 'text/html'
+                if len(parts) >= 2 and parts[0] == 'coin' and parts[1] in stand_in.logos:
+                    price = stand_in.price(parts[1])
+                    if len(parts) == 2:
+                        body = exchange_page(parts[1], stand_in.logos[parts[1]], price)
+                    elif parts[2] == 'historical':
+                        body = historical_page(parts[1], price)
+                elif len(parts) == 4 and parts[:2] == ['v2', 'prices']:
+                    body, content_type = spot_json(parts[2], 1.18), 'application/json'
+                elif parts == ['v2', 'exchange-rates']:
+                    currency = parse_qs(path.query).get('currency', ['USD'])[0]
+                    served = list(stand_in.logos.items())[:len(stand_in.logos) - stand_in.bulk_missing]
+                    prices = {logo: stand_in.price(curr) for curr, logo in served}
+                    body, content_type = rates_json(currency, prices), 'application/json'
+                if body is None:
+                    self.send_error(404)
+                    return
+                content = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,108 @@
+"""
+Benchmark of the storage backends: insert throughput, range read latency and size per million rows
+"""
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from app_lib.DDBB.sqlite.connection import DataBase
+from app_lib.DDBB.mmap.columns import MmapDataBase
+from app_lib.DDBB.memory.tables import MemoryDataBase
+from app_lib.benchmarks.sqlite_benchmark import get_rows
+
+
+BACKENDS = ('sqlite', 'mmap', 'memory')
+
+
+def get_storage(backend: str, directory: str):
+    """
+    Returns an empty BTC table of the backend stored in the directory
+    :param backend: 'sqlite', 'mmap' or 'memory'
+    :param directory:
+    :return:
+    """
+    if backend == 'sqlite':
+        db_object = DataBase(os.path.join(directory, 'benchmark_database'))
+    elif backend == 'mmap':
+        db_object = MmapDataBase(directory)
+    else:
+        db_object = MemoryDataBase(directory)
+    db_object.table_name = 'BTC'
+    db_object.prepare_table()
+    return db_object
+
+
+def get_storage_size(db_object) -> int:
+    """
+    Returns the bytes used by the table: database or column files, or arrays of the memory table
+    :param db_object:
+    :return:
+    """
+    if isinstance(db_object, MemoryDataBase):
+        return sum(array.nbytes for array in db_object.table['columns'].values())
+    if isinstance(db_object, MmapDataBase):
+        location = os.path.join(db_object.table_path, db_object.get_generation())
+    else:
+        location = os.path.dirname(db_object.db_location)
+    return sum(entry.stat().st_size for entry in os.scandir(location) if entry.is_file())
+
+
+def run_case(backend: str, rows: int, batch: int, reads: int, read_days: int, seed: int) -> dict:
+    """
+    Inserts rows in batches of batch rows, then reads random ranges of read_days rows
+    :param backend: 'sqlite', 'mmap' or 'memory'
+    :param rows: inserted rows
+    :param batch: rows per insert
+    :param reads: range reads of every read API
+    :param read_days: rows of every read
+    :param seed:
+    :return: dictionary with insert seconds, read latencies in seconds by read API and size in bytes
+    """
+    data = get_rows(0, rows, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        db_object = get_storage(backend, directory)
+        start = time.perf_counter()
+        for index in range(0, rows, batch):
+            db_object.set_array_data(data[index:index + batch])
+        elapsed = time.perf_counter() - start
+        rand = random.Random(seed)
+        latencies = {'get_arrays': [], 'get_data': []}
+        for read_api, latency in latencies.items():
+            read = getattr(db_object, read_api)
+            for _ in range(reads):
+                date_init = rand.randrange(0, max(rows - read_days, 1))
+                start = time.perf_counter()
+                read(date_init=date_init, date_end=date_init + read_days - 1)
+                latency.append(time.perf_counter() - start)
+        size = get_storage_size(db_object)
+        if isinstance(db_object, MemoryDataBase):
+            db_object.drop_table()
+        db_object.close()
+    return {'insert': elapsed, 'latencies': {name: np.array(item) for name, item in latencies.items()}, 'size': size}
+
+
+def benchmark_storages(rows: int = 1000000, batch: int = 1000, reads: int = 1000, read_days: int = 180,
+                       backends: tuple = BACKENDS, seed: int = 0) -> str:
+    """
+    Compares the storage backends writing and reading a coin table. Size is the bytes of the database or
+    column files, or of the arrays of the memory table, per million rows. Pages of the file backends are
+    in the OS page cache, shared by every process reading them
+    :param rows: inserted rows
+    :param batch: rows per insert, as the rows of a coin in a historical backfill
+    :param reads: range reads of every read API
+    :param read_days: rows of every read
+    :param backends: names in BACKENDS
+    :param seed:
+    :return: report
+    """
+    report = [f'Insert of {rows} rows in inserts of {batch} rows, {reads} reads of {read_days} rows']
+    for backend in backends:
+        result = run_case(backend, rows, batch, reads, read_days, seed)
+        line = f'{backend}: insert {result["insert"]:.2f} s ({rows / result["insert"]:.0f} rows/s)'
+        for read_api, latencies in result['latencies'].items():
+            latencies = latencies * 1000
+            line += f', {read_api} latency (ms) p50 {np.percentile(latencies, 50):.3f} ' \
+                    f'p95 {np.percentile(latencies, 95):.3f}'
+        report.append(line + f', size {result["size"] / rows * 1000000 / 1024 / 1024:.1f} MB per million rows')
+    return '\n'.join(report)
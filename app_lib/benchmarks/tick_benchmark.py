@@ -0,0 +1,72 @@
+"""
+Harness to record the extraction pipeline responses and to measure its tick throughput replaying them
+"""
+import time
+import numpy as np
+from app_lib.extract_lib import http_replay
+from app_lib.extract_lib.extractor import run, min_max_extractor, EXTRACTOR_WORKERS
+from app_lib.extract_lib.response_cache import set_cache_enabled
+
+
+def record_fixtures(path: str = http_replay.FIXTURES_PATH) -> str:
+    """
+    Runs every extraction once against the network saving the responses in path
+    :param path: fixture directory
+    :return:
+    """
+    set_cache_enabled(False)
+    http_replay.set_transport_mode(http_replay.RECORD, path)
+    try:
+        start = time.perf_counter()
+        coins = run(bulk=False)
+        bulk_coins = run(bulk=True)
+        min_max_data = min_max_extractor()
+        elapsed = time.perf_counter() - start
+    finally:
+        http_replay.set_transport_mode(http_replay.LIVE)
+        set_cache_enabled(True)
+    coins, bulk_coins = [[item for item in data if item['logo']] for data in (coins, bulk_coins)]
+    return f'Recorded {len(coins)} coins, {len(bulk_coins)} bulk coins and {len(min_max_data)} limits ' \
+           f'in {elapsed:.2f} s at {path}'
+
+
+def benchmark_ticks(path: str = http_replay.FIXTURES_PATH, ticks: int = 10, latency: float = 0., jitter: float = 0.,
+                    error_rate: float = 0., workers: int = EXTRACTOR_WORKERS, bulk: bool = True,
+                    min_max: bool = False, seed: int = 0) -> str:
+    """
+    Replays the recorded responses measuring the wall-time of every tick
+    :param path: fixture directory
+    :param ticks: number of measured ticks
+    :param latency: seconds waited before every response
+    :param jitter: maximum random seconds added to latency
+    :param error_rate: probability [0, 1] of a connection error
+    :param workers: extractor workers
+    :param bulk: extractor bulk quotes mode
+    :param min_max: also runs min_max_extractor every tick
+    :param seed: random seed of jitter and errors
+    :return: report
+    """
+    set_cache_enabled(False)
+    http_replay.set_transport_mode(http_replay.REPLAY, path, latency, jitter, error_rate, seed)
+    times = []
+    coins = []
+    try:
+        for _ in range(ticks):
+            start = time.perf_counter()
+            data = run(workers, bulk)
+            if min_max:
+                min_max_extractor()
+            times.append(time.perf_counter() - start)
+            coins.append(len([item for item in data if item['logo']]))
+    finally:
+        http_replay.set_transport_mode(http_replay.LIVE)
+        set_cache_enabled(True)
+    times = np.array(times)
+    return '\n'.join([
+        f'Replayed {ticks} ticks with {latency * 1000:.0f}+{jitter * 1000:.0f} ms latency and '
+        f'{error_rate * 100:.1f}% errors (workers={workers}, bulk={bulk}, min_max={min_max})',
+        f'tick wall-time (s): mean {times.mean():.3f}, p50 {np.percentile(times, 50):.3f}, '
+        f'p95 {np.percentile(times, 95):.3f}, max {times.max():.3f}',
+        f'throughput: {ticks / times.sum():.2f} ticks/s',
+        f'extracted coins per tick: min {min(coins)}, max {max(coins)}'
+    ])
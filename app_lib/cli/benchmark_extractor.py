@@ -0,0 +1,30 @@
+"""
+CLI module
+"""
+import click
+from app_lib.benchmarks.extractor_benchmark import benchmark_extraction
+
+
+@click.command(name='benchmark_extractor')
+@click.option('--coins', default='1,10,25,50', help='Comma separated number of coins per tick. Ex: 1,10,50.')
+@click.option('--workers', default='1,4,8,16', help='Comma separated number of workers. Ex: 1,8.')
+@click.option('--latency', default=0.2, help='Seconds added to every stand-in response. Ex: 0.2.')
+@click.option('--repeat', default=1, help='Ticks measured per case, the best one is reported.')
+@click.option('--bulk_missing', default=None, type=int, help='Also measures the bulk quotes mode with this '
+                                                              'number of coins missing in the bulk response.')
+def benchmark_extractor(coins: str, workers: str, latency: float, repeat: int, bulk_missing: int) -> None:
+    """
+    Measures the extractor tick wall-time against the number of coins using a local stand-in server
+    :param coins:
+    :param workers:
+    :param latency:
+    :param repeat:
+    :param bulk_missing:
+    """
+    coin_counts = [int(item) for item in coins.split(',')]
+    workers_list = [int(item) for item in workers.split(',')]
+    click.echo(benchmark_extraction(coin_counts, workers_list, latency, repeat, bulk_missing))
+
+
+if __name__ == '__main__':
+    benchmark_extractor()
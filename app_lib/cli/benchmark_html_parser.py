@@ -0,0 +1,22 @@
+"""
+CLI module
+"""
+import click
+from app_lib.benchmarks.html_parser_benchmark import benchmark_html_parser
+
+
+@click.command(name='benchmark_html_parser')
+@click.option('--pages_dir', default=None, help='Directory with saved coin pages, historical pages must contain '
+                                                '"historical" in their name. Synthetic pages by default.')
+@click.option('--repeat', default=5, help='Parses per case, the best time is reported.')
+def benchmark_html_parser_command(pages_dir: str = None, repeat: int = 5) -> None:
+    """
+    Compares speed and output of the full page and the targeted table html parsing
+    :param pages_dir:
+    :param repeat:
+    """
+    click.echo(benchmark_html_parser(pages_dir, repeat))
+
+
+if __name__ == '__main__':
+    benchmark_html_parser_command()
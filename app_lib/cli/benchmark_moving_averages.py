@@ -0,0 +1,24 @@
+"""
+CLI module
+"""
+import click
+from app_lib.benchmarks.moving_average_benchmark import benchmark_moving_averages
+
+
+@click.command(name='benchmark_moving_averages')
+@click.option('--size', multiple=True, type=int, help='Number of prices, it can be repeated. '
+                                                      'By default 10000, 100000 and 1000000.')
+@click.option('--loop_max', default=100000, help='Larger sizes are not timed with the loops over windows.')
+@click.option('--repeat', default=3, help='Runs per case, the best time is reported.')
+def benchmark_moving_averages_command(size: tuple, loop_max: int, repeat: int) -> None:
+    """
+    Compares the O(n) moving average kernels with the loops over windows
+    :param size:
+    :param loop_max:
+    :param repeat:
+    """
+    click.echo(benchmark_moving_averages(size or (10000, 100000, 1000000), loop_max=loop_max, repeat=repeat))
+
+
+if __name__ == '__main__':
+    benchmark_moving_averages_command()
@@ -0,0 +1,30 @@
+"""
+CLI module
+"""
+import click
+from app_lib.benchmarks.provider_benchmark import benchmark_providers
+
+
+@click.command(name='benchmark_providers')
+@click.option('--quotes', default=100, help='Number of quotes per case.')
+@click.option('--hedge_delay', default=0.3, help='Seconds before requesting the backup provider.')
+@click.option('--latency', default=0.05, help='Seconds of a normal answer of the primary provider.')
+@click.option('--slow_latency', default=2., help='Seconds of a slow answer of the primary provider.')
+@click.option('--slow_rate', default=0.1, help='Probability of a slow answer of the primary provider.')
+@click.option('--error_rate', default=0.05, help='Probability of a failed answer of the primary provider.')
+def benchmark_providers_command(quotes: int, hedge_delay: float, latency: float, slow_latency: float,
+                                slow_rate: float, error_rate: float) -> None:
+    """
+    Compares quote latency of a single unreliable price provider against hedged requests with stand-in providers
+    :param quotes:
+    :param hedge_delay:
+    :param latency:
+    :param slow_latency:
+    :param slow_rate:
+    :param error_rate:
+    """
+    click.echo(benchmark_providers(quotes, hedge_delay, latency, slow_latency, slow_rate, error_rate))
+
+
+if __name__ == '__main__':
+    benchmark_providers_command()
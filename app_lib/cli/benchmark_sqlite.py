@@ -0,0 +1,27 @@
+"""
+CLI module
+"""
+import click
+from app_lib.benchmarks.sqlite_benchmark import benchmark_concurrent_reads
+
+
+@click.command(name='benchmark_sqlite')
+@click.option('--preload', default=20000, help='Rows in the table before the backfill.')
+@click.option('--rows', default=100000, help='Backfilled rows.')
+@click.option('--batch', default=100, help='Rows per insert.')
+@click.option('--readers', default=4, help='Reader threads.')
+@click.option('--read_days', default=180, help='Rows of every read.')
+def benchmark_sqlite_command(preload: int, rows: int, batch: int, readers: int, read_days: int) -> None:
+    """
+    Measures read latency while a backfill writes the database, with and without WAL and the write queue
+    :param preload:
+    :param rows:
+    :param batch:
+    :param readers:
+    :param read_days:
+    """
+    click.echo(benchmark_concurrent_reads(preload, rows, batch, readers, read_days))
+
+
+if __name__ == '__main__':
+    benchmark_sqlite_command()
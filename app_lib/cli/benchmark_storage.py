@@ -0,0 +1,28 @@
+"""
+CLI module
+"""
+import click
+from app_lib.benchmarks.storage_benchmark import benchmark_storages, BACKENDS
+
+
+@click.command(name='benchmark_storage')
+@click.option('--rows', default=1000000, help='Inserted rows.')
+@click.option('--batch', default=1000, help='Rows per insert.')
+@click.option('--reads', default=1000, help='Range reads of every read API.')
+@click.option('--read_days', default=180, help='Rows of every read.')
+@click.option('--backend', multiple=True, type=click.Choice(BACKENDS),
+              help='Backend to measure, it can be repeated. By default every backend.')
+def benchmark_storage_command(rows: int, batch: int, reads: int, read_days: int, backend: tuple) -> None:
+    """
+    Measures insert throughput, range read latency and size per million rows of the storage backends
+    :param rows:
+    :param batch:
+    :param reads:
+    :param read_days:
+    :param backend:
+    """
+    click.echo(benchmark_storages(rows, batch, reads, read_days, backend or BACKENDS))
+
+
+if __name__ == '__main__':
+    benchmark_storage_command()
@@ -0,0 +1,29 @@
+"""
+CLI module
+"""
+import click
+from app_lib.DDBB.sqlite.connection import DataBase
+from app_lib.DDBB.sqlite.models import get_model_names
+
+
+@click.command(name='migrate_database')
+def migrate_database() -> None:
+    """
+    Migrates every coin table to the DATE primary key schema removing repeated dates. Tables are also
+    migrated when their model is created, this command reports what was migrated
+    """
+    for model_name in get_model_names():
+        # plain DataBase, the model constructor would migrate the table without reporting it
+        db_object = DataBase()
+        db_object.table_name = model_name
+        if not db_object.check_if_table_exists():
+            click.echo(f'{model_name}: table does not exist')
+        elif db_object.check_if_table_migrated():
+            click.echo(f'{model_name}: already migrated')
+        else:
+            rows_before, rows_after = db_object.migrate_table()
+            click.echo(f'{model_name}: {rows_before} rows migrated, {rows_before - rows_after} repeated rows removed')
+
+
+if __name__ == '__main__':
+    migrate_database()
@@ -0,0 +1,75 @@
+"""
+CLI module
+"""
+import time
+import click
+from app_lib.DDBB.sqlite.models import set_model_backend, BACKENDS
+from app_lib.DDBB.sqlite.price_files import export_prices, import_prices, CHUNK_SIZE
+from app_lib.utils.num_str_utils import str_to_int
+
+
+@click.command(name='export_prices')
+@click.option('--file_path', required=True, help='File to write. Ex: prices.csv, prices.parquet or prices.arrow.')
+@click.option('--file_format', default=None, type=click.Choice(['csv', 'parquet', 'arrow']),
+              help='File format, by default from the file extension.')
+@click.option('--coin_logo', multiple=True, help='Logo of coin to export, it can be repeated. Ex: BTC.')
+@click.option('--date_from', default=None, help='Initial date to export. Ex: 20210101.')
+@click.option('--date_to', default=None, help='Final date to export. Ex: 20210131.')
+@click.option('--chunk_size', default=CHUNK_SIZE, help='Rows written together.')
+@click.option('--backend', default=None, type=click.Choice(BACKENDS),
+              help='Storage of the coin tables, by default the one in storage.json.')
+def export_prices_command(file_path: str, file_format: str, coin_logo: tuple, date_from: str, date_to: str,
+                          chunk_size: int, backend: str) -> None:
+    """
+    Exports the coin tables to a CSV, Parquet or Arrow file
+    :param file_path:
+    :param file_format:
+    :param coin_logo:
+    :param date_from:
+    :param date_to:
+    :param chunk_size:
+    :param backend:
+    """
+    if backend:
+        set_model_backend(backend)
+    start = time.perf_counter()
+    try:
+        rows = export_prices(
+            file_path, file_format, list(coin_logo) or None, str_to_int(date_from), str_to_int(date_to), chunk_size
+        )
+    except (ValueError, ImportError) as ex:
+        raise click.ClickException(str(ex))
+    click.echo(f'Exported {rows} rows to {file_path} in {time.perf_counter() - start:.2f} s')
+
+
+@click.command(name='import_prices')
+@click.option('--file_path', required=True, help='File to read. Ex: prices.csv, prices.parquet or prices.arrow.')
+@click.option('--file_format', default=None, type=click.Choice(['csv', 'parquet', 'arrow']),
+              help='File format, by default from the file extension.')
+@click.option('--chunk_size', default=CHUNK_SIZE, help='Rows read and committed together.')
+@click.option('--backend', default=None, type=click.Choice(BACKENDS),
+              help='Storage of the coin tables, by default the one in storage.json.')
+def import_prices_command(file_path: str, file_format: str, chunk_size: int, backend: str) -> None:
+    """
+    Imports a CSV, Parquet or Arrow file into the coin tables, existing dates are updated
+    :param file_path:
+    :param file_format:
+    :param chunk_size:
+    :param backend:
+    """
+    if backend:
+        set_model_backend(backend)
+    start = time.perf_counter()
+    try:
+        result = import_prices(file_path, file_format, chunk_size)
+    except (ValueError, ImportError) as ex:
+        raise click.ClickException(str(ex))
+    elapsed = time.perf_counter() - start
+    click.echo(f'Imported {sum(result["imported"].values())} rows of {len(result["imported"])} coins '
+               f'from {file_path} in {elapsed:.2f} s')
+    if result['skipped']:
+        click.echo(f'Skipped {result["skipped"]} rows of coins without database entry')
+
+
+if __name__ == '__main__':
+    export_prices_command()
@@ -0,0 +1,24 @@
+"""
+CLI module
+"""
+import time
+import click
+from app_lib.data_science.indicators.batch import refresh_indicators
+
+
+@click.command(name='refresh_indicators')
+@click.option('--coin_logo', multiple=True, help='Logo of coin to refresh, it can be repeated. Ex: BTC.')
+@click.option('--windowed', is_flag=True, help='Windowed exponential moving averages instead of recursive ones.')
+def refresh_indicators_command(coin_logo: tuple, windowed: bool) -> None:
+    """
+    Computes and saves the last indicators of every coin, as the nightly refresh
+    :param coin_logo:
+    :param windowed:
+    """
+    start = time.perf_counter()
+    indicators = refresh_indicators(list(coin_logo) or None, windowed=windowed)
+    click.echo(f'Refreshed indicators of {len(indicators)} coins in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    refresh_indicators_command()
@@ -0,0 +1,45 @@
+"""
+CLI module
+"""
+import click
+from app_lib.benchmarks.tick_benchmark import record_fixtures, benchmark_ticks
+from app_lib.extract_lib.http_replay import FIXTURES_PATH
+
+
+@click.command(name='record_fixtures')
+@click.option('--path', default=FIXTURES_PATH, help='Fixture directory.')
+def record_fixtures_command(path: str = FIXTURES_PATH) -> None:
+    """
+    Runs the extraction pipeline once saving every response as a fixture
+    :param path:
+    """
+    click.echo(record_fixtures(path))
+
+
+@click.command(name='benchmark_ticks')
+@click.option('--path', default=FIXTURES_PATH, help='Fixture directory.')
+@click.option('--ticks', default=10, help='Number of measured ticks.')
+@click.option('--latency', default=0., help='Seconds waited before every replayed response. Ex: 0.2.')
+@click.option('--jitter', default=0., help='Maximum random seconds added to latency. Ex: 0.1.')
+@click.option('--error_rate', default=0., help='Probability of a connection error. Ex: 0.05.')
+@click.option('--workers', default=8, help='Extractor workers.')
+@click.option('--bulk/--no-bulk', default=True, help='Extractor bulk quotes mode.')
+@click.option('--min_max', is_flag=True, default=False, help='Option to also run min_max_extractor every tick.')
+def benchmark_ticks_command(path: str, ticks: int, latency: float, jitter: float, error_rate: float,
+                            workers: int, bulk: bool, min_max: bool) -> None:
+    """
+    Measures the tick throughput of the extraction pipeline replaying the recorded fixtures
+    :param path:
+    :param ticks:
+    :param latency:
+    :param jitter:
+    :param error_rate:
+    :param workers:
+    :param bulk:
+    :param min_max:
+    """
+    click.echo(benchmark_ticks(path, ticks, latency, jitter, error_rate, workers, bulk, min_max))
+
+
+if __name__ == '__main__':
+    benchmark_ticks_command()
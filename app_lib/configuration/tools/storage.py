@@ -0,0 +1,28 @@
+"""
+Storage configuration file.
+storage.json file contains the storage backend of the coin tables: sqlite, mmap or memory
+"""
+import os
+from json import loads
+import traceback
+from app_lib.utils.files_utils import transform_path
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('storage')
+STORAGE_PATH = str(os.getcwd()).split('app_lib')[0] + transform_path('/app_lib/configuration/json/storage.json')
+DEFAULT_BACKEND = 'sqlite'
+
+
+def get_storage_backend() -> str:
+    """
+    Returns the configured storage backend, sqlite if storage.json can not be read
+    :return:
+    """
+    backend = DEFAULT_BACKEND
+    try:
+        with open(STORAGE_PATH, 'r') as file:
+            backend = loads(file.read()).get('backend', DEFAULT_BACKEND)
+    except (IOError, ValueError) as ex:
+        __logger__.error('Error reading storage.json: %s\n%s', ex, traceback.format_exc())
+    return backend
@@ -0,0 +1,246 @@
+"""
+Indicators of every coin at once. Prices are a 2D matrix with a row per coin holding the prices of its own
+dates sorted ascending and aligned to the last column, NaN before the first price of a coin. Coins do not
+share columns, so a date missing in a coin is not a gap in its row, and every indicator is computed for the
+whole matrix in a single vectorized pass. Windows with a missing price are NaN as in moving_averages, and
+every row gives the same values as the per coin functions from its first price on
+"""
+import numpy as np
+from scipy.signal import lfilter
+from app_lib.DDBB.sqlite.models import get_model, get_model_names
+from app_lib.DDBB.sqlite.series_cache import get_series_cache
+from app_lib.DDBB.sqlite.indicator_store import IndicatorStore
+from app_lib.data_science.indicators.moving_averages import get_exponential_scaling_factors
+
+
+EMA_LENGTH = 20
+SMA_LENGTH = 50
+MACD_LENGTHS = (12, 26, 9)  # short EMA, long EMA and signal lengths
+RSI_LENGTH = 14
+INDICATORS = ('close', 'ema', 'sma', 'macd', 'signal', 'rsi')
+
+
+def get_price_matrix(logos: list = None, date_init: int = None, date_end: int = None) -> tuple:
+    """
+    Returns the close prices of the coins between given dates as a matrix, every row has the prices of the
+    dates of its coin aligned to the last column
+    :param logos: by default every coin, the ones without model are ignored
+    :param date_init: integer with YYYYMMDD form
+    :param date_end: integer with YYYYMMDD form
+    :return: tuple (logos, dates, matrix) with a row of matrix per logo, dates has the date of every price
+    and 0 before the first one
+    """
+    series = {}
+    for logo in (logos or get_model_names()):
+        db_model = get_model(logo)
+        if db_model is not None:
+            series[logo] = get_series_cache().get_arrays(db_model, date_init, date_end, columns=('DATE', 'CLOSE'))
+    if not series:
+        return [], np.empty((0, 0), dtype=np.int64), np.empty((0, 0))
+    size = max(arrays['DATE'].shape[0] for arrays in series.values())
+    dates = np.zeros((len(series), size), dtype=np.int64)
+    matrix = np.full((len(series), size), np.nan)
+    for row, arrays in enumerate(series.values()):
+        count = arrays['DATE'].shape[0]
+        dates[row, size - count:] = arrays['DATE'][::-1]
+        matrix[row, size - count:] = arrays['CLOSE'][::-1]
+    return list(series), dates, matrix
+
+
+def get_first_prices(matrix: np.array) -> np.array:
+    """
+    Returns the column of the first price of every row, the number of columns if a row does not have prices
+    :param matrix:
+    :return:
+    """
+    valid = ~np.isnan(matrix)
+    if matrix.shape[1] == 0:
+        return np.zeros(matrix.shape[0], dtype=np.int64)
+    return np.where(valid.any(axis=1), np.argmax(valid, axis=1), matrix.shape[1])
+
+
+def get_window_sums(values: np.array, length: int) -> np.array:
+    """
+    Returns the sum of every window of length columns, the number of true values of a boolean matrix
+    :param values:
+    :param length:
+    :return: matrix with the windows ending in the columns from length - 1 on
+    """
+    cumulative = np.concatenate((np.zeros((values.shape[0], 1), dtype=np.int64), np.cumsum(values, axis=1)), axis=1)
+    return cumulative[:, length:] - cumulative[:, :-length]
+
+
+def mask_warm_up(matrix: np.array, first: np.array, columns: int) -> np.array:
+    """
+    Sets NaN the values of every row before its first price plus the given columns
+    :param matrix:
+    :param first: column of the first price of every row
+    :param columns:
+    :return: matrix
+    """
+    matrix[np.arange(matrix.shape[1]) < (first + columns)[:, np.newaxis]] = np.nan
+    return matrix
+
+
+def batch_exponential_moving_average(matrix: np.array, length: int = EMA_LENGTH, windowed: bool = False) -> np.array:
+    """
+    Exponential moving average of every row as exponential_moving_average. The first length - 1 prices of
+    a row do not have average
+    :param matrix: prices with a row per coin and a column per date sorted ascending
+    :param length:
+    :param windowed: weighted average of the last length prices instead of the recursive average
+    :return: matrix with the same shape
+    """
+    if matrix.size == 0:
+        return np.full(matrix.shape, np.nan)
+    first = get_first_prices(matrix)
+    decay = 1. - 2 / length
+    if length <= 2:
+        exp_ma = matrix.copy()
+    elif windowed:
+        missing = np.isnan(matrix)
+        full_sum = lfilter([1.], [1., -decay], np.where(missing, 0., matrix), axis=1)
+        exp_ma = full_sum.copy()
+        exp_ma[:, length:] -= decay ** length * full_sum[:, :-length]
+        exp_ma /= get_exponential_scaling_factors(length).sum()
+        exp_ma[:, length - 1:][get_window_sums(missing, length) > 0] = np.nan
+    else:
+        # missing prices are the previous one and every row starts at its first price
+        columns = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[1]))
+        np.maximum.accumulate(columns, axis=1, out=columns)
+        prices = np.take_along_axis(matrix, columns, axis=1)
+        first_prices = matrix[np.arange(matrix.shape[0]), np.minimum(first, matrix.shape[1] - 1)]
+        prices = np.where(np.isnan(prices), first_prices[:, np.newaxis], prices)
+        exp_ma = lfilter([1. - decay], [1., -decay], prices, axis=1, zi=decay * prices[:, :1])[0]
+    return mask_warm_up(exp_ma, first, length - 1)
+
+
+def batch_simple_moving_average(matrix: np.array, length: int = SMA_LENGTH) -> np.array:
+    """
+    Simple moving average of every row as simple_moving_average. The first length - 1 prices of a row do
+    not have average
+    :param matrix: prices with a row per coin and a column per date sorted ascending
+    :param length:
+    :return: matrix with the same shape
+    """
+    missing = np.isnan(matrix)
+    cumulative = np.cumsum(np.where(missing, 0., matrix), axis=1)
+    sim_ma = np.full(matrix.shape, np.nan)
+    sim_ma[:, length - 1:] = cumulative[:, length - 1:]
+    sim_ma[:, length:] -= cumulative[:, :-length]
+    sim_ma /= length
+    sim_ma[:, length - 1:][get_window_sums(missing, length) > 0] = np.nan
+    return mask_warm_up(sim_ma, get_first_prices(matrix), length - 1)
+
+
+def batch_macd(matrix: np.array, short_length: int = MACD_LENGTHS[0], long_length: int = MACD_LENGTHS[1],
+               signal_length: int = MACD_LENGTHS[2], windowed: bool = False) -> tuple:
+    """
+    Moving average convergence divergence and its signal of every row, as get_macd
+    :param matrix: prices with a row per coin and a column per date sorted ascending
+    :param short_length:
+    :param long_length:
+    :param signal_length:
+    :param windowed: windowed exponential moving averages instead of the recursive ones
+    :return: tuple (macd, signal) of matrices with the same shape
+    """
+    macd = batch_exponential_moving_average(matrix, short_length, windowed) - \
+        batch_exponential_moving_average(matrix, long_length, windowed)
+    return macd, batch_exponential_moving_average(macd, signal_length, windowed)
+
+
+def batch_relative_strength_index(matrix: np.array, length: int = RSI_LENGTH) -> np.array:
+    """
+    Relative strength index of every row and date as relative_strength_index, from the ratios of the
+    last length prices to their previous one. Dates without length previous prices do not have index
+    :param matrix: prices with a row per coin and a column per date sorted ascending
+    :param length:
+    :return: matrix with the same shape
+    """
+    rsi = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] <= length:
+        return rsi
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = matrix[:, 1:] / matrix[:, :-1]
+        rises = ratios > 1
+        falls = ratios < 1
+        rise_sums = get_window_sums(np.where(rises, ratios - 1, 0.), length)
+        fall_sums = get_window_sums(np.where(falls, ratios - 1, 0.), length)
+        positive_avg = rise_sums / get_window_sums(rises, length)
+        negative_avg = fall_sums / get_window_sums(falls, length)
+        rsi[:, length:] = 100 - 100 / (1 - positive_avg / negative_avg)
+    return mask_warm_up(rsi, get_first_prices(matrix), length)
+
+
+def compute_indicators(matrix: np.array, ema_length: int = EMA_LENGTH, sma_length: int = SMA_LENGTH,
+                       macd_lengths: tuple = MACD_LENGTHS, rsi_length: int = RSI_LENGTH,
+                       windowed: bool = False) -> dict:
+    """
+    Computes every indicator of the price matrix
+    :param matrix: prices with a row per coin and a column per date sorted ascending
+    :param ema_length:
+    :param sma_length:
+    :param macd_lengths: short EMA, long EMA and signal lengths
+    :param rsi_length:
+    :param windowed: windowed exponential moving averages instead of the recursive ones
+    :return: dictionary {indicator: matrix} with the names in INDICATORS
+    """
+    macd, signal = batch_macd(matrix, *macd_lengths, windowed=windowed)
+    return {
+        'close': matrix,
+        'ema': batch_exponential_moving_average(matrix, ema_length, windowed),
+        'sma': batch_simple_moving_average(matrix, sma_length),
+        'macd': macd,
+        'signal': signal,
+        'rsi': batch_relative_strength_index(matrix, rsi_length)
+    }
+
+
+def get_latest_indicators(logos: list = None, date_init: int = None, date_end: int = None, **lengths) -> dict:
+    """
+    Returns the indicators of every coin at its last date with price between given dates
+    :param logos: by default every coin
+    :param date_init: integer with YYYYMMDD form, the first price used
+    :param date_end: integer with YYYYMMDD form
+    :param lengths: compute_indicators lengths and windowed
+    :return: dictionary {logo: {'date': date, indicator: value}}, missing values are None
+    """
+    logos, dates, matrix = get_price_matrix(logos, date_init, date_end)
+    if not logos:
+        return {}
+    indicators = compute_indicators(matrix, **lengths)
+    valid = ~np.isnan(matrix)
+    last = matrix.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    latest = {}
+    for row, logo in enumerate(logos):
+        if valid[row].any():
+            latest[logo] = {'date': int(dates[row, last[row]])}
+            for name in INDICATORS:
+                value = indicators[name][row, last[row]]
+                latest[logo][name] = None if np.isnan(value) else float(value)
+    return latest
+
+
+def refresh_indicators(logos: list = None, **lengths) -> dict:
+    """
+    Computes the latest indicators of every coin and saves them in the indicator store, run once a day
+    after the daily prices are saved
+    :param logos: by default every coin
+    :param lengths: compute_indicators lengths and windowed
+    :return: dictionary {logo: {'date': date, indicator: value}}
+    """
+    latest = get_latest_indicators(logos, **lengths)
+    IndicatorStore().set_indicators(latest)
+    return latest
+
+
+def refresh_missing_indicators(**lengths) -> dict:
+    """
+    Computes and saves the latest indicators of the coins without saved indicators, run when the extractor
+    starts so readers find the indicators of every coin
+    :param lengths: compute_indicators lengths and windowed
+    :return: dictionary {logo: {'date': date, indicator: value}} of the missing coins
+    """
+    stored = IndicatorStore().get_latest()
+    missing = [logo for logo in get_model_names() if logo not in stored]
+    return refresh_indicators(missing, **lengths) if missing else {}
@@ -7,6 +7,8 @@ import matplotlib.gridspec as gridspec
 from matplotlib.ticker import FormatStrFormatter
 from sklearn.linear_model import LinearRegression
 from app_lib.DDBB.sqlite.models import get_model
+from app_lib.DDBB.sqlite.series_cache import get_series_cache
+from app_lib.DDBB.sqlite.rollups import get_rollup_store
 from app_lib.data_science.indicators.moving_averages import exponential_moving_average, simple_moving_average, \
     weighted_average, get_linear_scaling_factors, get_exponential_scaling_factors
 from app_lib.data_science.indicators.RSI import relative_strength_index
@@ -19,36 +21,57 @@ from app_lib.data_science.indicators.plot_settings import get_x_ticks_and_labels
 image_saving_path = get_absolute_path('/static/images/')
 
 
-def get_ema(coin_logo: str, date_init: int = None, date_end: int = None, length: int = None):
+def get_close_prices(db_model, date_init: int = None, date_end: int = None, period: str = None) -> np.array:
+    """
+    Returns a 2D array with dates and close prices sorted by date descending. Daily prices are stacked from
+    the series cache, which reads the model history once
+    :param db_model:
+    :param date_init:
+    :param date_end:
+    :param period: None for daily prices, 'week' or 'month' for the close prices of the rollup bars
+    :return:
+    """
+    if period:
+        bars = get_rollup_store().get_bars(db_model.table_name, period, date_init, date_end)
+        return np.array([(bar[0], bar[2]) for bar in bars], dtype=np.float64).reshape(-1, 2)
+    columns = get_series_cache().get_arrays(db_model, date_init, date_end, columns=('DATE', 'CLOSE'))
+    return np.column_stack((columns['DATE'], columns['CLOSE']))
+
+
+def get_ema(coin_logo: str, date_init: int = None, date_end: int = None, length: int = None, period: str = None,
+            windowed: bool = False):
     """
     Returns the exponential moving average from selected coin in the given date interval
     :param coin_logo:
     :param date_init:
     :param date_end:
     :param length:
+    :param period: None for daily prices, 'week' or 'month'
+    :param windowed: weighted average of the last length prices instead of the recursive average
     :return:
     """
     db_model = get_model(coin_logo)
     if db_model:
-        close_prices = db_model.get_close_prices(date_init, date_end)
-        ema = exponential_moving_average(np.array(close_prices), length)
+        close_prices = get_close_prices(db_model, date_init, date_end, period)
+        ema = exponential_moving_average(close_prices, length, windowed)
         return ema
     return np.array([])
 
 
-def get_sma(coin_logo: str, date_init: int = None, date_end: int = None, length: int = None):
+def get_sma(coin_logo: str, date_init: int = None, date_end: int = None, length: int = None, period: str = None):
     """
     Returns the simple moving average from selected coin in the given date interval
     :param coin_logo:
     :param date_init:
     :param date_end:
     :param length:
+    :param period: None for daily prices, 'week' or 'month'
     :return:
     """
     db_model = get_model(coin_logo)
     if db_model:
-        close_prices = db_model.get_close_prices(date_init, date_end)
-        sma = simple_moving_average(np.array(close_prices), length)
+        close_prices = get_close_prices(db_model, date_init, date_end, period)
+        sma = simple_moving_average(close_prices, length)
         return sma
     return np.array([])
 
@@ -65,7 +88,7 @@ def save_ema_sma_plot(coin_logo: str, file_name, date_init: int = None, date_end
     db_model = get_model(coin_logo)
     if not db_model:
         return False
-    close_prices = np.array(db_model.get_close_prices(date_init, date_end))
+    close_prices = get_close_prices(db_model, date_init, date_end)
     ema = exponential_moving_average(close_prices)
     sma = simple_moving_average(close_prices)
     min_length = min([close_prices.shape[0], ema.shape[0], sma.shape[0]])
@@ -98,7 +121,7 @@ def save_web_plots(coin_logo: str, file_name, date_init: int = None, date_end: i
     db_model = get_model(coin_logo)
     if not db_model:
         return False
-    close_prices = np.array(db_model.get_close_prices(date_init, date_end))
+    close_prices = get_close_prices(db_model, date_init, date_end)
     ema = exponential_moving_average(close_prices)
     sma = simple_moving_average(close_prices)
     macd_short, signal_short = get_macd(coin_logo, date_init, date_end, short_length=6, long_length=19)
@@ -151,26 +174,28 @@ def save_web_plots(coin_logo: str, file_name, date_init: int = None, date_end: i
         # plt.show()
 
 
-def get_rsi(coin_logo: str, date_init: int = None, date_end: int = None, length: int = None):
+def get_rsi(coin_logo: str, date_init: int = None, date_end: int = None, length: int = None, period: str = None):
     """
     Returns the relative strength index from selected coin in the given date interval
     :param coin_logo:
     :param date_init:
     :param date_end:
     :param length:
+    :param period: None for daily prices, 'week' or 'month'
     :return:
     """
     db_model = get_model(coin_logo)
     if db_model:
-        close_prices = db_model.get_close_prices(date_init, date_end)
-        rsi = relative_strength_index(np.array(close_prices))
+        close_prices = get_close_prices(db_model, date_init, date_end, period)
+        rsi = relative_strength_index(close_prices)
         return rsi
     return 50.
 
 
 def get_macd(
         coin_logo: str, date_init: int = None, date_end: int = None,
-        short_length: int = 12, long_length: int = 26, signal_length: int = 9
+        short_length: int = 12, long_length: int = 26, signal_length: int = 9, period: str = None,
+        windowed: bool = False
 ):
     """
     Returns the mean average convergence divergence and its signal from selected
@@ -181,17 +206,19 @@ def get_macd(
     :param short_length:
     :param long_length:
     :param signal_length:
+    :param period: None for daily prices, 'week' or 'month'
+    :param windowed: windowed exponential moving averages instead of the recursive ones
     :return:
     """
     db_model = get_model(coin_logo)
     if not db_model:
         return False
-    close_prices = np.array(db_model.get_close_prices(date_init, date_end))
-    short_ema = exponential_moving_average(close_prices, length=short_length)
-    long_ema = exponential_moving_average(close_prices, length=long_length)
+    close_prices = get_close_prices(db_model, date_init, date_end, period)
+    short_ema = exponential_moving_average(close_prices, length=short_length, windowed=windowed)
+    long_ema = exponential_moving_average(close_prices, length=long_length, windowed=windowed)
     min_length = min([short_ema.shape[0], long_ema.shape[0]])
     macd = np.array([short_ema[:min_length, 0], short_ema[:min_length, 1]-long_ema[:min_length, 1]]).transpose()
-    signal = exponential_moving_average(macd, length=signal_length)
+    signal = exponential_moving_average(macd, length=signal_length, windowed=windowed)
     min_length = min([macd.shape[0], signal.shape[0]])
     return macd[:min_length], signal[:min_length]
 
@@ -1,38 +1,94 @@
 """
-File where we compute different moving averages
+File where we compute different moving averages. Data arrays are sorted by date descending, as the
+database reads, and averages are computed over the reversed (ascending) prices in O(n)
 """
+from functools import lru_cache
 import numpy as np
+from scipy.signal import lfilter
 
 
-def exponential_moving_average(data: np.array, length: int = None):
+def exponential_moving_average(data: np.array, length: int = None, windowed: bool = False):
     """
-    Function used to compute the exponential moving average from data
+    Function used to compute the exponential moving average from data. By default it is the recursive
+    EMA, ema = alpha * price + (1 - alpha) * previous ema with alpha = 2 / length, started at the first price.
+    With windowed it is the weighted average of the last length prices with the exponential scaling factors
     :param data: 2D array with dates and data
     :param length:
-    :return:
+    :param windowed: weighted average of the last length prices, as the averages before the recursive one
+    :return: 2D array with the dates of the last data.shape[0] - length + 1 prices and the average
     """
     if not length:
         length = 20 if 20 <= data.shape[0] else data.shape[0]
-    scaling_factors = get_exponential_scaling_factors(length)
-    exp_ma = np.array(
-        [weighted_average(data[elem:elem+length, 1], scaling_factors) for elem in range(data.shape[0]-length+1)]
-    )
-    return np.array([data[:exp_ma.shape[0], 0], exp_ma]).transpose()
+    size = data.shape[0] - length + 1
+    if length <= 0 or size <= 0:
+        return np.empty((0, 2))
+    prices = data[::-1, 1].astype(np.float64)
+    decay = 1. - 2 / length
+    if length <= 2:
+        # the only weight that is not zero is the one of the price
+        exp_ma = prices[length - 1:]
+    elif windowed:
+        # the weighted sum of a window is the recursive sum minus its value length prices before, scaled:
+        # window_sum[t] = full_sum[t] - decay ** length * full_sum[t-length]
+        missing = np.isnan(prices)
+        full_sum = lfilter([1.], [1., -decay], np.where(missing, 0., prices))
+        exp_ma = full_sum[length - 1:].copy()
+        exp_ma[1:] -= decay ** length * full_sum[:-length]
+        exp_ma /= get_exponential_scaling_factors(length).sum()
+        exp_ma[get_window_counts(missing, length) > 0] = np.nan
+    else:
+        # missing prices are the previous one, the average starts at the first price
+        prices = fill_missing(prices)
+        valid = ~np.isnan(prices)
+        exp_ma = np.full(prices.shape[0], np.nan)
+        if valid.any():
+            first = np.argmax(valid)
+            exp_ma[first:] = lfilter([1. - decay], [1., -decay], prices[first:], zi=[decay * prices[first]])[0]
+        exp_ma = exp_ma[length - 1:]
+    return np.array([data[:size, 0], exp_ma[::-1]]).transpose()
 
 
 def simple_moving_average(data: np.array, length: int = None):
     """
-    Function used to compute the simple moving average from data
+    Function used to compute the simple moving average from data, window sums are differences of the
+    cumulative sum. Averages of windows with a missing price are NaN
     :param data:
     :param length:
     :return:
     """
     if not length:
         length = 50 if 50 < data.shape[0] else data.shape[0]
-    sim_ma = np.array(
-        [data[elem:elem+length, 1].mean() for elem in range(data.shape[0]-length+1)]
-    )
-    return np.array([data[:sim_ma.shape[0], 0], sim_ma]).transpose()
+    size = data.shape[0] - length + 1
+    if length <= 0 or size <= 0:
+        return np.empty((0, 2))
+    prices = data[::-1, 1].astype(np.float64)
+    missing = np.isnan(prices)
+    cumulative = np.concatenate(([0.], np.cumsum(np.where(missing, 0., prices))))
+    sim_ma = (cumulative[length:] - cumulative[:-length]) / length
+    sim_ma[get_window_counts(missing, length) > 0] = np.nan
+    return np.array([data[:size, 0], sim_ma[::-1]]).transpose()
+
+
+def get_window_counts(values: np.array, length: int) -> np.array:
+    """
+    Returns the number of true values of every window of length values
+    :param values: boolean array
+    :param length:
+    :return:
+    """
+    cumulative = np.concatenate(([0], np.cumsum(values)))
+    return cumulative[length:] - cumulative[:-length]
+
+
+def fill_missing(prices: np.array) -> np.array:
+    """
+    Replaces missing prices with the previous one, leading missing prices are kept
+    :param prices: array sorted by date ascending
+    :return:
+    """
+    indexes = np.where(np.isnan(prices), 0, np.arange(prices.shape[0]))
+    np.maximum.accumulate(indexes, out=indexes)
+    return prices[indexes]
 
 
 def weighted_average(feature1: np.array, feature2: np.array):
@@ -47,21 +103,27 @@ def weighted_average(feature1: np.array, feature2: np.array):
     return .0
 
 
+@lru_cache(maxsize=128)
 def get_exponential_scaling_factors(length):
     """
-    Calculates scaling exponential factors
+    Calculates scaling exponential factors, they are cached and read-only
     :param length:
     :return:
     """
     alpha = 2 / length
-    return np.power(1. - alpha, np.arange(length))
+    scaling_factors = np.power(1. - alpha, np.arange(length))
+    scaling_factors.flags.writeable = False
+    return scaling_factors
 
 
+@lru_cache(maxsize=128)
 def get_linear_scaling_factors(length):
     """
-    Calculates scaling exponential factors
+    Calculates scaling linear factors, they are cached and read-only
     :param length:
     :return:
     """
     alpha = 2 / length
-    return np.array([1.-n*alpha for n in range(length)])
+    scaling_factors = np.array([1.-n*alpha for n in range(length)])
+    scaling_factors.flags.writeable = False
+    return scaling_factors
@@ -0,0 +1,486 @@
+"""
+Incremental indicators. Every indicator keeps the state needed to add the price of a new date in O(1), so
+the extractor updates them as prices arrive instead of computing them again over the whole history.
+The price of the last date can be updated again, so intraday prices update the indicators of the day until
+the next date arrives. States are dictionaries that can be saved as JSON
+"""
+import math
+import threading
+import time
+import traceback
+from collections import deque
+from app_lib.DDBB.sqlite.connection import add_write_listener
+from app_lib.DDBB.sqlite.indicator_store import IndicatorStateStore
+from app_lib.DDBB.sqlite.models import get_model
+from app_lib.DDBB.sqlite.write_queue import get_write_queue
+from app_lib.data_science.indicators.batch import EMA_LENGTH, SMA_LENGTH, MACD_LENGTHS, RSI_LENGTH
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('streaming_indicators')
+__indicator_streams__ = []
+__indicator_streams_lock__ = threading.Lock()
+
+
+class StreamingEMA:
+    """
+    Recursive exponential moving average, ema = alpha * price + (1 - alpha) * previous ema with
+    alpha = 2 / length, started at the first price as exponential_moving_average
+    """
+
+    def __init__(self, length: int = EMA_LENGTH):
+        self.length = length
+        self.date = None
+        self.count = 0
+        self.value = None
+        self.previous_value = None
+
+    def update(self, date: int, price: float):
+        """
+        Adds the price of a new date or updates the price of the last date
+        :param date: integer with YYYYMMDD form, not before the last one
+        :param price:
+        :return: average, None until length prices are added
+        """
+        if self.date is not None and date < self.date:
+            raise ValueError(f'Date {date} is before the last date {self.date}')
+        if date != self.date:
+            self.previous_value = self.value
+            self.count += 1
+            self.date = date
+        alpha = min(2 / self.length, 1.)
+        self.value = price if self.previous_value is None else self.previous_value + alpha * (price - self.previous_value)
+        return self.get_value()
+
+    def get_value(self):
+        return self.value if self.count >= self.length else None
+
+    def to_dict(self) -> dict:
+        return {'length': self.length, 'date': self.date, 'count': self.count, 'value': self.value,
+                'previous_value': self.previous_value}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        indicator = cls(state['length'])
+        indicator.date = state['date']
+        indicator.count = state['count']
+        indicator.value = state['value']
+        indicator.previous_value = state['previous_value']
+        return indicator
+
+
+class StreamingSMA:
+    """
+    Simple moving average with the last length prices and their running sum
+    """
+
+    def __init__(self, length: int = SMA_LENGTH):
+        self.length = length
+        self.date = None
+        self.window = deque(maxlen=length)
+        self.total = 0.
+
+    def update(self, date: int, price: float):
+        """
+        Adds the price of a new date or updates the price of the last date
+        :param date: integer with YYYYMMDD form, not before the last one
+        :param price:
+        :return: average, None until length prices are added
+        """
+        if self.date is not None and date < self.date:
+            raise ValueError(f'Date {date} is before the last date {self.date}')
+        if date == self.date:
+            self.total += price - self.window[-1]
+            self.window[-1] = price
+        else:
+            if len(self.window) == self.length:
+                self.total -= self.window[0]
+            self.window.append(price)
+            self.total += price
+            self.date = date
+        return self.get_value()
+
+    def get_value(self):
+        return self.total / self.length if len(self.window) == self.length else None
+
+    def to_dict(self) -> dict:
+        return {'length': self.length, 'date': self.date, 'window': list(self.window), 'total': self.total}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        indicator = cls(state['length'])
+        indicator.date = state['date']
+        indicator.window.extend(state['window'])
+        indicator.total = state['total']
+        return indicator
+
+
+class StreamingMACD:
+    """
+    Moving average convergence divergence, difference of the short and long averages, and its signal,
+    average of the differences from the first date with long average, as get_macd
+    """
+
+    def __init__(self, short_length: int = MACD_LENGTHS[0], long_length: int = MACD_LENGTHS[1],
+                 signal_length: int = MACD_LENGTHS[2]):
+        self.short_ema = StreamingEMA(short_length)
+        self.long_ema = StreamingEMA(long_length)
+        self.signal_ema = StreamingEMA(signal_length)
+
+    def update(self, date: int, price: float) -> tuple:
+        """
+        Adds the price of a new date or updates the price of the last date
+        :param date: integer with YYYYMMDD form, not before the last one
+        :param price:
+        :return: tuple (macd, signal), None until they have their averages
+        """
+        self.short_ema.update(date, price)
+        if self.long_ema.update(date, price) is not None:
+            self.signal_ema.update(date, self.short_ema.value - self.long_ema.value)
+        return self.get_value()
+
+    def get_value(self) -> tuple:
+        long_value = self.long_ema.get_value()
+        macd = None if long_value is None else self.short_ema.value - long_value
+        return macd, self.signal_ema.get_value()
+
+    def to_dict(self) -> dict:
+        return {'short_ema': self.short_ema.to_dict(), 'long_ema': self.long_ema.to_dict(),
+                'signal_ema': self.signal_ema.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        indicator = cls()
+        indicator.short_ema = StreamingEMA.from_dict(state['short_ema'])
+        indicator.long_ema = StreamingEMA.from_dict(state['long_ema'])
+        indicator.signal_ema = StreamingEMA.from_dict(state['signal_ema'])
+        return indicator
+
+
+class StreamingRSI:
+    """
+    Relative strength index with Wilder smoothing. The average gain and loss start as the mean of the
+    first length price changes and then average = (previous average * (length - 1) + change) / length
+    """
+
+    def __init__(self, length: int = RSI_LENGTH):
+        self.length = length
+        self.date = None
+        self.last_price = None
+        self.previous_price = None
+        self.count = 0
+        self.avg_gain = 0.
+        self.avg_loss = 0.
+        self.previous_state = (0, 0., 0.)
+
+    def update(self, date: int, price: float):
+        """
+        Adds the price of a new date or updates the price of the last date
+        :param date: integer with YYYYMMDD form, not before the last one
+        :param price:
+        :return: index, None until length price changes are added
+        """
+        if self.date is not None and date < self.date:
+            raise ValueError(f'Date {date} is before the last date {self.date}')
+        if date == self.date:
+            self.count, self.avg_gain, self.avg_loss = self.previous_state
+        else:
+            self.previous_state = (self.count, self.avg_gain, self.avg_loss)
+            self.previous_price = self.last_price
+            self.date = date
+        self.last_price = price
+        if self.previous_price is None:
+            return None
+        change = price - self.previous_price
+        self.count += 1
+        if self.count <= self.length:
+            self.avg_gain += max(change, 0.) / self.length
+            self.avg_loss += max(-change, 0.) / self.length
+        else:
+            self.avg_gain = (self.avg_gain * (self.length - 1) + max(change, 0.)) / self.length
+            self.avg_loss = (self.avg_loss * (self.length - 1) + max(-change, 0.)) / self.length
+        return self.get_value()
+
+    def get_value(self):
+        if self.count < self.length:
+            return None
+        if self.avg_loss == 0:
+            return 100. if self.avg_gain > 0 else 50.
+        return 100. - 100. / (1. + self.avg_gain / self.avg_loss)
+
+    def to_dict(self) -> dict:
+        return {'length': self.length, 'date': self.date, 'last_price': self.last_price,
+                'previous_price': self.previous_price, 'count': self.count, 'avg_gain': self.avg_gain,
+                'avg_loss': self.avg_loss, 'previous_state': list(self.previous_state)}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        indicator = cls(state['length'])
+        indicator.date = state['date']
+        indicator.last_price = state['last_price']
+        indicator.previous_price = state['previous_price']
+        indicator.count = state['count']
+        indicator.avg_gain = state['avg_gain']
+        indicator.avg_loss = state['avg_loss']
+        indicator.previous_state = tuple(state['previous_state'])
+        return indicator
+
+
+class StreamingRatioRSI:
+    """
+    Relative strength index from the ratios of the last length prices to their previous one, as
+    relative_strength_index and batch_relative_strength_index
+    """
+
+    def __init__(self, length: int = RSI_LENGTH):
+        self.length = length
+        self.date = None
+        self.last_price = None
+        self.previous_price = None
+        self.ratios = deque(maxlen=length)
+
+    def update(self, date: int, price: float):
+        """
+        Adds the price of a new date or updates the price of the last date
+        :param date: integer with YYYYMMDD form, not before the last one
+        :param price:
+        :return: index, None until length ratios are added
+        """
+        if self.date is not None and date < self.date:
+            raise ValueError(f'Date {date} is before the last date {self.date}')
+        if date == self.date:
+            if self.previous_price is not None:
+                self.ratios[-1] = price / self.previous_price
+        else:
+            self.previous_price = self.last_price
+            if self.previous_price is not None:
+                self.ratios.append(price / self.previous_price)
+            self.date = date
+        self.last_price = price
+        return self.get_value()
+
+    def get_value(self):
+        if len(self.ratios) < self.length:
+            return None
+        rises = [ratio - 1 for ratio in self.ratios if ratio > 1]
+        falls = [ratio - 1 for ratio in self.ratios if ratio < 1]
+        if not rises or not falls:
+            return None
+        return 100. - 100. / (1. - (sum(rises) / len(rises)) / (sum(falls) / len(falls)))
+
+    def to_dict(self) -> dict:
+        return {'length': self.length, 'date': self.date, 'last_price': self.last_price,
+                'previous_price': self.previous_price, 'ratios': list(self.ratios)}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        indicator = cls(state['length'])
+        indicator.date = state['date']
+        indicator.last_price = state['last_price']
+        indicator.previous_price = state['previous_price']
+        indicator.ratios.extend(state['ratios'])
+        return indicator
+
+
+class IndicatorStream:
+    """
+    Incremental indicators of a coin: EMA, SMA, MACD and its signal, RSI with the ratio definition of the
+    batch indicators and RSI with Wilder smoothing
+    """
+
+    def __init__(self, ema_length: int = EMA_LENGTH, sma_length: int = SMA_LENGTH,
+                 macd_lengths: tuple = MACD_LENGTHS, rsi_length: int = RSI_LENGTH):
+        self.date = None
+        self.close = None
+        self.previous = None  # (date, close) of the date before the last one
+        self.ema = StreamingEMA(ema_length)
+        self.sma = StreamingSMA(sma_length)
+        self.macd = StreamingMACD(*macd_lengths)
+        self.rsi = StreamingRatioRSI(rsi_length)
+        self.rsi_wilder = StreamingRSI(rsi_length)
+
+    def update(self, date: int, price: float) -> dict:
+        """
+        Adds the price of a new date or updates the price of the last date, missing prices are ignored
+        :param date: integer with YYYYMMDD form, not before the last one
+        :param price:
+        :return: values as get_values
+        """
+        if price is not None and not math.isnan(price):
+            for indicator in (self.ema, self.sma, self.macd, self.rsi, self.rsi_wilder):
+                indicator.update(date, price)
+            if date != self.date:
+                self.previous = (self.date, self.close)
+            self.date = date
+            self.close = price
+        return self.get_values()
+
+    def get_values(self) -> dict:
+        """
+        Returns the indicators at the last date
+        :return: dictionary {'date': date, indicator: value} as batch.get_latest_indicators, with the Wilder
+        RSI as 'rsi_wilder'
+        """
+        macd, signal = self.macd.get_value()
+        return {'date': self.date, 'close': self.close, 'ema': self.ema.get_value(), 'sma': self.sma.get_value(),
+                'macd': macd, 'signal': signal, 'rsi': self.rsi.get_value(), 'rsi_wilder': self.rsi_wilder.get_value()}
+
+    def to_dict(self) -> dict:
+        return {'date': self.date, 'close': self.close, 'previous': self.previous, 'ema': self.ema.to_dict(),
+                'sma': self.sma.to_dict(), 'macd': self.macd.to_dict(), 'rsi': self.rsi.to_dict(),
+                'rsi_wilder': self.rsi_wilder.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: dict):
+        stream = cls()
+        stream.date = state['date']
+        stream.close = state['close']
+        stream.previous = tuple(state['previous']) if state['previous'] else None
+        stream.ema = StreamingEMA.from_dict(state['ema'])
+        stream.sma = StreamingSMA.from_dict(state['sma'])
+        stream.macd = StreamingMACD.from_dict(state['macd'])
+        stream.rsi = StreamingRatioRSI.from_dict(state['rsi'])
+        stream.rsi_wilder = StreamingRSI.from_dict(state['rsi_wilder'])
+        return stream
+
+    @classmethod
+    def from_history(cls, dates: list, prices: list, **lengths):
+        """
+        Returns the stream with every price added
+        :param dates: integers with YYYYMMDD form sorted ascending
+        :param prices:
+        :param lengths: IndicatorStream lengths
+        :return:
+        """
+        stream = cls(**lengths)
+        for date, price in zip(dates, prices):
+            stream.update(date, price)
+        return stream
+
+
+class IndicatorStreams:
+    """
+    Indicator streams of every coin, updated with the extracted prices and with the daily rows written
+    in the coin tables. Their states and values are saved in the indicator state store through the
+    write queue, so readers of any process fetch the last values
+    """
+
+    def __init__(self, store: IndicatorStateStore = None):
+        """
+        Constructor of IndicatorStreams
+        :param store: by default a new IndicatorStateStore
+        """
+        self.store = store if store is not None else IndicatorStateStore()
+        self.__streams = {}
+        self.__lock = threading.RLock()
+
+    def add_tick(self, data: list, tick_time: float = None) -> None:
+        """
+        Updates the indicators of the day with the prices of a tick
+        :param data: list of prepare_row dictionaries
+        :param tick_time: unix time in seconds, by default now. Days are UTC as the daily candles
+        :return:
+        """
+        date = int(time.strftime('%Y%m%d', time.gmtime(tick_time)))
+        rows = []
+        with self.__lock:
+            for item in data:
+                if item['logo'] and item['amount']:
+                    stream = self.get_stream(item['logo'])
+                    if stream is not None and (stream.date is None or date >= stream.date):
+                        stream.update(date, item['amount'])
+                        rows.append(self.store.get_row(item['logo'], stream.get_values(), stream.to_dict()))
+        get_write_queue(self.store.db_location).put(self.store, rows)
+
+    def get_stream(self, logo: str):
+        """
+        Returns the stream of a coin. The first time it is loaded from the store and updated with the daily
+        rows saved since then, or built from the coin history
+        :param logo:
+        :return: IndicatorStream or None if the coin does not have model
+        """
+        with self.__lock:
+            stream = self.__streams.get(logo)
+            if stream is not None:
+                return stream
+            db_model = get_model(logo)
+            if db_model is None:
+                return None
+            state = self.store.get_state(logo)
+            stream = IndicatorStream.from_dict(state) if state is not None else None
+            if stream is None or stream.date is None:
+                return self.build_stream(logo)
+            arrays = db_model.get_arrays(date_init=stream.date, columns=('DATE', 'CLOSE'), order='ASC')
+            for date, price in zip(arrays['DATE'].tolist(), arrays['CLOSE'].tolist()):
+                stream.update(date, price)
+            self.__streams[logo] = stream
+            return stream
+
+    def build_stream(self, logo: str):
+        """
+        Builds the stream of a coin again from its history
+        :param logo:
+        :return: IndicatorStream or None if the coin does not have model
+        """
+        db_model = get_model(logo)
+        if db_model is None:
+            return None
+        arrays = db_model.get_arrays(columns=('DATE', 'CLOSE'), order='ASC')
+        stream = IndicatorStream.from_history(arrays['DATE'].tolist(), arrays['CLOSE'].tolist())
+        with self.__lock:
+            self.__streams[logo] = stream
+        return stream
+
+    def on_write(self, db_location: str, table_name: str, tuples_array: list) -> None:
+        """
+        Write listener, adds the daily rows of the coins with stream. The daily candle of the previous date
+        is already in the stream, other rows before the last date are not incremental and the stream is
+        built again from the coin history
+        :param db_location:
+        :param table_name:
+        :param tuples_array:
+        :return:
+        """
+        with self.__lock:
+            stream = self.__streams.get(table_name)
+            db_model = get_model(table_name) if stream is not None else None
+            if db_model is None or db_model.db_location != db_location:
+                return
+            try:
+                rows = sorted((row for row in tuples_array if tuple(row[:2]) != stream.previous), key=lambda row: row[0])
+                if not rows:
+                    return
+                if stream.date is not None and rows[0][0] < stream.date:
+                    stream = self.build_stream(table_name)
+                else:
+                    for row in rows:
+                        stream.update(row[0], row[1])
+            except Exception as ex:
+                self.__streams.pop(table_name, None)
+                __logger__.error('Exception updating %s indicators: %s\n%s', table_name, ex, traceback.format_exc())
+                return
+        get_write_queue(self.store.db_location).put(self.store, [self.store.get_row(table_name, stream.get_values(), stream.to_dict())])
+
+
+def get_indicator_streams() -> IndicatorStreams:
+    """
+    Returns the indicator streams of the app listening to the coin table writes, they are created the first time
+    :return:
+    """
+    if not __indicator_streams__:
+        with __indicator_streams_lock__:
+            if not __indicator_streams__:
+                indicator_streams = IndicatorStreams()
+                add_write_listener(indicator_streams.on_write)
+                __indicator_streams__.append(indicator_streams)
+    return __indicator_streams__[0]
+
+
+def get_streaming_indicators(logos: list = None) -> dict:
+    """
+    Returns the last indicators saved by the streams, without computing them
+    :param logos: by default every coin with streams
+    :return: dictionary {logo: {'date': date, indicator: value}}
+    """
+    return IndicatorStateStore().get_values(logos)
+
@@ -0,0 +1,102 @@
+"""
+Tests of the batch indicators: the matrix against the per coin functions and the saved indicators
+"""
+import numpy as np
+import pytest
+from flask import Flask
+from app_lib.DDBB.sqlite import models
+from app_lib.DDBB.sqlite.connection import close_connection
+from app_lib.DDBB.sqlite.indicator_store import IndicatorStore
+from app_lib.DDBB.sqlite.rollups import get_rollup_store
+from app_lib.data_science.indicators import batch
+from app_lib.data_science.indicators.moving_averages import exponential_moving_average, simple_moving_average
+from app_lib.data_science.indicators.RSI import relative_strength_index
+from app_lib.data_science.indicators.batch import batch_exponential_moving_average, batch_simple_moving_average, \
+    batch_relative_strength_index
+from app_lib.views.blueprint_v1 import indicators_data
+
+
+def get_prices(size: int, seed: int = 0) -> np.array:
+    return np.cumsum(np.random.default_rng(seed).normal(0, 1, size)) + 100
+
+
+def get_data(prices: np.array) -> np.array:
+    """
+    2D array (date, close) sorted by date descending, as the database reads
+    """
+    return np.array([np.arange(prices.shape[0], 0, -1), prices[::-1]]).transpose()
+
+
+def get_matrix(series: list) -> np.array:
+    """
+    Batch matrix of the series aligned to the last column
+    """
+    matrix = np.full((len(series), max(prices.shape[0] for prices in series)), np.nan)
+    for row, prices in enumerate(series):
+        matrix[row, matrix.shape[1] - prices.shape[0]:] = prices
+    return matrix
+
+
+@pytest.fixture
+def indicator_store(monkeypatch, tmp_path):
+    """
+    Memory coin models BTC and ETH with prices and an indicator store in a temporary database
+    """
+    db_location = str(tmp_path / 'crypto_database')
+    monkeypatch.setattr(models, '__models__', {})
+    monkeypatch.setattr(models, '__model_backend__', [models.MEMORY_BACKEND])
+    monkeypatch.setattr(models, '__model_names__', ['BTC', 'ETH'])
+    monkeypatch.setattr(models, 'get_rollup_store', lambda: get_rollup_store(db_location))
+    monkeypatch.setattr(batch, 'IndicatorStore', lambda: IndicatorStore(db_location))
+    monkeypatch.setattr(indicators_data, 'IndicatorStore', lambda: IndicatorStore(db_location))
+    for seed, logo in enumerate(['BTC', 'ETH']):
+        models.get_model(logo).set_array_data([
+            (20200101 + day, price, price, price) for day, price in enumerate(get_prices(30, seed).tolist())
+        ])
+    yield IndicatorStore(db_location)
+    for db_model in models.__models__.values():
+        db_model.drop_table()
+    close_connection(db_location)
+
+
+@pytest.mark.parametrize('windowed', [False, True])
+def test_batch_ema_equals_per_coin(windowed):
+    series = [get_prices(150, 1), get_prices(90, 2)]
+    series[0][40] = np.nan
+    values = batch_exponential_moving_average(get_matrix(series), 20, windowed)
+    for row, prices in enumerate(series):
+        ema = exponential_moving_average(get_data(prices), 20, windowed)[::-1, 1]
+        np.testing.assert_allclose(values[row, -ema.shape[0]:], ema, rtol=1e-10)
+
+
+def test_batch_sma_equals_per_coin():
+    series = [get_prices(150, 3), get_prices(70, 4)]
+    series[0][100] = np.nan
+    values = batch_simple_moving_average(get_matrix(series), 50)
+    for row, prices in enumerate(series):
+        sma = simple_moving_average(get_data(prices), 50)[::-1, 1]
+        np.testing.assert_allclose(values[row, -sma.shape[0]:], sma, rtol=1e-10)
+
+
+def test_batch_rsi_equals_per_coin():
+    series = [get_prices(150, 5), get_prices(60, 6)]
+    values = batch_relative_strength_index(get_matrix(series), 14)
+    for row, prices in enumerate(series):
+        assert values[row, -1] == pytest.approx(relative_strength_index(get_data(prices), 14))
+
+
+def test_refresh_saves_the_latest_indicators(indicator_store):
+    latest = batch.refresh_indicators(['BTC'])
+    assert latest['BTC']['date'] == 20200130
+    assert indicator_store.get_latest() == latest
+    assert batch.refresh_missing_indicators() == batch.get_latest_indicators(['ETH'])
+    assert batch.refresh_missing_indicators() == {}
+    assert set(indicator_store.get_latest()) == {'BTC', 'ETH'}
+
+
+def test_indicators_page_only_reads(indicator_store):
+    batch.refresh_indicators(['BTC'])
+    with Flask(__name__).app_context():
+        assert set(indicators_data.indicators_page().get_json()) == {'BTC'}
+        assert set(indicators_data.indicators_page('eth').get_json()) == set()
+    assert set(indicator_store.get_latest()) == {'BTC'}
@@ -0,0 +1,49 @@
+"""
+Tests of the O(n) moving average kernels against their definition
+"""
+import numpy as np
+import pytest
+from app_lib.data_science.indicators.moving_averages import exponential_moving_average, simple_moving_average, \
+    get_exponential_scaling_factors
+
+
+def get_prices(size: int, seed: int = 0) -> np.array:
+    return np.cumsum(np.random.default_rng(seed).normal(0, 1, size)) + 100
+
+
+def get_data(prices: np.array) -> np.array:
+    """
+    2D array (date, close) sorted by date descending, as the database reads
+    """
+    return np.array([np.arange(prices.shape[0], 0, -1), prices[::-1]]).transpose()
+
+
+@pytest.mark.parametrize('length', [3, 12, 20])
+def test_windowed_ema_is_the_weighted_window_average(length):
+    prices = get_prices(120)
+    factors = get_exponential_scaling_factors(length)
+    expected = [np.dot(prices[end - length + 1:end + 1][::-1], factors) / factors.sum()
+                for end in range(length - 1, prices.shape[0])]
+    ema = exponential_moving_average(get_data(prices), length, windowed=True)
+    np.testing.assert_allclose(ema[::-1, 1], expected, rtol=1e-10)
+
+
+def test_recursive_ema_is_the_recursion():
+    prices = get_prices(80, 1)
+    prices[30] = np.nan
+    # a missing price is the previous one
+    expected = [prices[0]]
+    for previous, price in zip(prices[:-1], prices[1:]):
+        price = previous if np.isnan(price) else price
+        expected.append(0.1 * price + 0.9 * expected[-1])
+    ema = exponential_moving_average(get_data(prices), 20)
+    np.testing.assert_allclose(ema[::-1, 1], expected[19:], rtol=1e-10)
+
+
+def test_sma_is_the_window_mean():
+    prices = get_prices(100, 2)
+    prices[60] = np.nan
+    expected = [prices[end - 9:end + 1].mean() for end in range(9, prices.shape[0])]
+    sma = simple_moving_average(get_data(prices), 10)
+    np.testing.assert_allclose(sma[::-1, 1], expected, rtol=1e-10)
+    assert np.isnan(sma[::-1, 1][51:61]).all()
@@ -0,0 +1,49 @@
+"""
+Tests of the streaming indicators against the batch ones and of their saved state
+"""
+import json
+import numpy as np
+import pytest
+from app_lib.DDBB.sqlite.connection import close_connection
+from app_lib.DDBB.sqlite.indicator_store import IndicatorStateStore
+from app_lib.data_science.indicators.batch import compute_indicators, INDICATORS
+from app_lib.data_science.indicators.streaming import IndicatorStream
+
+
+def get_prices(size: int, seed: int = 0) -> np.array:
+    return np.cumsum(np.random.default_rng(seed).normal(0, 1, size)) + 100
+
+
+def test_stream_equals_batch():
+    prices = get_prices(300, 7)
+    stream = IndicatorStream.from_history(list(range(prices.shape[0])), prices.tolist())
+    batch = compute_indicators(prices[np.newaxis, :])
+    values = stream.get_values()
+    for name in INDICATORS:
+        assert values[name] == pytest.approx(batch[name][0, -1], rel=1e-10)
+
+
+def test_stream_revision_and_state():
+    prices = get_prices(100, 8)
+    stream = IndicatorStream.from_history(list(range(100)), prices.tolist())
+    restored = IndicatorStream.from_dict(json.loads(json.dumps(stream.to_dict())))
+    restored.update(100, 1.)
+    restored.update(100, prices[-1] * 1.01)
+    expected = IndicatorStream.from_history(list(range(101)), prices.tolist() + [prices[-1] * 1.01])
+    assert restored.get_values() == pytest.approx(expected.get_values(), rel=1e-12)
+    with pytest.raises(ValueError):
+        restored.update(50, 1.)
+
+
+def test_state_store_keeps_the_stream(tmp_path):
+    db_location = str(tmp_path / 'crypto_database')
+    prices = get_prices(60, 9)
+    stream = IndicatorStream.from_history(list(range(20200101, 20200161)), prices.tolist())
+    store = IndicatorStateStore(db_location)
+    store.set_array_data([store.get_row('BTC', stream.get_values(), stream.to_dict())])
+    store = IndicatorStateStore(db_location)
+    restored = IndicatorStream.from_dict(store.get_state('BTC'))
+    assert restored.get_values() == stream.get_values()
+    assert store.get_values(['BTC', 'ETH'])['BTC']['rsi_wilder'] == pytest.approx(stream.get_values()['rsi_wilder'])
+    assert store.get_state('ETH') is None
+    close_connection(db_location)
@@ -2,7 +2,10 @@
 DataSeeker definition
 """
 import traceback
-import requests
+from json import loads
+from requests.exceptions import Timeout
+from app_lib.extract_lib import http_session
+from app_lib.extract_lib.response_cache import ResponseCache, is_offline
 from app_lib.log.log import get_log
 
 
@@ -11,16 +14,23 @@ __logger__ = get_log('data_seeker')
 
 class DataSeeker:
     """
-    DataSeeker is a class used to get the data from internet given the URL
+    DataSeeker is a class used to get the data from internet given the URL. Requests go through
+    the shared session layer (http_session) reusing keep-alive connections. With a response cache
+    the requests are conditional and, in offline mode, they are served only from cache
     """
     __OK = 200
+    __NOT_MODIFIED = 304
 
-    def __init__(self, url):
+    def __init__(self, url, cache: ResponseCache = None, fresh_time: float = None):
         """
         Constructor of DataSeeker
         :param url: url where data is seeked
+        :param cache: on-disk response cache, None to always request the url
+        :param fresh_time: seconds a cached response is served without a request, by default the cache one
         """
         self.url = url
+        self.cache = cache
+        self.fresh_time = fresh_time
 
     def get_html_data(self) -> str:
         """
@@ -29,11 +39,9 @@ class DataSeeker:
         """
         content = ''
         try:
-            response = requests.get(self.url)
-            if response.status_code == self.__OK:
-                content = response.content
-            else:
-                __logger__.debug('Error in response: status code %s', response.status_code)
+            content = self.__get_content() or ''
+        except Timeout as ex:
+            __logger__.error('Timeout: %s', ex)
         except ConnectionError as ex:
             __logger__.error('ConnectionError: %s\n%s', ex, traceback.format_exc())
         except Exception as ex:
@@ -48,13 +56,38 @@ class DataSeeker:
         """
         content = {}
         try:
-            response = requests.get(self.url)
-            if response.status_code == self.__OK:
-                content = response.json()
-            else:
-                __logger__.debug('Error in response: status code %s', response.status_code)
+            response_content = self.__get_content()
+            if response_content:
+                content = loads(response_content)
+        except Timeout as ex:
+            __logger__.error('Timeout: %s', ex)
         except ConnectionError as ex:
             __logger__.error('ConnectionError: %s\n%s', ex, traceback.format_exc())
         except Exception as ex:
             __logger__.error('Exception: %s\n%s', ex, traceback.format_exc())
         return content
+
+    def __get_content(self) -> bytes:
+        """
+        Returns the response body or None if the response is not OK
+        :return:
+        """
+        entry = None
+        headers = {}
+        if self.cache is not None:
+            entry = self.cache.get(self.url)
+            if is_offline() or self.cache.is_fresh(entry, self.fresh_time):
+                if entry is None:
+                    __logger__.debug('Offline mode: %s is not cached', self.url)
+                return entry['content'] if entry else None
+            headers = self.cache.conditional_headers(entry)
+        response = http_session.get(self.url, headers=headers)
+        if response.status_code == self.__OK:
+            if self.cache is not None:
+                self.cache.set(self.url, response.content, response.headers)
+            return response.content
+        if response.status_code == self.__NOT_MODIFIED and entry:
+            self.cache.validate(self.url, entry)
+            return entry['content']
+        __logger__.debug('Error in response: status code %s', response.status_code)
+        return None
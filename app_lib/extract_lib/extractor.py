@@ -1,27 +1,38 @@
 #
 # Extractor of cryptocurrency data from internet. Find, process and save the selected data.
 #
-import datetime as dt
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from app_lib.extract_lib.data_seeker import DataSeeker
 from app_lib.extract_lib.html_reader import HtmlReader
 from app_lib.extract_lib.json_reader import JsonReader
+from app_lib.extract_lib.fx_rate import FxRateProvider
+from app_lib.extract_lib.price_providers import HedgedPriceFetcher, WorldCoinIndexProvider, CoinbaseProvider, \
+    COINBASE_SYMBOLS
+from app_lib.extract_lib.response_cache import get_response_cache
 from app_lib.configuration.tools.currencies_conf import get_currencies
 from app_lib.configuration.tools.logos import get_logos
 # from app_lib.configuration.tools.currencies_limits import get_coin_limits
 from app_lib.log.log import get_log
-from app_lib.DDBB.sqlite.connection import DataBase
-from app_lib.DDBB.sqlite.models import get_model
-from app_lib.utils.date_utils import back_date_n_months
+from app_lib.DDBB.storage import Storage
+from app_lib.DDBB.sqlite.rollups import get_rollup_store
 
 
 __logger__ = get_log('extractor')
+EXTRACTOR_WORKERS = 8  # concurrent coin page requests per tick, 1 means sequential extraction
+PRICE_EPSILON = 1e-6  # relative price change under which a coin is considered unchanged between ticks
+BULK_QUOTES = True  # get every quote from a single request (urls[3]) and coin pages only for missing coins
+HEDGED_QUOTES = True  # get missing coins from several providers with hedged requests instead of coin pages
+BULK_SYMBOLS = COINBASE_SYMBOLS  # bulk quotes are Coinbase exchange rates, with the same ambiguous tickers
 
 urls = [
     lambda pair: "https://api.coinbase.com/v2/prices/{pair}/spot".format(pair=pair),
     lambda currency: "https://www.worldcoinindex.com/coin/{currency}".format(currency=currency),
-    lambda currency: "https://www.worldcoinindex.com/coin/{currency}/historical".format(currency=currency)
+    lambda currency: "https://www.worldcoinindex.com/coin/{currency}/historical".format(currency=currency),
+    lambda currency: "https://api.coinbase.com/v2/exchange-rates?currency={currency}".format(currency=currency)
 ]
+eur_usd = FxRateProvider(urls[0]("EUR-USD"))  # shared by every USD to EUR conversion
+price_fetcher = HedgedPriceFetcher([WorldCoinIndexProvider(urls[1]), CoinbaseProvider(urls[0])])
 
 
 def prepare_row(rowdata):
@@ -40,57 +51,136 @@ def prepare_row(rowdata):
     return data
 
 
-def prepare_dict(currency) -> dict:
+def prepare_dict(currency, url=urls[1]) -> dict:
     rhtml = HtmlReader()
-    mhtml = DataSeeker(urls[1](currency))
+    mhtml = DataSeeker(url(currency))
     htmldata = rhtml.get_exchange_table(mhtml.get_html_data())
     datadict = prepare_row(htmldata[0]) if htmldata else prepare_row([])
     return datadict
 
 
-def compare_data(data1, data2):
-    if len(data1) == len(data2):
-        keys2 = data2.keys()
-        for key in data1.keys():
-            if not key in keys2 or \
-                    data1[key] != data2[key]:
-                return True
-        return True
-    else:
-        return True
+def get_bulk_quotes(currencies: list, logos: dict, url=urls[3], symbols: frozenset = BULK_SYMBOLS) -> dict:
+    """
+    Gets the USD quote of every currency from a single multi-symbol request
+    :param currencies:
+    :param logos: dictionary {currency: logo}
+    :param url: function that builds the exchange rates url given the base currency
+    :param symbols: logos whose quote is taken from the response, None to take every logo
+    :return: dictionary {currency: prepare_row dict} only with the currencies found in the response
+    """
+    mjson = DataSeeker(url('USD'))
+    prices = JsonReader.get_rates_data(JsonReader.read_json_data(mjson.get_json_data()))
+    quotes = {}
+    for curr in currencies:
+        if curr in logos and logos[curr] in prices and (symbols is None or logos[curr] in symbols):
+            quotes[curr] = prepare_row([curr, logos[curr], prices[logos[curr]]])
+    return quotes
+
+
+def compare_data(old_data: list, new_data: list, epsilon: float = PRICE_EPSILON) -> set:
+    """
+    Compares two ticks of prepare_row dictionaries and returns the change set: logos of new_data whose
+    amount is new or has changed more than epsilon (relative) since old_data
+    :param old_data: previous tick
+    :param new_data: current tick
+    :param epsilon: relative change under which a price is considered unchanged
+    :return: set of changed logos
+    """
+    old_amounts = {item['logo']: item['amount'] for item in old_data if item['logo']}
+    changed_logos = set()
+    for item in new_data:
+        if not item['logo']:
+            continue
+        old_amount = old_amounts.get(item['logo'])
+        if old_amount is None or abs(item['amount'] - old_amount) > epsilon * abs(old_amount) \
+                or (old_amount == 0 and item['amount'] != 0):
+            changed_logos.add(item['logo'])
+    return changed_logos
+
+
+def get_changed_data(propagated: dict, data: list, epsilon: float = PRICE_EPSILON) -> list:
+    """
+    Returns the rows of a tick whose amount is new or has changed more than epsilon (relative) since it was
+    last propagated. Comparing with the last propagated amount instead of the previous tick, small changes
+    of every tick are propagated once they add up to epsilon
+    :param propagated: dictionary {logo: prepare_row dictionary} last propagated of every coin
+    :param data: current tick
+    :param epsilon: relative change under which a price is considered unchanged
+    :return: list of changed prepare_row dictionaries
+    """
+    changed_logos = compare_data(list(propagated.values()), data, epsilon)
+    return [item for item in data if item['logo'] in changed_logos]
 
 
 def transform_to_eur(data_from_exchange):
     new_data = data_from_exchange.copy()
-    mjson = DataSeeker(urls[0]("EUR-USD"))
-    coinbaseexch = JsonReader.get_row_data(JsonReader.read_json_data(mjson.get_json_data()))
+    eur_usd_amount = eur_usd.get_rate()
     for item in new_data:
         if 'amount' in item:
-            eur_amount = item['amount'] / coinbaseexch['amount']
+            eur_amount = item['amount'] / eur_usd_amount
             item['amount'] = eur_amount
     return new_data
 
 
-def run():
+def extract_currencies(
+        currencies: list, workers: int = EXTRACTOR_WORKERS, url=urls[1], bulk_url=None, logos: dict = None,
+        fetcher: HedgedPriceFetcher = None, bulk_symbols: frozenset = BULK_SYMBOLS
+) -> list:
+    """
+    Extracts the exchange data of every currency keeping the currencies order. When bulk_url is given
+    the quotes are got from a single request and only the missing currencies are extracted one by one,
+    from their coin pages or, if fetcher is given, from its providers. When workers is greater than 1
+    the missing currencies are requested concurrently by a thread pool. Every path returns the currency as
+    given, the coin name in logos.json, so a coin has the same dictionary whatever source quoted it
+    :param currencies:
+    :param workers: maximum number of concurrent requests
+    :param url: function that builds the coin url given the currency
+    :param bulk_url: function that builds the exchange rates url given the base currency, None to skip it
+    :param logos: dictionary {currency: logo}, by default logos.json
+    :param fetcher: hedged price fetcher used instead of the coin pages
+    :param bulk_symbols: logos taken from the bulk quotes, None to take every logo
+    :return: list of prepare_row dictionaries
+    """
+    def prepare_missing_dict(curr):
+        if fetcher is not None:
+            return prepare_row(fetcher.get_quote(curr, logos.get(curr, '')))
+        return prepare_dict(curr, url)
+
+    if logos is None and (bulk_url or fetcher is not None):
+        logos = get_logos()
+    quotes = {}
+    if bulk_url:
+        quotes = get_bulk_quotes(currencies, logos, bulk_url, bulk_symbols)
+        __logger__.debug(f'bulk quotes: {len(quotes)} of {len(currencies)} currencies')
+    missing = [curr for curr in currencies if curr not in quotes]
+    if not workers or workers <= 1 or len(missing) <= 1:
+        quotes.update({curr: prepare_missing_dict(curr) for curr in missing})
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as executor:
+            quotes.update(zip(missing, executor.map(prepare_missing_dict, missing)))
+    data = []
+    for curr in currencies:
+        coins = quotes[curr]
+        __logger__.debug(f'coins: {coins}')
+        if coins:
+            if coins['logo']:
+                coins['currency'] = curr
+            data.append(coins)
+    return data
+
+
+def run(workers: int = EXTRACTOR_WORKERS, bulk: bool = BULK_QUOTES, hedged: bool = HEDGED_QUOTES):
     transformed_data = []
     try:
         currencies = get_currencies()
         __logger__.debug(f'currencies {currencies}')
-        data = []
-        for curr in currencies:
-            coins = prepare_dict(curr)
-            __logger__.debug(f'coins: {coins}')
-            if coins:
-                data.append(coins)
+        data = extract_currencies(
+            currencies, workers, bulk_url=urls[3] if bulk else None, fetcher=price_fetcher if hedged else None
+        )
         transformed_data = transform_to_eur(data)
     except Exception as e:
         __logger__.error(f'Error extracting currencies: {e}')
     return transformed_data
-    # if not compare_old_data or compare_data(compare_old_data, compare_new_data):
-        # response = w.write_documents(new_data, True, True)
-        # compare_old_data = compare_new_data
-    # get_log(__name__).debug(response)
-    # time.sleep(30)
 
 
 def min_max_extractor() -> list:
@@ -115,7 +205,7 @@ def min_max_extractor() -> list:
 
 def get_min_max(currency):
     rhtml = HtmlReader()
-    mhtml = DataSeeker(urls[2](currency))
+    mhtml = DataSeeker(urls[2](currency), cache=get_response_cache())
     html_data = rhtml.get_historical_table(mhtml.get_html_data())
     max_price = max(map(lambda row: row[2], html_data))
     min_price = min(map(lambda row: row[3], html_data))
@@ -141,41 +231,44 @@ def min_max_from_db() -> list:
     min_max_data = []
     try:
         logos = get_logos()
-        data = []
+        # rolling 30 day limits of every coin, maintained when daily rows are saved
+        limits = get_rollup_store().get_rolling_min_max(list(logos.values()))
         for coin_name, coin_logo in logos.items():
-            db_obj = get_model(coin_logo)
-            curr_limits = None
-            if db_obj:
-                curr_limits = prepare_min_max_dict_from_db(coin_name, coin_logo, db_obj)
-            if curr_limits:
-                data.append(curr_limits[0])
-                data.append(curr_limits[1])
+            if coin_logo in limits and limits[coin_logo][0] is not None:
+                min_max_data.extend(prepare_min_max_dict_from_limits(coin_name, coin_logo, limits[coin_logo]))
     except Exception as e:
         __logger__.error(f'Error getting min max from db: {e}')
     return min_max_data
 
 
-def prepare_min_max_dict_from_db(coin_name: str, coin_logo: str, db_object: DataBase):
+def prepare_min_max_dict_from_db(coin_name: str, coin_logo: str, db_object: Storage):
     min_dict = {}
     max_dict = {}
     if db_object:
-        date_init = int(back_date_n_months(dt.datetime.today(), 1).strftime('%Y%m%d'))
-        date_end = int(dt.datetime.today().strftime("%Y%m%d"))
-        min_max_data = db_object.get_data(
-            date_init=date_init,
-            date_end=date_end,
-            select_columns="max(MAXIMUM) as maximum, min(MINIMUM) as minimum"
-        )[0]
-        max_dict = {
-            'currency': coin_name,
-            'logo': coin_logo,
-            'amount': min_max_data[0],
-            'limit': 'max'
-        }
-        min_dict = {
-            'currency': coin_name,
-            'logo': coin_logo,
-            'amount': min_max_data[1],
-            'limit': 'min'
-        }
+        limits = get_rollup_store().get_rolling_min_max([coin_logo])
+        min_max_data = limits.get(coin_logo, (None, None))
+        min_dict, max_dict = prepare_min_max_dict_from_limits(coin_name, coin_logo, min_max_data)
+    return min_dict, max_dict
+
+
+def prepare_min_max_dict_from_limits(coin_name: str, coin_logo: str, min_max_data: tuple) -> tuple:
+    """
+    Returns the min and max dictionaries given the row (maximum, minimum) from database
+    :param coin_name:
+    :param coin_logo:
+    :param min_max_data:
+    :return:
+    """
+    max_dict = {
+        'currency': coin_name,
+        'logo': coin_logo,
+        'amount': min_max_data[0],
+        'limit': 'max'
+    }
+    min_dict = {
+        'currency': coin_name,
+        'logo': coin_logo,
+        'amount': min_max_data[1],
+        'limit': 'min'
+    }
     return min_dict, max_dict
@@ -0,0 +1,85 @@
+"""
+FxRateProvider definition
+"""
+import threading
+import time
+import traceback
+from app_lib.extract_lib.data_seeker import DataSeeker
+from app_lib.extract_lib.json_reader import JsonReader
+from app_lib.extract_lib.response_cache import get_response_cache
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('fx_rate')
+FX_RATE_TTL = 10 * 60  # seconds a rate is fresh, after that it is served stale while it is refreshed
+
+
+class FxRateProvider:
+    """
+    FxRateProvider keeps an exchange rate in memory. A fresh rate is served from memory, an expired one
+    is served stale while a background thread refreshes it, so only the very first call waits for
+    the network
+    """
+
+    def __init__(self, url: str, ttl: float = FX_RATE_TTL):
+        """
+        Constructor of FxRateProvider
+        :param url: Coinbase spot price url of the pair
+        :param ttl: seconds a rate is fresh
+        """
+        self.url = url
+        self.ttl = ttl
+        self.__rate = None
+        self.__updated = 0.
+        self.__lock = threading.Lock()
+        self.__refreshing = False
+
+    def get_rate(self) -> float:
+        """
+        Returns the cached rate, starting a background refresh when it is expired. It only blocks
+        when there is not any rate yet
+        :return:
+        """
+        if self.__rate is None:
+            return self.refresh()
+        if time.monotonic() - self.__updated > self.ttl:
+            self.refresh_in_background()
+        return self.__rate
+
+    def refresh(self) -> float:
+        """
+        Gets the rate from the url and caches it
+        :return:
+        """
+        try:
+            # always revalidated, the cached response is only served in offline mode
+            mjson = DataSeeker(self.url, cache=get_response_cache(), fresh_time=0)
+            coinbaseexch = JsonReader.get_row_data(JsonReader.read_json_data(mjson.get_json_data()))
+            if coinbaseexch and coinbaseexch['amount'] > 0:
+                with self.__lock:
+                    self.__rate = coinbaseexch['amount']
+                    self.__updated = time.monotonic()
+            else:
+                __logger__.error('Unable to refresh rate from %s', self.url)
+        finally:
+            self.__refreshing = False
+        if self.__rate is None:
+            raise ValueError(f'There is not any rate from {self.url}')
+        return self.__rate
+
+    def refresh_in_background(self) -> None:
+        """
+        Refreshes the rate in a daemon thread unless there is a refresh running
+        :return:
+        """
+        with self.__lock:
+            if self.__refreshing:
+                return
+            self.__refreshing = True
+        threading.Thread(target=self.__background_refresh, daemon=True).start()
+
+    def __background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception as ex:
+            __logger__.error('Exception: %s\n%s', ex, traceback.format_exc())
@@ -2,15 +2,15 @@
 Definition and manage of historical data to save into database
 """
 import traceback
-import numpy as np
 from app_lib.extract_lib.data_seeker import DataSeeker
 from app_lib.extract_lib.html_reader import HtmlReader
-from app_lib.extract_lib.json_reader import JsonReader
 from app_lib.configuration.tools.currencies_conf import get_currencies
 from app_lib.configuration.tools.logos import get_logos
 from app_lib.log.log import get_log
 from app_lib.DDBB.sqlite.models import get_model
-from app_lib.extract_lib.extractor import urls
+from app_lib.DDBB.sqlite.write_queue import get_write_queue
+from app_lib.extract_lib.extractor import urls, eur_usd
+from app_lib.extract_lib.response_cache import get_response_cache
 from app_lib.utils.date_utils import historical_coin_date_to_int
 
 
@@ -41,6 +41,8 @@ def historical_data_extractor(coins_name: list = None, date_init: int = None, da
         added_data += exc_str
         __logger__.error(exc_str)
     finally:
+        # rows are queued by every coin and committed in batches
+        get_write_queue().flush()
         if not added_data:
             added_data = 'No data added to database'
     return added_data
@@ -61,7 +63,7 @@ def set_historical_day(coin_name: str, coin_logo: str, eur_usd_amount: float) ->
     if db_object is not None:
         current_day_data = db_object.get_data(date_init=hist_data[0])
         if len(current_day_data) == 0:
-            db_object.set_data(tuple(hist_data))
+            get_write_queue(db_object.db_location).put(db_object, [tuple(hist_data)])
             added_data += f'Added {coin_logo}:\n\t{hist_data}\n'
     return added_data
 
@@ -79,24 +81,17 @@ def set_historical_interval(coin_name: str, coin_logo: str, eur_usd_amount: floa
     def to_eur_historical_price(row):
         row[1:] = data_price_transform(row[1:], eur_usd_amount)
 
-    def avoid_repeated_data(insert_data: list, got_dates: list) -> list:
-        return list(
-            filter(
-                lambda row: row[0] not in got_dates and date_init <= row[0] <= date_end,
-                insert_data
-            )
-        )
-
     added_data = ''
-    hist_data = get_historical_data(coin_name)
+    hist_data = [
+        row for row in get_historical_data(coin_name)
+        if (not date_init or date_init <= row[0]) and (not date_end or row[0] <= date_end)
+    ]
     list(map(to_eur_historical_price, hist_data))
     db_object = get_model(coin_logo)
     if db_object is not None:
-        current_data = db_object.get_data(date_init=date_init, date_end=date_end)
-        current_dates = np.array(current_data, dtype=np.int)[:, 0] if len(current_data) > 0 else []
-        hist_data = avoid_repeated_data(hist_data, current_dates)
+        # dates already saved are updated by the upsert
         if len(hist_data) > 0:
-            db_object.set_array_data(hist_data)
+            get_write_queue(db_object.db_location).put(db_object, list(map(tuple, hist_data)))
         added_data += f'Added {coin_logo}:\n\t' + '\n\t'.join([str(row) for row in hist_data]) + '\n'
     return added_data
 
@@ -111,7 +106,7 @@ def get_historical_data(currency: str, limit: int = None) -> list:
     def to_int_historical_coin_date(row):
         row[0] = int(historical_coin_date_to_int(row[0]))
     html = HtmlReader()
-    data_seeker = DataSeeker(urls[2](currency))
+    data_seeker = DataSeeker(urls[2](currency), cache=get_response_cache())
     hist_data = html.get_historical_table(data_seeker.get_html_data(), limit=limit)
     list(map(to_int_historical_coin_date, hist_data))
     return hist_data
@@ -119,12 +114,10 @@ def get_historical_data(currency: str, limit: int = None) -> list:
 
 def get_eur_usd() -> float:
     """
-    Extracts pair value 'eur/usd' from url (urls[0] in extractor.py)
+    Returns pair value 'eur/usd' from the rate provider shared with extractor.py (urls[0])
     :return:
     """
-    mjson = DataSeeker(urls[0]("EUR-USD"))
-    coinbaseexch = JsonReader.get_row_data(JsonReader.read_json_data(mjson.get_json_data()))
-    return coinbaseexch['amount']
+    return eur_usd.get_rate()
 
 
 def data_price_transform(data: list, transform: float) -> list:
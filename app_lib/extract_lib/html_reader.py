@@ -9,6 +9,45 @@ from app_lib.log.log import get_log
 
 
 __logger__ = get_log('html_reader')
+FAST_PARSING = True  # parse only the target table instead of the whole page
+TABLE_TAG = re.compile(r'<(/?)table\b', re.IGNORECASE)
+ROW_END_TAG = re.compile(r'</tr\s*>', re.IGNORECASE)
+TBODY_TAG = re.compile(r'<tbody\b', re.IGNORECASE)
+
+
+def get_table_fragment(html, table_id: str, limit: int = None) -> str:
+    """
+    Cuts the table with the given id from the html without parsing the page. With limit the table is
+    cut after its first limit body rows
+    :param html: page as str or bytes
+    :param table_id:
+    :param limit: number of body rows to keep
+    :return: table html or empty string if the table is not found
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    id_match = re.search(r'\bid\s*=\s*["\']?' + re.escape(table_id) + r'["\'\s>]', html)
+    if not id_match:
+        return ''
+    start = html.rfind('<', 0, id_match.start())
+    if start < 0 or not TABLE_TAG.match(html, start):
+        return ''
+    depth = 0
+    end = len(html)
+    for tag in TABLE_TAG.finditer(html, start):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            end = html.find('>', tag.end()) + 1 or len(html)
+            break
+    fragment = html[start:end]
+    if limit and limit > 0:
+        tbody = TBODY_TAG.search(fragment)
+        row_end = None
+        for row, row_end in enumerate(ROW_END_TAG.finditer(fragment, tbody.end() if tbody else 0)):
+            if row + 1 == limit:
+                fragment = fragment[:row_end.end()] + ('</tbody>' if tbody else '') + '</table>'
+                break
+    return fragment
 
 
 class HtmlReader(Reader):
@@ -23,16 +62,18 @@ class HtmlReader(Reader):
     __HIST_MAX = 2
     __HIST_MIN = 3
 
-    def get_exchange_table(self, html) -> list:
+    def get_exchange_table(self, html, fast: bool = None) -> list:
         """
         Extracts data from exchange table
         :param html:
+        :param fast: parses only the exchange table, by default FAST_PARSING
         :return:
         """
         table = []
         if html:
             try:
-                soup = bs(html, 'html.parser')
+                fragment = get_table_fragment(html, 'market-table') if self.__fast(fast) else ''
+                soup = bs(fragment or html, 'html.parser')
                 table = soup.find_all(lambda tag: tag.has_attr('id') and tag['id'] == 'market-table')[0]
                 table = self.get_table_rows(table, 'data-symbol', re.compile('[a-zA-Z]+BTC$'))
                 table = self.exchange_table(table)
@@ -40,6 +81,10 @@ class HtmlReader(Reader):
                 __logger__.error('Exception: %s\n%s', ex, traceback.format_exc())
         return table
 
+    @staticmethod
+    def __fast(fast: bool = None) -> bool:
+        return FAST_PARSING if fast is None else fast
+
     def get_table_rows(self, table, attr: str = '', expr: str = '') -> list:
         """
         Extracts rows from the given html table
@@ -87,18 +132,20 @@ class HtmlReader(Reader):
                 __logger__.error('Exception: %s\n%s', ex, traceback.format_exc())
         return data
 
-    def get_historical_table(self, html, limit=None) -> list:
+    def get_historical_table(self, html, limit=None, fast: bool = None) -> list:
         """
         Extracts and returns historical data from any cryptocurrency. By the moment maximum
         and minimum price within the last month
         :param html:
         :param limit:
+        :param fast: parses only the first limit rows of the historical table, by default FAST_PARSING
         :return:
         """
         table = []
         if html:
             try:
-                soup = bs(html, 'html.parser')
+                fragment = get_table_fragment(html, 'myTable', limit) if self.__fast(fast) else ''
+                soup = bs(fragment or html, 'html.parser')
                 table = soup.find_all(
                     lambda tag: tag.name == 'tbody' and tag.parent.has_attr('id') and tag.parent['id'] == 'myTable'
                 )[0]
@@ -0,0 +1,160 @@
+"""
+Record/replay transport for the shared session layer (http_session). In record mode every response got
+from the network is saved in a fixture directory. In replay mode the responses are served from that
+directory by a local stand-in adapter, with optional latency and error injection, so the extraction
+pipeline can be run and measured without network
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from json import loads, dumps
+from requests import Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.structures import CaseInsensitiveDict
+from app_lib.extract_lib import http_session
+from app_lib.utils.files_utils import get_absolute_path
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('http_replay')
+FIXTURES_PATH = get_absolute_path('/app_lib/cache/fixtures/')
+LIVE = 'live'
+RECORD = 'record'
+REPLAY = 'replay'
+RECORD_METHODS = ('GET',)  # telegram posts carry the bot token, they are never recorded
+
+
+def fixture_path(path: str, method: str, url: str) -> str:
+    """
+    Returns the fixture file path without extension of the request
+    :param path: fixture directory
+    :param method:
+    :param url:
+    :return:
+    """
+    return os.path.join(path, hashlib.sha256(f'{method.upper()} {url}'.encode('utf-8')).hexdigest())
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that saves every response in the fixture directory
+    """
+
+    def __init__(self, path: str = FIXTURES_PATH, **kwargs):
+        """
+        Constructor of RecordingAdapter
+        :param path: fixture directory
+        :param kwargs: HTTPAdapter arguments
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.__lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if request.method not in RECORD_METHODS:
+            return response
+        file_path = fixture_path(self.path, request.method, request.url)
+        fixture = {
+            'method': request.method,
+            'url': request.url,
+            'status_code': response.status_code,
+            'headers': dict(response.headers)
+        }
+        # content is read here, so the body is not streamed to the caller
+        with self.__lock:
+            with open(file_path + '.body', 'wb') as file:
+                file.write(response.content)
+            with open(file_path + '.json', 'w') as file:
+                file.write(dumps(fixture))
+        __logger__.debug('Recorded %s %s', request.method, request.url)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Adapter that serves the recorded responses as a local stand-in. Not recorded requests are answered
+    with 404 Not Found
+    """
+
+    def __init__(self, path: str = FIXTURES_PATH, latency: float = 0., jitter: float = 0.,
+                 error_rate: float = 0., seed: int = None):
+        """
+        Constructor of ReplayAdapter
+        :param path: fixture directory
+        :param latency: seconds waited before every response
+        :param jitter: maximum random seconds added to latency
+        :param error_rate: probability [0, 1] of a connection error
+        :param seed: random seed, for reproducible errors and jitter
+        """
+        super().__init__()
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        with self.__lock:
+            delay = self.latency + self.__random.uniform(0, self.jitter)
+            failed = self.__random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise RequestsConnectionError(f'Injected error replaying {request.url}', request=request)
+        file_path = fixture_path(self.path, request.method, request.url)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.reason = 'OK'
+        try:
+            with open(file_path + '.json', 'r') as file:
+                fixture = loads(file.read())
+            with open(file_path + '.body', 'rb') as file:
+                response._content = file.read()
+            response.status_code = fixture['status_code']
+            response.headers = CaseInsensitiveDict(fixture['headers'])
+            # the body is stored decoded
+            response.headers.pop('Content-Encoding', None)
+        except FileNotFoundError:
+            __logger__.debug('Not recorded %s %s', request.method, request.url)
+            response.status_code = 404
+            response.reason = 'Not Found'
+            response._content = b''
+        response.encoding = None
+        return response
+
+    def close(self):
+        pass
+
+
+def set_transport_mode(mode: str = LIVE, path: str = FIXTURES_PATH, latency: float = 0., jitter: float = 0.,
+                       error_rate: float = 0., seed: int = None) -> None:
+    """
+    Sets the transport used by every DataSeeker request
+    :param mode: 'live', 'record' or 'replay'
+    :param path: fixture directory
+    :param latency: replay mode seconds waited before every response
+    :param jitter: replay mode maximum random seconds added to latency
+    :param error_rate: replay mode probability [0, 1] of a connection error
+    :param seed: replay mode random seed
+    :return:
+    """
+    if mode == LIVE:
+        http_session.set_adapter(None)
+    elif mode == RECORD:
+        http_session.set_adapter(RecordingAdapter(
+            path,
+            pool_connections=http_session.POOL_CONNECTIONS,
+            pool_maxsize=http_session.POOL_MAXSIZE,
+            max_retries=http_session.get_retry()
+        ))
+    elif mode == REPLAY:
+        http_session.set_adapter(ReplayAdapter(path, latency, jitter, error_rate, seed))
+    else:
+        raise ValueError(f'Unknown transport mode "{mode}"')
@@ -0,0 +1,110 @@
+"""
+Shared HTTP session layer. Every thread gets its own requests.Session but all of them are mounted
+on the same adapter, so connection pools (one per host) and keep-alive connections are shared
+between the extractor, the historical extractor and the telegram api
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+CONNECT_TIMEOUT = 3.05  # seconds
+READ_TIMEOUT = 10.  # seconds
+TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+MAX_RETRIES = 3
+# a read timeout already waited READ_TIMEOUT, retrying it more would block an extractor worker for the tick
+READ_RETRIES = 1
+BACKOFF_FACTOR = 0.3  # retries wait 0.3, 0.6, 1.2... seconds
+RETRY_STATUS = (429, 500, 502, 503, 504)
+POOL_CONNECTIONS = 10  # number of hosts kept in the pool
+POOL_MAXSIZE = 16  # keep-alive connections per host, at least extractor.EXTRACTOR_WORKERS
+
+__adapter_lock__ = threading.Lock()
+__adapter__ = None
+__thread_data__ = threading.local()
+
+
+def get_retry() -> Retry:
+    """
+    Returns the retry policy: bounded retries with exponential backoff only for idempotent methods. Read
+    errors are retried READ_RETRIES times, so a hung request waits at most (READ_RETRIES + 1) * READ_TIMEOUT
+    :return:
+    """
+    return Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=READ_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+
+
+def get_adapter() -> HTTPAdapter:
+    """
+    Returns the adapter shared by every session, it is created the first time
+    :return:
+    """
+    global __adapter__
+    if __adapter__ is None:
+        with __adapter_lock__:
+            if __adapter__ is None:
+                __adapter__ = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=get_retry()
+                )
+    return __adapter__
+
+
+def set_adapter(adapter) -> None:
+    """
+    Replaces the shared adapter, None restores the default one. Sessions are mounted again on the new
+    adapter the next time they are requested
+    :param adapter: requests transport adapter
+    :return:
+    """
+    global __adapter__
+    with __adapter_lock__:
+        __adapter__ = adapter
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the session of the current thread mounted on the shared adapter
+    :return:
+    """
+    adapter = get_adapter()
+    session = getattr(__thread_data__, 'session', None)
+    if session is None or session.get_adapter('https://') is not adapter:
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        __thread_data__.session = session
+    return session
+
+
+def get(url: str, timeout=TIMEOUT, **kwargs) -> requests.Response:
+    """
+    GET request through the shared session with connect and read timeouts
+    :param url:
+    :param timeout: (connect, read) seconds
+    :param kwargs: requests.get arguments
+    :return:
+    """
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def post(url: str, data=None, timeout=TIMEOUT, **kwargs) -> requests.Response:
+    """
+    POST request through the shared session with connect and read timeouts
+    :param url:
+    :param data:
+    :param timeout: (connect, read) seconds
+    :param kwargs: requests.post arguments
+    :return:
+    """
+    return get_session().post(url, data=data, timeout=timeout, **kwargs)
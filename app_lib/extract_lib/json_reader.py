@@ -47,6 +47,26 @@ class JsonReader(Reader):
             }
         return row_data
 
+    @staticmethod
+    def get_rates_data(data, key='rates') -> dict:
+        """
+        Returns a dictionary {symbol: price} from an exchange rates response, where every rate is the
+        amount of symbol bought with one unit of the base currency
+        :param data:
+        :param key:
+        :return:
+        """
+        prices = {}
+        if data and key in data:
+            for symbol, rate in data[key].items():
+                try:
+                    rate = parser(rate)
+                except (TypeError, ValueError):
+                    continue
+                if rate > 0:
+                    prices[symbol] = 1 / rate
+        return prices
+
     @staticmethod
     def get_amount(data, key='amount') -> str:
         """
@@ -0,0 +1,238 @@
+"""
+Price providers definition. A price provider gets the USD quote of a coin from a single source and
+HedgedPriceFetcher combines several of them using hedged requests
+"""
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from app_lib.extract_lib.data_seeker import DataSeeker
+from app_lib.extract_lib.html_reader import HtmlReader
+from app_lib.extract_lib.json_reader import JsonReader
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('price_providers')
+HEDGE_DELAY = 2.  # seconds waited for a source before requesting the next one
+HEDGE_WORKERS = 16  # concurrent source requests
+STATS_WEIGHT = 0.2  # weight of the last request in the exponential moving averages of stats
+MIN_SUCCESS_RATE = 0.05
+# Coinbase tickers that are the coin of logos.json, the others are ambiguous or renamed and Coinbase quotes
+# another asset for them
+COINBASE_SYMBOLS = frozenset((
+    'BTC', 'ETH', 'LTC', 'BCH', 'XRP', 'TRX', 'ADA', 'EOS', 'DOT', 'ETC', 'XLM', 'ZIL', 'ZRX', 'COMP', 'DOGE',
+    'DASH', 'LINK', 'BAL', 'ATOM', 'SOL', 'FIL', 'DCR', 'UNI', 'ENJ', 'VET', 'CHZ', 'SHIB', 'HBAR', 'XTZ',
+    'AVAX', 'CTSI', 'MANA', 'GRT'
+))
+
+
+class ProviderStats:
+    """
+    Latency and error rate of a provider as exponential moving averages
+    """
+
+    def __init__(self, weight: float = STATS_WEIGHT):
+        """
+        Constructor of ProviderStats
+        :param weight: weight of the last request
+        """
+        self.weight = weight
+        self.requests = 0
+        self.errors = 0
+        self.latency = 0.
+        self.error_rate = 0.
+        self.__lock = threading.Lock()
+
+    def record(self, latency: float, success: bool) -> None:
+        """
+        Adds a finished request
+        :param latency: seconds
+        :param success:
+        :return:
+        """
+        with self.__lock:
+            weight = self.weight if self.requests > 0 else 1.
+            self.requests += 1
+            self.errors += 0 if success else 1
+            self.latency += weight * (latency - self.latency)
+            self.error_rate += weight * ((0. if success else 1.) - self.error_rate)
+
+    def score(self) -> float:
+        """
+        Expected seconds to get a valid quote, the lower the better. Providers without requests are
+        ranked last
+        :return:
+        """
+        if self.requests == 0:
+            return float('inf')
+        return self.latency / max(1. - self.error_rate, MIN_SUCCESS_RATE)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the stats as dictionary
+        :return:
+        """
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'latency': self.latency,
+            'error_rate': self.error_rate,
+            'score': self.score()
+        }
+
+
+class PriceProvider:
+    """
+    Class used to inherit from other providers. get_row returns [currency, logo, amount] as the exchange
+    table rows of HtmlReader, or an empty list when it is unable to get a valid quote
+    """
+    name = ''
+
+    def __init__(self):
+        self.stats = ProviderStats()
+
+    def get_row(self, currency: str, logo: str) -> list:
+        """
+        Returns the USD quote of the coin as [currency, logo, amount]
+        :param currency: coin name as in logos.json
+        :param logo:
+        :return:
+        """
+        raise NotImplementedError
+
+    def has_coin(self, logo: str) -> bool:
+        """
+        Checks if the provider quotes the coin, by default every coin
+        :param logo:
+        :return:
+        """
+        return True
+
+    def get_quote(self, currency: str, logo: str) -> list:
+        """
+        Calls get_row recording its latency and result in the provider stats
+        :param currency:
+        :param logo:
+        :return:
+        """
+        start = time.perf_counter()
+        row = []
+        try:
+            row = self.get_row(currency, logo)
+        except Exception as ex:
+            __logger__.error('Exception in %s: %s\n%s', self.name, ex, traceback.format_exc())
+        valid = is_valid_row(row)
+        self.stats.record(time.perf_counter() - start, valid)
+        return row if valid else []
+
+
+class WorldCoinIndexProvider(PriceProvider):
+    """
+    Quote from the first row of the coin page market table
+    """
+    name = 'worldcoinindex'
+
+    def __init__(self, url):
+        """
+        Constructor of WorldCoinIndexProvider
+        :param url: function that builds the coin page url given the currency (urls[1] in extractor.py)
+        """
+        super().__init__()
+        self.url = url
+
+    def get_row(self, currency: str, logo: str) -> list:
+        htmldata = HtmlReader().get_exchange_table(DataSeeker(self.url(currency)).get_html_data())
+        return htmldata[0] if htmldata else []
+
+
+class CoinbaseProvider(PriceProvider):
+    """
+    Quote from the Coinbase spot price of the pair logo-USD, only for the logos whose ticker is the same coin
+    """
+    name = 'coinbase'
+
+    def __init__(self, url, symbols: frozenset = COINBASE_SYMBOLS):
+        """
+        Constructor of CoinbaseProvider
+        :param url: function that builds the spot price url given the pair (urls[0] in extractor.py)
+        :param symbols: logos quoted, None to quote every logo
+        """
+        super().__init__()
+        self.url = url
+        self.symbols = symbols
+
+    def has_coin(self, logo: str) -> bool:
+        return self.symbols is None or logo in self.symbols
+
+    def get_row(self, currency: str, logo: str) -> list:
+        mjson = DataSeeker(self.url(f'{logo}-USD'))
+        row_data = JsonReader.get_row_data(JsonReader.read_json_data(mjson.get_json_data()))
+        return [currency, logo, row_data['amount']] if row_data else []
+
+
+def is_valid_row(row: list) -> bool:
+    """
+    Checks if a provider row is a valid quote
+    :param row:
+    :return:
+    """
+    return bool(row) and len(row) >= 3 and bool(row[1]) and isinstance(row[2], float) and row[2] > 0
+
+
+class HedgedPriceFetcher:
+    """
+    HedgedPriceFetcher asks the best ranked provider for a quote and, if it does not answer a valid quote
+    within hedge_delay seconds, it also asks the next one, and so on. The first valid quote is returned.
+    Providers are ranked by their stats, so a slow or failing source stops being the first one
+    """
+
+    def __init__(self, providers: list, hedge_delay: float = HEDGE_DELAY, workers: int = HEDGE_WORKERS):
+        """
+        Constructor of HedgedPriceFetcher
+        :param providers: list of PriceProvider, the order breaks ties between providers
+        :param hedge_delay: seconds waited for a provider before requesting the next one
+        :param workers: concurrent provider requests
+        """
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+        self.__executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hedged_fetcher')
+
+    def ranked_providers(self, logo: str = None) -> list:
+        """
+        Returns the providers sorted by score
+        :param logo: only the providers of the coin, by default every provider
+        :return:
+        """
+        return [
+            provider for _, provider in sorted(
+                enumerate(self.providers), key=lambda item: (item[1].stats.score(), item[0])
+            ) if logo is None or provider.has_coin(logo)
+        ]
+
+    def get_quote(self, currency: str, logo: str) -> list:
+        """
+        Returns the first valid quote [currency, logo, amount] or an empty list if no provider has one
+        :param currency: coin name as in logos.json
+        :param logo:
+        :return:
+        """
+        pending_providers = self.ranked_providers(logo)
+        running = set()
+        while pending_providers or running:
+            if pending_providers:
+                running.add(self.__executor.submit(pending_providers.pop(0).get_quote, currency, logo))
+            # waits hedge_delay for any valid quote, a failed provider hedges at once
+            done, running = wait(running, timeout=self.hedge_delay if pending_providers else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                row = future.result()
+                if row:
+                    return row
+        return []
+
+    def get_stats(self) -> dict:
+        """
+        Returns the stats of every provider by name
+        :return:
+        """
+        return {provider.name: provider.stats.to_dict() for provider in self.providers}
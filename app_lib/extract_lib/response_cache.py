@@ -0,0 +1,252 @@
+"""
+ResponseCache definition, an on-disk cache of HTTP responses used by DataSeeker
+"""
+import hashlib
+import os
+import threading
+import time
+import traceback
+from json import loads, dumps
+from app_lib.utils.files_utils import get_absolute_path
+from app_lib.log.log import get_log
+
+
+__logger__ = get_log('response_cache')
+CACHE_PATH = get_absolute_path('/app_lib/cache/http/')
+CACHE_MAX_SIZE = 256 * 1024 * 1024  # bytes
+CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds an entry is kept since it was last validated
+CACHE_FRESH_TIME = 60 * 60  # seconds an entry is served without asking the server
+CACHE_EVICT_INTERVAL = 60 * 60  # seconds between the scans of the cache for old entries
+CACHE_EVICT_RATIO = 0.9  # fraction of max_size left by an eviction, so the next one is not at the next write
+OFFLINE = False  # serve only from cache, never from the network
+CACHE_ENABLED = True
+
+__default_cache__ = None
+__default_cache_lock__ = threading.Lock()
+
+
+def set_offline_mode(offline: bool) -> None:
+    """
+    Sets the offline mode, where every cached request is served only from cache
+    :param offline:
+    :return:
+    """
+    global OFFLINE
+    OFFLINE = offline
+
+
+def is_offline() -> bool:
+    """
+    Returns if offline mode is active
+    :return:
+    """
+    return OFFLINE
+
+
+def set_cache_enabled(enabled: bool) -> None:
+    """
+    Enables or disables the default cache
+    :param enabled:
+    :return:
+    """
+    global CACHE_ENABLED
+    CACHE_ENABLED = enabled
+
+
+def get_response_cache() -> 'ResponseCache':
+    """
+    Returns the default cache stored at CACHE_PATH or None if it is disabled
+    :return:
+    """
+    global __default_cache__
+    if not CACHE_ENABLED:
+        return None
+    if __default_cache__ is None:
+        with __default_cache_lock__:
+            if __default_cache__ is None:
+                __default_cache__ = ResponseCache()
+    return __default_cache__
+
+
+class ResponseCache:
+    """
+    ResponseCache stores every response body with its ETag and Last-Modified headers so the next request
+    can be sent as a conditional GET. Entries are evicted by age and the whole cache by size, removing the
+    least recently used entries first. The size of the stored bodies is kept as they are written, so the
+    cache directory is only scanned when it is too big or every evict_interval seconds. Files are written
+    to a temporary file that replaces them, and the metadata is written after the body, so an interrupted
+    write never leaves a body with the validators of another one
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_size: int = CACHE_MAX_SIZE, max_age: float = CACHE_MAX_AGE,
+                 fresh_time: float = CACHE_FRESH_TIME, evict_interval: float = CACHE_EVICT_INTERVAL):
+        """
+        Constructor of ResponseCache
+        :param path: cache directory
+        :param max_size: maximum bytes of stored bodies
+        :param max_age: seconds an entry is kept since it was last validated
+        :param fresh_time: seconds an entry is served without a request
+        :param evict_interval: seconds between the scans for old entries
+        """
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+        self.fresh_time = fresh_time
+        self.evict_interval = evict_interval
+        self.__size = None  # bytes of stored bodies, known after the first scan
+        self.__last_evict = 0.
+        self.__lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def __entry_path(self, url: str) -> str:
+        return os.path.join(self.path, hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def get(self, url: str) -> dict:
+        """
+        Returns the entry {'content', 'etag', 'last_modified', 'validated'} of the url or None
+        :param url:
+        :return:
+        """
+        entry_path = self.__entry_path(url)
+        try:
+            with self.__lock:
+                with open(entry_path + '.json', 'r') as file:
+                    entry = loads(file.read())
+                with open(entry_path + '.body', 'rb') as file:
+                    entry['content'] = file.read()
+                os.utime(entry_path + '.body')
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as ex:
+            __logger__.error('Exception: %s\n%s', ex, traceback.format_exc())
+            return None
+
+    def is_fresh(self, entry: dict, fresh_time: float = None) -> bool:
+        """
+        Checks if the entry can be served without asking the server
+        :param entry:
+        :param fresh_time: seconds the entry is fresh, by default the cache fresh_time
+        :return:
+        """
+        fresh_time = self.fresh_time if fresh_time is None else fresh_time
+        return entry is not None and time.time() - entry['validated'] < fresh_time
+
+    def set(self, url: str, content: bytes, headers: dict) -> None:
+        """
+        Stores the response body and its validators
+        :param url:
+        :param content: response body
+        :param headers: response headers
+        :return:
+        """
+        entry_path = self.__entry_path(url)
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'validated': time.time()
+        }
+        try:
+            with self.__lock:
+                try:
+                    previous_size = os.path.getsize(entry_path + '.body')
+                except FileNotFoundError:
+                    previous_size = 0
+                # without metadata the entry is missing until the new body is written
+                self.__remove_file(entry_path + '.json')
+                self.__write(entry_path + '.body', content)
+                self.__write(entry_path + '.json', dumps(entry).encode('utf-8'))
+                if self.__size is not None:
+                    self.__size += len(content) - previous_size
+                must_evict = self.__size is None or self.__size > self.max_size or \
+                    time.time() - self.__last_evict > self.evict_interval
+            if must_evict:
+                self.evict()
+        except Exception as ex:
+            __logger__.error('Exception: %s\n%s', ex, traceback.format_exc())
+
+    def validate(self, url: str, entry: dict) -> None:
+        """
+        Marks the entry as validated now, after a 304 Not Modified response
+        :param url:
+        :param entry:
+        :return:
+        """
+        entry = {key: value for key, value in entry.items() if key != 'content'}
+        entry['validated'] = time.time()
+        try:
+            with self.__lock:
+                self.__write(self.__entry_path(url) + '.json', dumps(entry).encode('utf-8'))
+        except Exception as ex:
+            __logger__.error('Exception: %s\n%s', ex, traceback.format_exc())
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        """
+        Returns the conditional request headers given the cached entry
+        :param entry:
+        :return:
+        """
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def evict(self) -> None:
+        """
+        Removes the entries older than max_age and, if the cache is bigger than max_size, the least
+        recently used ones until it is CACHE_EVICT_RATIO of max_size
+        :return:
+        """
+        with self.__lock:
+            now = time.time()
+            entries = []
+            file_names = set(os.listdir(self.path))
+            bodies = {file_name[:-len('.json')] + '.body' for file_name in file_names if file_name.endswith('.json')}
+            for file_name in file_names - bodies:
+                # bodies without metadata and temporary files of interrupted writes
+                if not file_name.endswith('.json'):
+                    self.__remove_file(os.path.join(self.path, file_name))
+                    continue
+                entry_path = os.path.join(self.path, file_name[:-len('.json')])
+                try:
+                    with open(entry_path + '.json', 'r') as file:
+                        validated = loads(file.read())['validated']
+                    body_stat = os.stat(entry_path + '.body')
+                except Exception:
+                    validated, body_stat = 0, None
+                if body_stat is None or now - validated > self.max_age:
+                    self.__remove(entry_path)
+                else:
+                    entries.append((body_stat.st_mtime, body_stat.st_size, entry_path))
+            total_size = sum(entry[1] for entry in entries)
+            target_size = self.max_size * CACHE_EVICT_RATIO if total_size > self.max_size else self.max_size
+            for _, size, entry_path in sorted(entries):
+                if total_size <= target_size:
+                    break
+                self.__remove(entry_path)
+                total_size -= size
+            self.__size = total_size
+            self.__last_evict = now
+
+    @staticmethod
+    def __write(file_path: str, data: bytes) -> None:
+        temporary_path = file_path + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(data)
+        os.replace(temporary_path, file_path)
+
+    @staticmethod
+    def __remove_file(file_path: str) -> None:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    def __remove(self, entry_path: str) -> None:
+        for extension in ('.json', '.body'):
+            self.__remove_file(entry_path + extension)
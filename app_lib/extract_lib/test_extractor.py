@@ -0,0 +1,62 @@
+"""
+Tests of the extraction paths against the local stand-in server
+"""
+import pytest
+from app_lib.benchmarks.stand_in_server import StandInServer
+from app_lib.extract_lib.extractor import extract_currencies, compare_data, get_changed_data, get_bulk_quotes
+
+
+LOGOS = {'bitcoin': 'BTC', 'ethereum': 'ETH', 'litecoin': 'LTC', 'cardano': 'ADA', 'luna': 'LUNA'}
+
+
+@pytest.fixture(scope='module')
+def server():
+    with StandInServer(LOGOS, bulk_missing=1) as stand_in_server:
+        yield stand_in_server
+
+
+def test_parallel_extraction_equals_sequential(server):
+    currencies = list(LOGOS)
+    sequential = extract_currencies(currencies, 1, url=server.coin_url, logos=LOGOS)
+    assert extract_currencies(currencies, 4, url=server.coin_url, logos=LOGOS) == sequential
+    assert [item['logo'] for item in sequential] == list(LOGOS.values())
+
+
+def test_bulk_quotes_have_the_same_rows(server):
+    currencies = list(LOGOS)
+    pages = extract_currencies(currencies, 1, url=server.coin_url, logos=LOGOS)
+    bulk = extract_currencies(currencies, 4, url=server.coin_url, bulk_url=server.rates_url, logos=LOGOS,
+                              bulk_symbols=None)
+    assert bulk == pages
+    assert [item['currency'] for item in bulk] == currencies
+
+
+def test_bulk_quotes_skip_missing_and_not_allowed_logos(server):
+    quotes = get_bulk_quotes(list(LOGOS), LOGOS, server.rates_url, frozenset({'BTC', 'ETH', 'LUNA'}))
+    # LUNA is the coin left out of the exchange rates
+    assert sorted(quotes) == ['bitcoin', 'ethereum']
+    pages = extract_currencies(['bitcoin', 'cardano'], 1, url=server.coin_url, logos=LOGOS)
+    bulk = extract_currencies(['bitcoin', 'cardano'], 1, url=server.coin_url, bulk_url=server.rates_url, logos=LOGOS,
+                              bulk_symbols=frozenset({'BTC'}))
+    assert bulk == pages
+
+
+def test_compare_data():
+    old_data = [{'logo': 'BTC', 'amount': 100.}, {'logo': 'ETH', 'amount': 10.}]
+    new_data = [{'logo': 'BTC', 'amount': 100.}, {'logo': 'ETH', 'amount': 11.}, {'logo': 'ADA', 'amount': 1.}]
+    assert compare_data(old_data, new_data) == {'ETH', 'ADA'}
+    # changes under the relative epsilon, prices from zero and rows without logo
+    assert compare_data(old_data, [{'logo': 'BTC', 'amount': 100.00001}, {'logo': '', 'amount': 1.}]) == set()
+    assert compare_data([{'logo': 'BTC', 'amount': 0.}], [{'logo': 'BTC', 'amount': 1e-9}]) == {'BTC'}
+
+
+def test_small_changes_are_propagated_when_they_add_up():
+    propagated = {}
+    ticks = [[{'logo': 'BTC', 'amount': 100. + step * 6e-5}, {'logo': 'ETH', 'amount': 10.}] for step in range(4)]
+    changes = []
+    for data in ticks:
+        changed_data = get_changed_data(propagated, data, epsilon=1e-6)
+        propagated.update((item['logo'], item) for item in changed_data)
+        changes.append([item['logo'] for item in changed_data])
+    assert changes == [['BTC', 'ETH'], [], ['BTC'], []]
+    assert propagated['BTC']['amount'] == pytest.approx(100.00012)
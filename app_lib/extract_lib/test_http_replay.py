@@ -0,0 +1,38 @@
+"""
+Tests of the record/replay transport against the local stand-in server
+"""
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from app_lib.benchmarks.stand_in_server import StandInServer
+from app_lib.extract_lib import http_session
+from app_lib.extract_lib.http_replay import set_transport_mode, LIVE, RECORD, REPLAY
+
+
+LOGOS = {'bitcoin': 'BTC', 'ethereum': 'ETH'}
+
+
+@pytest.fixture
+def fixtures_path(tmp_path):
+    yield str(tmp_path)
+    set_transport_mode(LIVE)
+
+
+def test_replay_serves_the_recorded_responses(fixtures_path):
+    with StandInServer(LOGOS) as server:
+        set_transport_mode(RECORD, fixtures_path)
+        recorded = http_session.get(server.coin_url('bitcoin'))
+        url = server.coin_url('bitcoin')
+        not_recorded_url = server.coin_url('ethereum')
+    set_transport_mode(REPLAY, fixtures_path)
+    replayed = http_session.get(url)
+    assert (replayed.status_code, replayed.text) == (recorded.status_code, recorded.text)
+    assert replayed.headers.get('Content-Type') == recorded.headers.get('Content-Type')
+    assert http_session.get(not_recorded_url).status_code == 404
+
+
+def test_replay_injects_errors(fixtures_path):
+    set_transport_mode(REPLAY, fixtures_path, error_rate=1., seed=0)
+    with pytest.raises(RequestsConnectionError):
+        http_session.get('http://127.0.0.1:1/coin')
+    with pytest.raises(ValueError):
+        set_transport_mode('offline', fixtures_path)
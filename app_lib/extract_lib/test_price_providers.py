@@ -0,0 +1,51 @@
+"""
+Tests of the hedged price fetcher: failover, hedging, ranking and the coins of every provider
+"""
+import time
+from app_lib.benchmarks.provider_benchmark import StandInPriceProvider
+from app_lib.benchmarks.stand_in_server import StandInServer
+from app_lib.extract_lib.price_providers import HedgedPriceFetcher, CoinbaseProvider, ProviderStats
+
+
+def test_failed_provider_fails_over_to_the_next_one():
+    failing = StandInPriceProvider('failing', 0., error_rate=1.)
+    backup = StandInPriceProvider('backup', 0.)
+    fetcher = HedgedPriceFetcher([failing, backup], hedge_delay=10.)
+    start = time.perf_counter()
+    assert fetcher.get_quote('bitcoin', 'BTC') == ['bitcoin', 'BTC', 107.]
+    assert time.perf_counter() - start < 1.
+    assert fetcher.get_stats()['failing']['errors'] == 1
+
+
+def test_slow_provider_is_hedged_and_ranked_last():
+    slow = StandInPriceProvider('slow', 1.)
+    fast = StandInPriceProvider('fast', 0.)
+    fetcher = HedgedPriceFetcher([slow, fast], hedge_delay=0.05)
+    start = time.perf_counter()
+    assert fetcher.get_quote('bitcoin', 'BTC')
+    assert time.perf_counter() - start < 0.5
+    time.sleep(1.1)
+    assert fetcher.ranked_providers() == [fast, slow]
+
+
+def test_every_provider_failing_returns_no_quote():
+    fetcher = HedgedPriceFetcher([StandInPriceProvider('failing', 0., error_rate=1.)], hedge_delay=0.05)
+    assert fetcher.get_quote('bitcoin', 'BTC') == []
+
+
+def test_coinbase_only_quotes_its_symbols():
+    with StandInServer({'bitcoin': 'BTC', 'luna': 'LUNA'}) as server:
+        coinbase = CoinbaseProvider(server.spot_url)
+        fetcher = HedgedPriceFetcher([coinbase], hedge_delay=0.05)
+        assert fetcher.get_quote('bitcoin', 'BTC')[1] == 'BTC'
+        assert fetcher.get_quote('luna', 'LUNA') == []
+        assert coinbase.stats.requests == 1
+
+
+def test_stats_score():
+    stats = ProviderStats(weight=0.5)
+    assert stats.score() == float('inf')
+    stats.record(1., True)
+    stats.record(1., False)
+    assert stats.error_rate == 0.5
+    assert stats.score() == 2.
@@ -0,0 +1,55 @@
+"""
+Tests of the on-disk response cache: entries, validation and eviction
+"""
+import os
+import time
+from app_lib.extract_lib.response_cache import ResponseCache
+
+
+HEADERS = {'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2020 00:00:00 GMT'}
+
+
+def test_set_and_get(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    assert cache.get('https://example.com/a') is None
+    cache.set('https://example.com/a', b'first', HEADERS)
+    cache.set('https://example.com/a', b'second', {'ETag': '"v2"'})
+    entry = cache.get('https://example.com/a')
+    assert entry['content'] == b'second' and entry['etag'] == '"v2"' and entry['last_modified'] is None
+    assert cache.conditional_headers(entry) == {'If-None-Match': '"v2"'}
+    assert cache.is_fresh(entry)
+    assert not any(file_name.endswith('.tmp') for file_name in os.listdir(tmp_path))
+
+
+def test_validate_keeps_the_body(tmp_path):
+    cache = ResponseCache(str(tmp_path), fresh_time=10)
+    cache.set('https://example.com/a', b'body', HEADERS)
+    entry = cache.get('https://example.com/a')
+    entry['validated'] -= 60
+    cache.validate('https://example.com/a', entry)
+    entry = cache.get('https://example.com/a')
+    assert cache.is_fresh(entry) and entry['content'] == b'body' and entry['etag'] == '"v1"'
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size=250)
+    for index in range(3):
+        # reads and writes update the body modification time that orders the entries
+        cache.set(f'https://example.com/{index}', bytes(100), HEADERS)
+        time.sleep(0.01)
+        cache.get('https://example.com/0')
+        time.sleep(0.01)
+    assert [cache.get(f'https://example.com/{index}') is not None for index in range(3)] == [True, False, True]
+
+
+def test_evicts_old_entries_and_interrupted_writes(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=0.1)
+    cache.set('https://example.com/old', b'old', HEADERS)
+    time.sleep(0.2)
+    cache.set('https://example.com/new', b'new', HEADERS)
+    (tmp_path / 'orphan.body').write_bytes(b'body without metadata')
+    (tmp_path / 'orphan.json.tmp').write_bytes(b'{')
+    cache.evict()
+    assert cache.get('https://example.com/old') is None
+    assert cache.get('https://example.com/new')['content'] == b'new'
+    assert len(os.listdir(tmp_path)) == 2
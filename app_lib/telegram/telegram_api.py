@@ -1,9 +1,9 @@
 """
 Definition of functions used with telegram
 """
-from requests import post
 import traceback
 from telegram.error import NetworkError
+from app_lib.extract_lib.http_session import post
 from app_lib.log.log import get_log
 from app_lib.configuration.tools.users import get_bot
 
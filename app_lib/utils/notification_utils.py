@@ -18,7 +18,8 @@ __logger__ = get_log('notification_utils')
 
 def notify_telegram(data: list, intelli_limit: bool = True) -> None:
     """
-    Function used to notify by telegram if any coin match the limits
+    Function used to notify by telegram if any coin match the limits. Only the coins in data are
+    evaluated, so data can be just the coins changed since the previous tick
     :param data:
     :param intelli_limit:
     :return:
@@ -30,6 +31,8 @@ def notify_telegram(data: list, intelli_limit: bool = True) -> None:
         __logger__.info(f'User: {user}')
         if user in coin_limits:
             for coin_name, coin_limit_values in coin_limits[user].items():
+                if coin_name not in coin_values:
+                    continue
                 msg = None
                 if intelli_limit:
                     low_case, high_case = check_intelligent_limits(user, coin_name, coin_limit_values, coin_values)
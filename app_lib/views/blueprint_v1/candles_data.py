@@ -0,0 +1,23 @@
+"""
+Module to get the intraday OHLC candles of a coin as JSON
+"""
+from flask import jsonify
+from app_lib.DDBB.sqlite.candles import get_candle_builder, INTERVALS
+from app_lib.utils.num_str_utils import str_to_int
+
+
+def candles_page(logo: str, interval: str = None, time_init: str = None, time_end: str = None):
+    """
+    Returns the candles of a coin starting between the given unix times, with the open one
+    :param logo: coin logo. Ex: BTC
+    :param interval: name in INTERVALS, by default 1h
+    :param time_init: unix time in seconds, by default the first candle
+    :param time_end: unix time in seconds, by default the last candle
+    :return: JSON [[time, open, high, low, close], ...] sorted by time
+    """
+    interval = interval or '1h'
+    if not logo or interval not in INTERVALS:
+        return jsonify([])
+    return jsonify(get_candle_builder().get_candles(
+        logo.strip().upper(), interval, str_to_int(time_init), str_to_int(time_end)
+    ))
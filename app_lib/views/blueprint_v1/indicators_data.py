@@ -0,0 +1,32 @@
+"""
+Module to get the indicators of every coin as JSON
+"""
+from flask import jsonify
+from app_lib.DDBB.sqlite.indicator_store import IndicatorStore
+from app_lib.DDBB.sqlite.models import get_model_names
+from app_lib.data_science.indicators.streaming import get_streaming_indicators
+from app_lib.utils.num_str_utils import str_to_int
+
+
+def indicators_page(logos: str = None, date: str = None):
+    """
+    Returns the last indicators of the coins saved by the nightly refresh of the extractor, they are only
+    read. Coins without saved indicators are not returned
+    :param logos: comma separated coin logos, by default every coin. Ex: BTC,ETH
+    :param date: indicators at the last date up to this one with YYYYMMDD form, by default the last ones
+    :return: JSON {logo: {'date': date, 'close': value, 'ema': value, ...}}
+    """
+    logos = [logo.strip().upper() for logo in logos.split(',') if logo.strip()] if logos else get_model_names()
+    logos = [logo for logo in logos if logo in get_model_names()]
+    return jsonify(IndicatorStore().get_latest(logos, str_to_int(date)))
+
+
+def live_indicators_page(logos: str = None):
+    """
+    Returns the last indicators of the coins updated by the extractor with every price, read as they are saved
+    :param logos: comma separated coin logos, by default every coin with streaming indicators. Ex: BTC,ETH
+    :return: JSON {logo: {'date': date, 'close': value, 'ema': value, ...}}, the same indicators as indicators_page
+    and the RSI with Wilder smoothing as 'rsi_wilder'
+    """
+    logos = [logo.strip().upper() for logo in logos.split(',') if logo.strip()] if logos else None
+    return jsonify(get_streaming_indicators(logos))
@@ -1,5 +1,8 @@
-from flask import Blueprint
+from flask import Blueprint, request
 from app_lib.views.blueprint_v1.coin_data import general_page
+from app_lib.views.blueprint_v1.indicators_data import indicators_page, live_indicators_page
+from app_lib.views.blueprint_v1.ticks_data import ticks_page
+from app_lib.views.blueprint_v1.candles_data import candles_page
 
 
 blueprint = Blueprint('api_v1', __name__, url_prefix='/api/v1')
@@ -23,3 +26,25 @@ def cardano_data():
 @blueprint.route('/tron', methods=['GET'])
 def tron_data():
     return general_page('TRX', 'Tron', 'tron')
+
+
+@blueprint.route('/indicators', methods=['GET'])
+def indicators_data():
+    return indicators_page(request.args.get('logos'), request.args.get('date'))
+
+
+@blueprint.route('/indicators/live', methods=['GET'])
+def live_indicators_data():
+    return live_indicators_page(request.args.get('logos'))
+
+
+@blueprint.route('/ticks', methods=['GET'])
+def ticks_data():
+    return ticks_page(request.args.get('logo'), request.args.get('from'), request.args.get('to'))
+
+
+@blueprint.route('/candles', methods=['GET'])
+def candles_data():
+    return candles_page(
+        request.args.get('logo'), request.args.get('interval'), request.args.get('from'), request.args.get('to')
+    )
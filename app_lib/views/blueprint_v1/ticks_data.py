@@ -0,0 +1,19 @@
+"""
+Module to get the intraday price ticks of a coin as JSON
+"""
+from flask import jsonify
+from app_lib.DDBB.sqlite.ticks import get_tick_store
+from app_lib.utils.num_str_utils import str_to_int
+
+
+def ticks_page(logo: str, time_init: str = None, time_end: str = None):
+    """
+    Returns the ticks of a coin between the given unix times, with the ones the extractor did not write yet
+    :param logo: coin logo. Ex: BTC
+    :param time_init: unix time in seconds, by default the first tick
+    :param time_end: unix time in seconds, by default the last tick
+    :return: JSON [[time, price], ...] sorted by time
+    """
+    if not logo:
+        return jsonify([])
+    return jsonify(get_tick_store().get_ticks(logo.strip().upper(), str_to_int(time_init), str_to_int(time_end)))
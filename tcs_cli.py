@@ -4,6 +4,16 @@ CLI main module
 import click
 from app_lib.cli.add_historical_data import add_historical_data
 from app_lib.cli.load_data_from_html_file import load_data_from_html_file
+from app_lib.cli.benchmark_extractor import benchmark_extractor
+from app_lib.cli.benchmark_html_parser import benchmark_html_parser_command
+from app_lib.cli.replay_fixtures import record_fixtures_command, benchmark_ticks_command
+from app_lib.cli.benchmark_providers import benchmark_providers_command
+from app_lib.cli.migrate_database import migrate_database
+from app_lib.cli.benchmark_sqlite import benchmark_sqlite_command
+from app_lib.cli.price_files import export_prices_command, import_prices_command
+from app_lib.cli.benchmark_storage import benchmark_storage_command
+from app_lib.cli.benchmark_moving_averages import benchmark_moving_averages_command
+from app_lib.cli.refresh_indicators import refresh_indicators_command
 
 
 @click.group(name='tcs')
@@ -19,6 +29,18 @@ def tcs_entrypoint() -> None:
     """
     tcs_cli_command.add_command(add_historical_data)
     tcs_cli_command.add_command(load_data_from_html_file)
+    tcs_cli_command.add_command(benchmark_extractor)
+    tcs_cli_command.add_command(benchmark_html_parser_command)
+    tcs_cli_command.add_command(record_fixtures_command)
+    tcs_cli_command.add_command(benchmark_ticks_command)
+    tcs_cli_command.add_command(benchmark_providers_command)
+    tcs_cli_command.add_command(migrate_database)
+    tcs_cli_command.add_command(benchmark_sqlite_command)
+    tcs_cli_command.add_command(export_prices_command)
+    tcs_cli_command.add_command(import_prices_command)
+    tcs_cli_command.add_command(benchmark_storage_command)
+    tcs_cli_command.add_command(benchmark_moving_averages_command)
+    tcs_cli_command.add_command(refresh_indicators_command)
     tcs_cli_command()
 
 